@@ -1,12 +1,27 @@
+import os
+import sqlite3
+import uuid
+
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 
 from core.schema import JobRecord
-from core.enhance import bulk_enhance
-from core.validate import validate_dataset
-from core.io import load_json, save_json_str, generate_changelog, deduplicate_data
+from core.enhance import bulk_enhance_dicts
+from core.enhance_cache import EnhancementCache
+from core.journal import OperationJournal, DEFAULT_JOURNAL_DIR, journal_directory
+from core.warm_snapshot import load_or_build
+from core.similarity import SimilarityIndex
+from core.analytics import CatalogStats, NOT_SET
+from core.duties import DutyIndex
+from core.validate import validate_issues, revalidate_rows
+from core.bulk_edit import bulk_edit, BULK_OPERATIONS
+from core.issues import COLUMNS as ISSUE_COLUMNS, IssueStore
+from core.sharded_validate import validate_dataset_sharded, DEFAULT_SHARD_SIZE
+from core.ingest import load_upload, DEFAULT_MAX_RECORDS, DEFAULT_MAX_DECOMPRESSED_BYTES
+from core.io import save_json_str, save_parquet_bytes, generate_changelog, deduplicate_data
 from core.constants import CAREER_FAMILIES
+from core import metrics
 
 # --- CONFIG ---
 st.set_page_config(
@@ -16,17 +31,332 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+def env_number(name: str, default, cast=int):
+    """A positive number from the environment; ``default`` if unset, malformed or not positive."""
+    try:
+        value = cast(os.environ.get(name, "").strip())
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
 # --- STATE MANAGEMENT ---
 if "data" not in st.session_state:
     st.session_state["data"] = []  # The working list of dicts
 if "original_data" not in st.session_state:
     st.session_state["original_data"] = []  # For diffing
 if "validation_issues" not in st.session_state:
-    st.session_state["validation_issues"] = []
+    st.session_state["validation_issues"] = IssueStore()
 if "changelog" not in st.session_state:
     st.session_state["changelog"] = []
 if "file_loaded" not in st.session_state:
     st.session_state["file_loaded"] = False
+if "data_version" not in st.session_state:
+    st.session_state["data_version"] = 0  # Bumped on every change to "data"
+if "validation_version" not in st.session_state:
+    st.session_state["validation_version"] = 0  # Bumped on every validation run
+
+# Instrumentation is process-wide; each session's performance panel holds it on while open.
+# Streamlit gives no callback when a session ends, so the hold lapses unless a rerun
+# refreshes it. Span peak memory is process-wide too: only meaningful for a single session.
+PERFORMANCE_HOLD_SECONDS = env_number("JDA_METRICS_HOLD_SECONDS", 15 * 60)
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
+if st.session_state.get("show_performance"):
+    metrics.acquire(st.session_state["session_id"], track_memory=True, ttl=PERFORMANCE_HOLD_SECONDS)
+else:
+    metrics.release(st.session_state["session_id"])
+
+# --- MAIN LOGIC ---
+def mark_data_changed():
+    """Invalidates the memoized frames and downloads built from the working data."""
+    st.session_state["data_version"] += 1
+
+
+def run_validation():
+    with metrics.span("app.run_validation"):
+        data = st.session_state["data"]
+        workers = env_number("JDA_VALIDATION_WORKERS", 1)
+        if workers > 1 and len(data) > 2 * DEFAULT_SHARD_SIZE:
+            issues = validate_dataset_sharded(data, workers=workers, issues=IssueStore())
+        else:
+            issues = validate_issues(data)
+        issues.data_version = st.session_state["data_version"]
+        st.session_state["validation_issues"] = issues
+        st.session_state["validation_version"] += 1
+
+
+def revalidate_touched(indexes):
+    """
+    Re-runs validation for edited rows only, keeping the other rows' issues.
+    Call it right after the edit's ``mark_data_changed``: the issues must
+    describe the previous data version, or everything is validated again.
+    """
+    with metrics.span("app.revalidate_touched"):
+        version = st.session_state["data_version"]
+        issues = revalidate_rows(
+            st.session_state["data"], st.session_state["validation_issues"], indexes, data_version=version - 1
+        )
+        issues.data_version = version
+        st.session_state["validation_issues"] = issues
+        st.session_state["validation_version"] += 1
+
+
+@metrics.timed("app.sync_grid_to_session")
+def sync_grid_to_session(editable_df: pd.DataFrame, editor_state):
+    """
+    Applies the grid's own edit log (``edited_rows``, ``added_rows`` and
+    ``deleted_rows`` of the data_editor state) to the session data, even when
+    filtered. Only the cells the user touched are compared: the frame the grid
+    returns is re-materialised from pandas (ints become floats, absent fields
+    become None, invalid values are stringified), so diffing it would rewrite
+    records on every render.
+    """
+    if not isinstance(editor_state, dict):
+        return
+    edited = editor_state.get("edited_rows") or {}
+    added = editor_state.get("added_rows") or []
+    deleted = editor_state.get("deleted_rows") or []
+    if not (edited or added or deleted):
+        return
+    # The editor keeps its state until its data changes; don't apply the same edits twice.
+    signature = (st.session_state["data_version"], repr(editor_state))
+    if st.session_state.get("_applied_grid_edits") == signature:
+        return
+
+    old_data = st.session_state["data"]
+    new_data = list(old_data)
+    orig_indexes = editable_df["_orig_index"].tolist()
+    touched = []
+    for position, changes in edited.items():
+        index = int(orig_indexes[int(position)])
+        record = new_data[index]
+        updates = {field: value for field, value in changes.items()
+                   if field != "_orig_index" and record.get(field) != value}
+        if updates:
+            new_data[index] = {**record, **updates}
+            touched.append(index)
+    for row in added:
+        record = {field: value for field, value in row.items() if field != "_orig_index" and value is not None}
+        if record:
+            touched.append(len(new_data))
+            new_data.append(record)
+    doomed = {int(orig_indexes[int(position)]) for position in deleted}
+    if doomed:
+        new_data = [record for index, record in enumerate(new_data) if index not in doomed]
+
+    if not touched and not doomed:
+        return
+    st.session_state["data"] = new_data
+    mark_data_changed()
+    st.session_state["_applied_grid_edits"] = (st.session_state["data_version"], repr(editor_state))
+    if doomed:
+        # Deleted rows shift positions: snapshot and validate everything.
+        journal_changes(None, snapshot=True)
+        run_validation()
+    else:
+        journal_changes(old_data, touched)
+        revalidate_touched(touched)
+
+
+def get_dataframe() -> pd.DataFrame:
+    """DataFrame of the working data, rebuilt only when the data changes."""
+    cached = st.session_state.get("_df_cache")
+    if cached is None or cached[0] != st.session_state["data_version"]:
+        with metrics.span("app.build_dataframe"):
+            cached = (st.session_state["data_version"], pd.DataFrame(st.session_state["data"]))
+        st.session_state["_df_cache"] = cached
+    return cached[1]
+
+
+def current_filters() -> tuple:
+    return (
+        tuple(st.session_state.get("filter_families") or ()),
+        tuple(st.session_state.get("filter_depts") or ()),
+        st.session_state.get("search_term") or "",
+    )
+
+
+def get_filtered_dataframe() -> pd.DataFrame:
+    """Applies the sidebar filters, reusing the result until the data or filters change."""
+    cache_key = (st.session_state["data_version"], current_filters())
+    cached = st.session_state.get("_filtered_cache")
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+
+    filter_families, filter_depts, search_term = cache_key[1]
+    with metrics.span("app.filter"):
+        filtered_df = get_dataframe()
+        if not filtered_df.empty:
+            if filter_families:
+                filtered_df = filtered_df[filtered_df["careerFamily"].isin(filter_families)]
+            if filter_depts:
+                filtered_df = filtered_df[filtered_df["department"].isin(filter_depts)]
+            if search_term:
+                search_cols = [
+                    c
+                    for c in [
+                        "positionTitle",
+                        "key_duties_responsibilities",
+                        "position_complexity",
+                    ]
+                    if c in filtered_df.columns
+                ]
+                if search_cols:
+                    mask = filtered_df[search_cols].apply(
+                        lambda row: row.astype(str).str.contains(search_term, case=False).any(),
+                        axis=1,
+                    )
+                    filtered_df = filtered_df[mask]
+    st.session_state["_filtered_cache"] = (cache_key, filtered_df)
+    return filtered_df
+
+
+ISSUES_PAGE_SIZE = 200
+
+
+def get_issue_selection(severities: list, rules: list):
+    """Positions of the issues matching the Validation tab filters, reused until validation reruns."""
+    cache_key = (st.session_state["validation_version"], tuple(severities), tuple(rules))
+    cached = st.session_state.get("_issue_selection_cache")
+    if cached is None or cached[0] != cache_key:
+        with metrics.span("app.select_issues"):
+            positions = st.session_state["validation_issues"].select(severity=severities, rule=rules)
+        cached = (cache_key, positions)
+        st.session_state["_issue_selection_cache"] = cached
+    return cached[1]
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Similarity index over the working data, built on first use and then refreshed incrementally."""
+    cached = st.session_state.get("_similarity_index")
+    if cached is None:
+        with metrics.span("app.build_similarity_index"):
+            cached = (st.session_state["data_version"], SimilarityIndex.from_records(st.session_state["data"]))
+    elif cached[0] != st.session_state["data_version"]:
+        with metrics.span("app.refresh_similarity_index"):
+            cached[1].refresh(st.session_state["data"])
+        cached = (st.session_state["data_version"], cached[1])
+    st.session_state["_similarity_index"] = cached
+    return cached[1]
+
+
+def get_catalog_stats() -> CatalogStats:
+    """Catalog counts and completeness, updated incrementally whenever the data changes."""
+    cached = st.session_state.get("_catalog_stats")
+    if cached is None:
+        cached = (st.session_state["data_version"], CatalogStats.from_records(st.session_state["data"]))
+    elif cached[0] != st.session_state["data_version"]:
+        with metrics.span("app.refresh_catalog_stats"):
+            cached[1].refresh(st.session_state["data"])
+        cached = (st.session_state["data_version"], cached[1])
+    st.session_state["_catalog_stats"] = cached
+    return cached[1]
+
+
+def get_duty_index() -> DutyIndex:
+    """Duty-phrase index over the working data, re-indexing only edited records when the data changes."""
+    cached = st.session_state.get("_duty_index")
+    if cached is None:
+        with metrics.span("app.build_duty_index"):
+            cached = (st.session_state["data_version"], DutyIndex.from_records(st.session_state["data"]))
+    elif cached[0] != st.session_state["data_version"]:
+        with metrics.span("app.refresh_duty_index"):
+            cached[1].refresh(st.session_state["data"])
+        cached = (st.session_state["data_version"], cached[1])
+    st.session_state["_duty_index"] = cached
+    return cached[1]
+
+
+def lazy_download(label, key, version, build, file_name, mime):
+    """
+    Shows a "Prepare" button and builds the payload only when clicked; the
+    prepared payload is offered for download until ``version`` changes.
+    """
+    prepared = st.session_state.get(f"_download_{key}")
+    if prepared is None or prepared[0] != version:
+        if not st.button(f"Prepare {label}", key=f"prepare_{key}"):
+            return
+        with metrics.span(f"app.{key}"):
+            prepared = (version, build())
+        st.session_state[f"_download_{key}"] = prepared
+    st.download_button(label=label, data=prepared[1], file_name=file_name, mime=mime, key=f"download_{key}")
+
+
+@st.cache_resource
+def get_enhancement_cache():
+    """
+    Shared on-disk enhancement cache, opt-in via ``JDA_ENHANCE_CACHE`` (the
+    cache file path). Template fills are cheaper to recompute than to look up,
+    so the cache only pays off for costlier enhancement; None when it is not
+    configured or the cache file cannot be opened.
+    """
+    path = os.environ.get("JDA_ENHANCE_CACHE", "").strip()
+    if not path:
+        return None
+    try:
+        return EnhancementCache(path)
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def journal_owner() -> str:
+    """
+    Whose journal this session writes: the signed-in user if authentication
+    is configured, else an ID kept in the ``journal`` URL parameter, so a
+    reload of the same URL can restore its own session and nobody else's.
+    """
+    try:
+        email = st.user.get("email") if st.user.get("is_logged_in") else None
+    except Exception:  # st.user is unavailable without an auth setup
+        email = None
+    if email:
+        return f"user:{email}"
+    journal_id = st.query_params.get("journal")
+    if not journal_id:
+        journal_id = st.query_params["journal"] = uuid.uuid4().hex
+    return f"session:{journal_id}"
+
+
+def get_journal():
+    """This session's on-disk operation journal for session restore; None if it cannot be opened."""
+    owner = journal_owner()
+    cached = st.session_state.get("_journal")
+    if cached is None or cached[0] != owner:
+        root = os.environ.get("JDA_JOURNAL_DIR", DEFAULT_JOURNAL_DIR)
+        try:
+            journal = OperationJournal(journal_directory(root, owner))
+        except OSError:
+            journal = None
+        cached = (owner, journal)
+        st.session_state["_journal"] = cached
+    return cached[1]
+
+
+def journal_changes(old_data, indexes=None, changelog_entry=None, snapshot=False, reset=False):
+    """
+    Records the change from ``old_data`` to the current data in the journal
+    (one fsync per action). ``snapshot=True`` writes a snapshot instead, for
+    changes such as deduplication that shift record positions; ``reset=True``
+    starts a new journal for a newly loaded dataset.
+    """
+    journal = get_journal()
+    if journal is None:
+        return
+    try:
+        data, changelog = st.session_state["data"], st.session_state["changelog"]
+        if reset:
+            journal.reset(data, changelog)
+            return
+        if snapshot:
+            journal.snapshot(data, changelog)
+            return
+        journal.log_changes(old_data, data, indexes, changelog_entry)
+        journal.flush()
+        journal.compact_if_needed(data, changelog)
+    except OSError as e:
+        st.warning(f"Could not write the session journal: {e}")
+
 
 st.title("Job Description Architect")
 st.markdown(
@@ -37,33 +367,113 @@ st.markdown(
 st.sidebar.title("Job Description Architect 🏗️")
 
 # 1. File Loader
-uploaded_file = st.sidebar.file_uploader("Load Job Descriptions (JSON)", type=["json"])
-load_default = st.sidebar.button("Load Default (./data/job_descriptions2.json)")
+uploaded_file = st.sidebar.file_uploader(
+    "Load Job Descriptions (JSON, JSON Lines, Parquet, Arrow; optionally gzip, zstd or zip compressed)",
+    type=["json", "jsonl", "ndjson", "parquet", "arrow", "feather", "gz", "zst", "zip"],
+)
+# Upload limits; a load stops with an error once either is exceeded.
+UPLOAD_MAX_RECORDS = env_number("JDA_UPLOAD_MAX_RECORDS", DEFAULT_MAX_RECORDS)
+# Limit on the uncompressed size of an upload, in MB.
+UPLOAD_MAX_DECOMPRESSED_BYTES = int(env_number("JDA_UPLOAD_MAX_MB", 0, float) * 2**20) or DEFAULT_MAX_DECOMPRESSED_BYTES
+DEFAULT_DATA_PATH = "./data/job_descriptions2.json"
+load_default = st.sidebar.button(f"Load Default ({DEFAULT_DATA_PATH})")
+
+
+def set_loaded_data(raw_data, issues=None, dedupe_keys=None):
+    """Installs a newly loaded dataset; ``issues``/``dedupe_keys`` may come precomputed from a snapshot."""
+    st.session_state["data"] = raw_data
+    st.session_state["original_data"] = [r.copy() for r in raw_data]  # Deep copy for diff
+    st.session_state["file_loaded"] = True
+    st.session_state["changelog"] = []
+    mark_data_changed()
+    if issues is None:
+        run_validation()
+    else:
+        issues.data_version = st.session_state["data_version"]
+        st.session_state["validation_issues"] = issues
+        st.session_state["validation_version"] += 1
+    if dedupe_keys is not None:
+        st.session_state["_dedupe_keys"] = (st.session_state["data_version"], dedupe_keys)
+    journal_changes(None, reset=True)
 
 
 def load_data_handler(file_obj):
+    """Streams a file into the session, showing progress; returns the error message on failure."""
+    progress_bar = st.sidebar.progress(0.0, text="Reading file...")
+
+    def report(fraction, count):
+        progress_bar.progress(fraction, text=f"Read {count:,} records ({fraction:.0%})")
+
     try:
-        raw_data = load_json(file_obj)
-        st.session_state["data"] = raw_data
-        st.session_state["original_data"] = [r.copy() for r in raw_data]  # Deep copy for diff
-        st.session_state["file_loaded"] = True
-        st.session_state["changelog"] = []
-        run_validation()
+        with metrics.span("app.load_data"):
+            raw_data = load_upload(
+                file_obj,
+                getattr(file_obj, "name", ""),
+                max_records=UPLOAD_MAX_RECORDS,
+                max_decompressed_bytes=UPLOAD_MAX_DECOMPRESSED_BYTES,
+                progress=report,
+            )
+            set_loaded_data(raw_data)
         st.sidebar.success(f"Loaded {len(raw_data)} records.")
     except Exception as e:
         st.sidebar.error(f"Error loading file: {e}")
+        return str(e)
+    finally:
+        progress_bar.empty()
+    return None
+
+
+def load_default_handler():
+    """Loads the default dataset from its warm snapshot, building the snapshot on first use."""
+    try:
+        with metrics.span("app.load_default"):
+            snapshot, _ = load_or_build(DEFAULT_DATA_PATH)
+            set_loaded_data(snapshot["records"], snapshot["issues"], snapshot["dedupe_keys"])
+        st.sidebar.success(f"Loaded {len(snapshot['records'])} records.")
+    except FileNotFoundError:
+        st.sidebar.error("Default file not found.")
+    except OSError:
+        # Snapshot directory not writable: load the source directly.
+        with open(DEFAULT_DATA_PATH, "rb") as f:
+            load_data_handler(f)
+    except Exception as e:
+        st.sidebar.error(f"Error loading file: {e}")
+
+
+def restore_session_handler(journal):
+    try:
+        restored = journal.restore()
+    except (OSError, ValueError) as e:
+        st.sidebar.error(f"Could not restore the last session: {e}")
+        return
+    data, original_data, changelog = restored
+    st.session_state["data"] = data
+    st.session_state["original_data"] = original_data
+    st.session_state["changelog"] = changelog
+    st.session_state["file_loaded"] = True
+    mark_data_changed()
+    run_validation()
+    st.sidebar.success(f"Restored {len(data)} records and {len(changelog)} logged changes.")
 
 
 if uploaded_file:
     if not st.session_state["file_loaded"]:
-        load_data_handler(uploaded_file)
+        # A rejected upload stays selected; don't re-read it on every rerun.
+        upload_id = getattr(uploaded_file, "file_id", uploaded_file.name)
+        failed = st.session_state.get("_failed_upload")
+        if failed is not None and failed[0] == upload_id:
+            st.sidebar.error(f"Error loading file: {failed[1]}")
+        else:
+            error = load_data_handler(uploaded_file)
+            st.session_state["_failed_upload"] = (upload_id, error) if error else None
 
 if load_default:
-    try:
-        with open("./data/job_descriptions2.json", "r", encoding="utf-8") as f:
-            load_data_handler(f)
-    except FileNotFoundError:
-        st.sidebar.error("Default file not found.")
+    load_default_handler()
+
+session_journal = get_journal()
+if not st.session_state["file_loaded"] and session_journal is not None and session_journal.has_session:
+    if st.sidebar.button("♻️ Restore Last Session"):
+        restore_session_handler(session_journal)
 
 if not st.session_state["file_loaded"]:
     st.info("Please upload a JSON file or load the default dataset to begin.")
@@ -75,54 +485,43 @@ st.sidebar.subheader("Operations")
 
 if st.sidebar.button("✨ Auto-Enhance All"):
     try:
-        records_objs = []
-        indices = []
-
-        for idx, r in enumerate(st.session_state["data"]):
-            try:
-                records_objs.append(JobRecord(**r))
-                indices.append(idx)
-            except Exception:
-                continue
-
-        enhanced_objs, count = bulk_enhance(records_objs)
-
-        new_data = list(st.session_state["data"])
-        narrative_fields = [
-            "key_duties_responsibilities",
-            "position_complexity",
-            "organizational_impact",
-            "career_progression_path",
-        ]
-
-        for rec_index, enhanced_rec in zip(indices, enhanced_objs):
-            base = dict(new_data[rec_index])
-            enhanced_dict = enhanced_rec.model_dump()
-
-            for field in narrative_fields:
-                if field in enhanced_dict and enhanced_dict[field] is not None:
-                    base[field] = enhanced_dict[field]
-
-            if not base.get("jobDescription"):
-                parts = []
-                summary = base.get("position_summary") or base.get("positionSummary")
-                if summary and str(summary).strip():
-                    parts.append(str(summary).strip())
-                duties = base.get("key_duties_responsibilities")
-                if duties and str(duties).strip():
-                    parts.append(str(duties).strip())
-                if parts:
-                    base["jobDescription"] = "\n\n".join(parts)
-
-            new_data[rec_index] = base
-
-        st.session_state["data"] = new_data
-
-        st.session_state["changelog"].append({
+        with metrics.span("app.auto_enhance"):
+            fills, count = bulk_enhance_dicts(st.session_state["data"], cache=get_enhancement_cache())
+
+            new_data = list(st.session_state["data"])
+            indices = []
+            for rec_index, filled in enumerate(fills):
+                if filled is None:
+                    continue  # fails the schema; left for the Validation tab
+                indices.append(rec_index)
+                base = {**new_data[rec_index], **filled}
+
+                if not base.get("jobDescription"):
+                    parts = []
+                    summary = base.get("position_summary") or base.get("positionSummary")
+                    if summary and str(summary).strip():
+                        parts.append(str(summary).strip())
+                    duties = base.get("key_duties_responsibilities")
+                    if duties and str(duties).strip():
+                        parts.append(str(duties).strip())
+                    if parts:
+                        base["jobDescription"] = "\n\n".join(parts)
+
+                # Keep unchanged records as the same object so incremental indexes skip them.
+                if base != new_data[rec_index]:
+                    new_data[rec_index] = base
+
+            old_data = st.session_state["data"]
+            st.session_state["data"] = new_data
+            mark_data_changed()
+
+        entry = {
             "timestamp": datetime.now().isoformat(),
             "action": "bulk_enhance",
             "records_modified": count,
-        })
+        }
+        st.session_state["changelog"].append(entry)
+        journal_changes(old_data, indices, entry)
 
         st.toast(f"Enhanced {count} records!", icon="✨")
         run_validation()
@@ -132,7 +531,14 @@ if st.sidebar.button("✨ Auto-Enhance All"):
 
 if st.sidebar.button("🧹 Deduplicate"):
     original_len = len(st.session_state["data"])
-    st.session_state["data"] = deduplicate_data(st.session_state["data"])
+    with metrics.span("app.deduplicate"):
+        cached_keys = st.session_state.get("_dedupe_keys")
+        keys = cached_keys[1] if cached_keys and cached_keys[0] == st.session_state["data_version"] else None
+        st.session_state["data"] = deduplicate_data(st.session_state["data"], keys)
+    mark_data_changed()
+    journal_changes(None, snapshot=True)
+    # Removing rows shifts positions, so the issues are recomputed rather than patched.
+    run_validation()
     new_len = len(st.session_state["data"])
     st.sidebar.info(f"Removed {original_len - new_len} duplicates.")
     st.rerun()
@@ -140,229 +546,396 @@ if st.sidebar.button("🧹 Deduplicate"):
 # 3. Filters
 st.sidebar.markdown("---")
 st.sidebar.subheader("Filters")
-df = pd.DataFrame(st.session_state["data"])
 
-filter_families = []
-filter_depts = []
-if not df.empty and "careerFamily" in df.columns:
-    filter_families = st.sidebar.multiselect("Career Family", options=df["careerFamily"].unique())
-if not df.empty and "department" in df.columns:
-    filter_depts = st.sidebar.multiselect("Department", options=df["department"].unique())
 
-search_term = st.sidebar.text_input("Search (Title/Desc)")
+@st.fragment
+def render_filters():
+    """Filter widgets rerun on their own; the editor is refreshed only when the filters change."""
+    df = get_dataframe()
+    if not df.empty and "careerFamily" in df.columns:
+        st.multiselect("Career Family", options=df["careerFamily"].unique(), key="filter_families")
+    if not df.empty and "department" in df.columns:
+        st.multiselect("Department", options=df["department"].unique(), key="filter_depts")
 
+    st.text_input("Search (Title/Desc)", key="search_term")
 
-# --- MAIN LOGIC ---
-def run_validation():
-    _, issues = validate_dataset(st.session_state["data"])
-    st.session_state["validation_issues"] = [i.to_dict() for i in issues]
+    applied = current_filters()
+    if st.session_state.get("_applied_filters") != applied:
+        st.session_state["_applied_filters"] = applied
+        # The editor fragment renders the filtered view, so it has to rerun too;
+        # the other tabs reuse their memoized frames and lazy downloads.
+        st.rerun()
 
 
-def sync_grid_to_session(edited_df: pd.DataFrame):
-    """Persist grid edits back to the main session data, even when filtered."""
-    cleaned_df = edited_df.where(pd.notnull(edited_df), None)
-    base_data = list(st.session_state["data"])
+# A full run already sees the current filters; only a fragment-only rerun of
+# the filter widgets can leave them out of date.
+st.session_state["_applied_filters"] = current_filters()
+with st.sidebar:
+    render_filters()
 
-    for _, row in cleaned_df.iterrows():
-        row_dict = row.to_dict()
-        orig_index = row_dict.pop("_orig_index", None)
-
-        try:
-            orig_index_int = int(orig_index) if orig_index is not None else None
-        except (TypeError, ValueError):
-            orig_index_int = None
-
-        if orig_index_int is not None and 0 <= orig_index_int < len(base_data):
-            base_data[orig_index_int] = {
-                **base_data[orig_index_int],
-                **row_dict,
-            }
-        else:
-            base_data.append(row_dict)
-
-    st.session_state["data"] = base_data
-
-
-filtered_df = df.copy()
-if not filtered_df.empty:
-    if filter_families:
-        filtered_df = filtered_df[filtered_df["careerFamily"].isin(filter_families)]
-    if filter_depts:
-        filtered_df = filtered_df[filtered_df["department"].isin(filter_depts)]
-    if search_term:
-        search_cols = [
-            c
-            for c in [
-                "positionTitle",
-                "key_duties_responsibilities",
-                "position_complexity",
-            ]
-            if c in filtered_df.columns
-        ]
-        if search_cols:
-            mask = filtered_df[search_cols].apply(
-                lambda row: row.astype(str).str.contains(search_term, case=False).any(),
-                axis=1,
-            )
-            filtered_df = filtered_df[mask]
 
 # --- UI LAYOUT ---
-tab_editor, tab_valid, tab_diff, tab_export = st.tabs(["📝 Data Editor", "✅ Validation", "⚖️ Diff View", "💾 Export"])
+# Each area is a fragment: its widgets rerun only that fragment, and shared
+# frames are memoized by data/validation version so nothing else recomputes.
 
-with tab_editor:
+
+@st.fragment
+def render_editor():
+    df = get_dataframe()
+    filtered_df = get_filtered_dataframe()
     st.markdown(f"**Showing {len(filtered_df)} of {len(df)} records**")
 
-    if not filtered_df.empty:
-        editable_df = filtered_df.reset_index().rename(columns={"index": "_orig_index"})
+    if filtered_df.empty:
+        return
+
+    editable_df = filtered_df.reset_index().rename(columns={"index": "_orig_index"})
+
+    st.data_editor(
+        editable_df,
+        num_rows="dynamic",
+        use_container_width=True,
+        key="main_editor",
+        column_config={
+            "_orig_index": st.column_config.NumberColumn(
+                "Row ID", disabled=True, help="Original row reference"
+            ),
+        },
+        hide_index=True,
+    )
 
-        edited_df = st.data_editor(
-            editable_df,
-            num_rows="dynamic",
-            use_container_width=True,
-            key="main_editor",
-            column_config={
-                "_orig_index": st.column_config.NumberColumn(
-                    "Row ID", disabled=True, help="Original row reference"
-                ),
-            },
-            hide_index=True,
-        )
+    sync_grid_to_session(editable_df, st.session_state.get("main_editor"))
 
-        sync_grid_to_session(edited_df)
 
-        st.markdown("### Detail Editor")
+BULK_OPERATION_LABELS = {
+    "set": "Set value",
+    "replace": "Find & replace (regex)",
+    "fill_empty": "Fill if empty",
+}
 
-        selected_index = 0
-        editor_state = st.session_state.get("main_editor")
-        if isinstance(editor_state, dict):
-            selection = editor_state.get("selection")
-            if isinstance(selection, dict):
-                rows = selection.get("rows")
-                if isinstance(rows, list) and rows:
-                    selected_index = min(rows[0], len(edited_df) - 1)
-                elif isinstance(rows, dict) and rows:
-                    first_key = sorted(rows.keys())[0]
-                    selected_index = min(first_key, len(edited_df) - 1)
 
-        try:
-            selected_row = edited_df.iloc[selected_index]
-            selected_orig_idx_raw = selected_row.get("_orig_index")
-            selected_orig_idx = (
-                int(selected_orig_idx_raw) if pd.notnull(selected_orig_idx_raw) else None
-            )
-
-            if selected_orig_idx is not None and 0 <= selected_orig_idx < len(st.session_state["data"]):
-                record_to_edit = st.session_state["data"][selected_orig_idx]
-            else:
-                record_to_edit = {k: v for k, v in selected_row.to_dict().items() if k != "_orig_index"}
+@st.fragment
+def render_bulk_edit():
+    filtered_df = get_filtered_dataframe()
+    if filtered_df.empty:
+        return
 
-            input_suffix = selected_orig_idx if selected_orig_idx is not None else f"new_{selected_index}"
+    with st.expander(f"Bulk Edit ({len(filtered_df)} filtered records)"):
+        with st.form("bulk_edit_form"):
             col1, col2 = st.columns(2)
-            with col1:
-                new_title = st.text_input(
-                    "Position Title",
-                    record_to_edit.get("positionTitle", ""),
-                    key=f"title_{input_suffix}",
-                )
-                new_dept = st.text_input(
-                    "Department",
-                    record_to_edit.get("department", ""),
-                    key=f"dept_{input_suffix}",
-                )
-                current_family = record_to_edit.get("careerFamily")
-                family_index = CAREER_FAMILIES.index(current_family) if current_family in CAREER_FAMILIES else 0
-                new_family = st.selectbox(
-                    "Career Family",
-                    options=CAREER_FAMILIES,
-                    index=family_index,
-                    key=f"family_{input_suffix}",
-                )
-                new_job_level = st.text_input(
-                    "Job Level",
-                    record_to_edit.get("jobLevel", ""),
-                    key=f"job_level_{input_suffix}",
-                )
+            fields = list(JobRecord.model_fields)
+            fields += [c for c in filtered_df.columns if c not in fields]
+            field = col1.selectbox("Field", options=fields, key="bulk_field")
+            operation = col2.selectbox(
+                "Operation",
+                options=list(BULK_OPERATIONS),
+                format_func=BULK_OPERATION_LABELS.get,
+                key="bulk_operation",
+            )
+            pattern = st.text_input("Find (regex, replace only)", key="bulk_pattern")
+            value = st.text_input("Value / replacement", key="bulk_value")
+            ignore_case = st.checkbox("Ignore case", key="bulk_ignore_case")
+            submitted = st.form_submit_button("Apply to filtered records")
 
-            with col2:
-                st.markdown("**Generated Content**")
-                new_duties = st.text_area(
-                    "Duties",
-                    record_to_edit.get("key_duties_responsibilities", ""),
-                    height=150,
-                    key=f"duties_{input_suffix}",
-                )
-                new_complex = st.text_area(
-                    "Complexity",
-                    record_to_edit.get("position_complexity", ""),
-                    height=100,
-                    key=f"complexity_{input_suffix}",
-                )
-                new_impact = st.text_area(
-                    "Organizational Impact",
-                    record_to_edit.get("organizational_impact", ""),
-                    height=100,
-                    key=f"impact_{input_suffix}",
+        if submitted:
+            try:
+                new_data, changed = bulk_edit(
+                    st.session_state["data"], filtered_df.index, field, operation,
+                    value=value, pattern=pattern, ignore_case=ignore_case,
                 )
-                new_progression = st.text_area(
-                    "Career Progression",
-                    record_to_edit.get("career_progression_path", ""),
-                    height=100,
-                    key=f"progression_{input_suffix}",
+            except ValueError as e:
+                st.error(str(e))
+                return
+            if not changed:
+                st.info("No records changed.")
+                return
+
+            old_data = st.session_state["data"]
+            st.session_state["data"] = new_data
+            entry = {
+                "timestamp": datetime.now().isoformat(),
+                "action": "bulk_edit",
+                "field": field,
+                "operation": operation,
+                "value": value,
+                "pattern": pattern if operation == "replace" else None,
+                "record_indexes": changed,
+            }
+            st.session_state["changelog"].append(entry)
+            mark_data_changed()
+            journal_changes(old_data, changed, entry)
+            revalidate_touched(changed)
+            st.toast(f"Bulk edit changed {len(changed)} records.", icon="✏️")
+            st.rerun()
+
+
+SIMILAR_JOBS_COUNT = 5
+
+
+@st.fragment
+def render_detail_editor():
+    editable_df = get_filtered_dataframe().reset_index().rename(columns={"index": "_orig_index"})
+    if editable_df.empty:
+        return
+
+    st.markdown("### Detail Editor")
+
+    selected_index = 0
+    editor_state = st.session_state.get("main_editor")
+    if isinstance(editor_state, dict):
+        selection = editor_state.get("selection")
+        if isinstance(selection, dict):
+            rows = selection.get("rows")
+            if isinstance(rows, list) and rows:
+                selected_index = min(rows[0], len(editable_df) - 1)
+            elif isinstance(rows, dict) and rows:
+                first_key = sorted(rows.keys())[0]
+                selected_index = min(first_key, len(editable_df) - 1)
+
+    try:
+        selected_row = editable_df.iloc[selected_index]
+        selected_orig_idx_raw = selected_row.get("_orig_index")
+        selected_orig_idx = (
+            int(selected_orig_idx_raw) if pd.notnull(selected_orig_idx_raw) else None
+        )
+
+        if selected_orig_idx is not None and 0 <= selected_orig_idx < len(st.session_state["data"]):
+            record_to_edit = st.session_state["data"][selected_orig_idx]
+        else:
+            record_to_edit = {k: v for k, v in selected_row.to_dict().items() if k != "_orig_index"}
+
+        input_suffix = selected_orig_idx if selected_orig_idx is not None else f"new_{selected_index}"
+        col1, col2 = st.columns(2)
+        with col1:
+            new_title = st.text_input(
+                "Position Title",
+                record_to_edit.get("positionTitle", ""),
+                key=f"title_{input_suffix}",
+            )
+            new_dept = st.text_input(
+                "Department",
+                record_to_edit.get("department", ""),
+                key=f"dept_{input_suffix}",
+            )
+            current_family = record_to_edit.get("careerFamily")
+            family_index = CAREER_FAMILIES.index(current_family) if current_family in CAREER_FAMILIES else 0
+            new_family = st.selectbox(
+                "Career Family",
+                options=CAREER_FAMILIES,
+                index=family_index,
+                key=f"family_{input_suffix}",
+            )
+            new_job_level = st.text_input(
+                "Job Level",
+                record_to_edit.get("jobLevel", ""),
+                key=f"job_level_{input_suffix}",
+            )
+
+        with col2:
+            st.markdown("**Generated Content**")
+            new_duties = st.text_area(
+                "Duties",
+                record_to_edit.get("key_duties_responsibilities", ""),
+                height=150,
+                key=f"duties_{input_suffix}",
+            )
+            new_complex = st.text_area(
+                "Complexity",
+                record_to_edit.get("position_complexity", ""),
+                height=100,
+                key=f"complexity_{input_suffix}",
+            )
+            new_impact = st.text_area(
+                "Organizational Impact",
+                record_to_edit.get("organizational_impact", ""),
+                height=100,
+                key=f"impact_{input_suffix}",
+            )
+            new_progression = st.text_area(
+                "Career Progression",
+                record_to_edit.get("career_progression_path", ""),
+                height=100,
+                key=f"progression_{input_suffix}",
+            )
+
+        if st.toggle("🔎 Find similar jobs", key="show_similar"):
+            query = {
+                "positionTitle": new_title,
+                "key_duties_responsibilities": new_duties,
+                "position_complexity": new_complex,
+                "organizational_impact": new_impact,
+                "career_progression_path": new_progression,
+            }
+            exclude = [selected_orig_idx] if selected_orig_idx is not None else []
+            matches = get_similarity_index().search(query, k=SIMILAR_JOBS_COUNT, exclude=exclude)
+            if matches:
+                data = st.session_state["data"]
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            "Row ID": idx,
+                            "Position Title": data[idx].get("positionTitle"),
+                            "Department": data[idx].get("department"),
+                            "Career Family": data[idx].get("careerFamily"),
+                            "Similarity": round(score, 3),
+                        }
+                        for idx, score in matches
+                    ]),
+                    use_container_width=True,
+                    hide_index=True,
                 )
+            else:
+                st.caption("No similar jobs found.")
+
+        if st.button("Save Detail Edits", key=f"save_detail_{input_suffix}"):
+            updated_record = {
+                **{k: v for k, v in record_to_edit.items() if k != "_orig_index"},
+                "positionTitle": new_title,
+                "department": new_dept,
+                "careerFamily": new_family,
+                "jobLevel": new_job_level,
+                "key_duties_responsibilities": new_duties,
+                "position_complexity": new_complex,
+                "organizational_impact": new_impact,
+                "career_progression_path": new_progression,
+            }
 
-            if st.button("Save Detail Edits", key=f"save_detail_{input_suffix}"):
-                updated_record = {
-                    **{k: v for k, v in record_to_edit.items() if k != "_orig_index"},
-                    "positionTitle": new_title,
-                    "department": new_dept,
-                    "careerFamily": new_family,
-                    "jobLevel": new_job_level,
-                    "key_duties_responsibilities": new_duties,
-                    "position_complexity": new_complex,
-                    "organizational_impact": new_impact,
-                    "career_progression_path": new_progression,
-                }
-
-                data_copy = list(st.session_state["data"])
-                if selected_orig_idx is not None and 0 <= selected_orig_idx < len(data_copy):
-                    data_copy[selected_orig_idx] = updated_record
-                else:
-                    data_copy.append(updated_record)
-
-                st.session_state["data"] = data_copy
-                st.session_state["changelog"].append({
-                    "timestamp": datetime.now().isoformat(),
-                    "action": "detail_edit",
-                    "record_index": selected_orig_idx,
-                })
-                run_validation()
-                st.toast("Detail changes saved.", icon="💾")
-                st.rerun()
-
-        except IndexError:
-            st.write("No record selected.")
-
-        st.info("💡 Edits in the grid are saved automatically; use the detail editor for focused updates.")
+            data_copy = list(st.session_state["data"])
+            if selected_orig_idx is not None and 0 <= selected_orig_idx < len(data_copy):
+                data_copy[selected_orig_idx] = updated_record
+            else:
+                data_copy.append(updated_record)
+
+            old_data = st.session_state["data"]
+            st.session_state["data"] = data_copy
+            entry = {
+                "timestamp": datetime.now().isoformat(),
+                "action": "detail_edit",
+                "record_index": selected_orig_idx,
+            }
+            st.session_state["changelog"].append(entry)
+            mark_data_changed()
+            journal_changes(old_data, [selected_orig_idx] if selected_orig_idx is not None else [], entry)
+            run_validation()
+            st.toast("Detail changes saved.", icon="💾")
+            st.rerun()
 
-with tab_valid:
-    if st.session_state["validation_issues"]:
-        issues_df = pd.DataFrame(st.session_state["validation_issues"])
+    except IndexError:
+        st.write("No record selected.")
 
-        col_metric1, col_metric2 = st.columns(2)
-        error_count = (issues_df["Severity"] == "Error").sum()
-        warning_count = (issues_df["Severity"] == "Warning").sum()
-        col_metric1.metric("Total Issues", len(issues_df))
-        col_metric2.metric("Errors / Warnings", f"{error_count} / {warning_count}")
-        st.button("Re-run Validation", on_click=run_validation)
+    st.info("💡 Edits in the grid are saved automatically; use the detail editor for focused updates.")
 
-        st.dataframe(issues_df, use_container_width=True)
 
-        csv_issues = issues_df.to_csv(index=False).encode('utf-8')
-        st.download_button("Download Report (CSV)", csv_issues, "validation_report.csv", "text/csv")
-    else:
+@st.fragment
+def render_validation():
+    issues = st.session_state["validation_issues"]
+    if not issues:
         st.success("No validation issues found! 🎉")
+        return
+
+    severity_counts = issues.counts("severity")
+    col_metric1, col_metric2 = st.columns(2)
+    col_metric1.metric("Total Issues", len(issues))
+    col_metric2.metric(
+        "Errors / Warnings",
+        f"{severity_counts.get('Error', 0)} / {severity_counts.get('Warning', 0)}",
+    )
+    st.button("Re-run Validation", on_click=run_validation)
 
-with tab_diff:
+    with st.expander("Issues by rule"):
+        rule_counts = issues.counts("rule")
+        st.dataframe(
+            pd.DataFrame({"Rule": list(rule_counts), "Issues": list(rule_counts.values())}),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    col_sev, col_rule = st.columns(2)
+    severities = col_sev.multiselect("Severity", options=issues.values("severity"), key="issue_severity")
+    rules = col_rule.multiselect("Rule", options=issues.values("rule"), key="issue_rules")
+    positions = get_issue_selection(severities, rules)
+
+    page_count = max((len(positions) - 1) // ISSUES_PAGE_SIZE + 1, 1)
+    page = min(st.number_input("Page", min_value=1, value=1, key="issue_page"), page_count) - 1
+    st.caption(f"{len(positions)} matching issues • page {page + 1} of {page_count}")
+    st.dataframe(
+        pd.DataFrame(issues.page(page, ISSUES_PAGE_SIZE, positions), columns=ISSUE_COLUMNS),
+        use_container_width=True,
+    )
+
+    lazy_download(
+        "Report (CSV)", "export_issues_csv", (st.session_state["validation_version"], tuple(severities), tuple(rules)),
+        lambda: issues.to_csv_bytes(positions),
+        "validation_report.csv", "text/csv",
+    )
+
+
+DUTY_REPORT_SIZE = 25
+DUTY_RECORDS_LIMIT = 500
+
+
+@st.fragment
+def render_analytics():
+    stats = get_catalog_stats()
+    st.metric("Records", stats.total)
+
+    group_columns = st.columns(len(stats.group_fields))
+    for column, field in zip(group_columns, stats.group_fields):
+        counts = stats.counts(field)
+        column.markdown(f"#### By {field}")
+        column.dataframe(
+            pd.DataFrame({field: list(counts), "Records": list(counts.values())}),
+            use_container_width=True,
+            hide_index=True,
+        )
+    if any(stats.count(field, None) for field in stats.group_fields):
+        st.caption(f"{NOT_SET}: the field is missing or blank.")
+
+    st.markdown("#### Completeness")
+    st.dataframe(
+        pd.DataFrame(stats.completeness_table()),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Completeness": st.column_config.ProgressColumn("Completeness", format="percent", min_value=0, max_value=1),
+        },
+    )
+
+    st.markdown("#### Duties")
+    duties = get_duty_index()
+    top = duties.top_phrases(DUTY_REPORT_SIZE)
+    if not top:
+        st.info("No records list duties yet.")
+        return
+    st.caption(f"{len(duties)} distinct duty phrases.")
+    st.dataframe(
+        pd.DataFrame(
+            [(phrase, count, count / stats.total) for phrase, count in top],
+            columns=["Duty", "Records", "Share"],
+        ),
+        use_container_width=True,
+        hide_index=True,
+        column_config={"Share": st.column_config.NumberColumn("Share", format="percent")},
+    )
+    duty = st.selectbox("Records listing duty", options=[phrase for phrase, _ in top], key="duty_query")
+    positions = duties.records_with(duty) if duty else []
+    data = st.session_state["data"]
+    st.dataframe(
+        pd.DataFrame(
+            [
+                (i, data[i].get("positionTitle"), data[i].get("department"), data[i].get("careerFamily"))
+                for i in positions[:DUTY_RECORDS_LIMIT]
+            ],
+            columns=["Row ID", "Position Title", "Department", "Career Family"],
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
+    if len(positions) > DUTY_RECORDS_LIMIT:
+        st.caption(f"Showing the first {DUTY_RECORDS_LIMIT} of {len(positions)} records.")
+
+
+@st.fragment
+def render_diff():
     st.markdown("### Compare Original vs Current")
     diff_index = st.number_input("Record Index", 0, len(st.session_state["data"])-1, 0, key="diff_idx")
 
@@ -387,18 +960,28 @@ with tab_diff:
     else:
         st.warning("Original data index out of bounds (did you add new records?).")
 
-with tab_export:
+
+@st.fragment
+def render_export():
     st.markdown("### Download Data")
     st.write(f"{len(st.session_state['data'])} records • {len(st.session_state['changelog'])} changes in log.")
 
-    json_str = save_json_str(st.session_state["data"])
-    st.download_button(
-        label="Download Enriched JSON",
-        data=json_str,
-        file_name="job_descriptions2_enriched.json",
-        mime="application/json"
+    data_version = st.session_state["data_version"]
+    lazy_download(
+        "Enriched JSON", "export_json", data_version,
+        lambda: save_json_str(st.session_state["data"]),
+        "job_descriptions2_enriched.json", "application/json",
     )
 
+    try:
+        lazy_download(
+            "Enriched Parquet", "export_parquet", data_version,
+            lambda: save_parquet_bytes(st.session_state["data"]),
+            "job_descriptions2_enriched.parquet", "application/vnd.apache.parquet",
+        )
+    except (ImportError, ValueError) as e:
+        st.caption(f"Parquet export unavailable: {e}")
+
     log_str = generate_changelog(st.session_state["changelog"])
     st.download_button(
         label="Download Change Log",
@@ -406,3 +989,44 @@ with tab_export:
         file_name="changelog.json",
         mime="application/json",
     )
+
+
+tab_editor, tab_valid, tab_analytics, tab_diff, tab_export = st.tabs(
+    ["📝 Data Editor", "✅ Validation", "📊 Analytics", "⚖️ Diff View", "💾 Export"]
+)
+
+with tab_editor:
+    render_editor()
+    render_bulk_edit()
+    render_detail_editor()
+
+with tab_valid:
+    render_validation()
+
+with tab_analytics:
+    render_analytics()
+
+with tab_diff:
+    render_diff()
+
+with tab_export:
+    render_export()
+
+# 4. Performance
+st.sidebar.markdown("---")
+if st.sidebar.checkbox("Show performance panel", key="show_performance"):
+    perf = metrics.snapshot()
+    if perf["spans"]:
+        perf_df = pd.DataFrame.from_dict(perf["spans"], orient="index").sort_values(
+            "total_seconds", ascending=False
+        )
+        st.sidebar.dataframe(perf_df, use_container_width=True)
+        st.sidebar.caption("Peak memory is process-wide: it includes other sessions recording at the same time.")
+    else:
+        st.sidebar.caption("No stages recorded yet; interact with the app to collect timings.")
+    if perf["counters"]:
+        st.sidebar.json(perf["counters"], expanded=False)
+
+    st.sidebar.download_button("Download Metrics (Prometheus)", metrics.to_prometheus(), "metrics.prom", "text/plain")
+    st.sidebar.download_button("Download Metrics (JSON)", metrics.to_json(), "metrics.json", "application/json")
+    st.sidebar.button("Reset Metrics", on_click=metrics.reset)
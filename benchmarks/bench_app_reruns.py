@@ -0,0 +1,239 @@
+"""
+Rerun-latency benchmark for app.py, driven headlessly with Streamlit's AppTest.
+
+For each dataset size, a synthetic catalog is written as the default dataset
+in a scratch directory and the app is scripted through the common
+interactions: load, idle rerun, filter, search, grid edit, detail save,
+Auto-Enhance, export and Deduplicate. Each interaction is timed over
+``--repeats`` reruns (p50/p95/max), then run once more under tracemalloc to
+record its peak Python memory.
+
+Results are compared with a stored baseline; an interaction regresses when
+its p50 or p95 latency exceeds the baseline by more than ``--tolerance``,
+or its peak memory by more than ``--memory-tolerance``. The exit status is 1
+if anything regressed. Baselines are machine-specific: refresh them with
+``--update-baseline`` on the machine that runs the comparison.
+
+Usage: python benchmarks/bench_app_reruns.py [--sizes 1000 5000] [--repeats 5]
+       [--baseline benchmarks/baselines/app_reruns.json] [--update-baseline]
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from bench_validate import make_records  # noqa: E402
+
+APP_PATH = str(ROOT / "app.py")
+DEFAULT_BASELINE = str(Path(__file__).resolve().parent / "baselines" / "app_reruns.json")
+DEFAULT_DATA_FILE = os.path.join("data", "job_descriptions2.json")
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * q
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _sidebar_button(at: AppTest, label: str):
+    return next(b for b in at.sidebar.button if label in b.label)
+
+
+def _check(at: AppTest, step: str) -> None:
+    if at.exception:
+        raise RuntimeError(f"{step}: app raised {at.exception[0].message}")
+
+
+def _first_detail_suffix(at: AppTest) -> str:
+    return next(b.key for b in at.button if b.key and b.key.startswith("save_detail_"))[len("save_detail_"):]
+
+
+def interactions() -> List[tuple]:
+    """
+    (name, action) pairs; each action performs one user interaction and its
+    rerun. Filter and search alternate between applying and clearing.
+    """
+    state = {"edit": 0}
+
+    def load(at):
+        _sidebar_button(at, "Load Default").click().run()
+
+    def idle(at):
+        at.run()
+
+    def filter_family(at):
+        select = at.multiselect(key="filter_families")
+        select.set_value([] if select.value else [select.options[0]]).run()
+
+    def search(at):
+        box = at.text_input(key="search_term")
+        box.input("" if box.value else "Position 1").run()
+
+    def grid_edit(at):
+        state["edit"] += 1
+        at.session_state["main_editor"] = {
+            "edited_rows": {0: {"positionTitle": f"Edited {state['edit']}"}},
+            "added_rows": [],
+            "deleted_rows": [],
+        }
+        at.run()
+
+    def detail_save(at):
+        state["edit"] += 1
+        suffix = _first_detail_suffix(at)
+        at.text_input(key=f"title_{suffix}").input(f"Detail {state['edit']}")
+        at.button(key=f"save_detail_{suffix}").click().run()
+
+    def enhance(at):
+        _sidebar_button(at, "Auto-Enhance").click().run()
+
+    def export(at):
+        at.button(key="prepare_export_json").click().run()
+        at.session_state["_download_export_json"] = None  # prepare again on the next repeat
+
+    def deduplicate(at):
+        _sidebar_button(at, "Deduplicate").click().run()
+
+    return [
+        ("load", load),
+        ("idle_rerun", idle),
+        ("filter", filter_family),
+        ("search", search),
+        ("grid_edit", grid_edit),
+        ("detail_save", detail_save),
+        ("auto_enhance", enhance),
+        ("export_json", export),
+        ("deduplicate", deduplicate),
+    ]
+
+
+def measure(at: AppTest, name: str, action: Callable, repeats: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        action(at)
+        samples.append(time.perf_counter() - start)
+        _check(at, name)
+
+    tracemalloc.start()
+    try:
+        action(at)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    _check(at, name)
+
+    return {
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 1),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+        "peak_mb": round(peak / 2**20, 1),
+    }
+
+
+def run_size(count: int, repeats: int, timeout: float) -> Dict[str, Any]:
+    """Benchmarks one dataset size in a scratch working directory."""
+    previous_cwd = os.getcwd()
+    previous_env = {name: os.environ.get(name) for name in ("JDA_JOURNAL_DIR", "JDA_ENHANCE_CACHE")}
+    with tempfile.TemporaryDirectory(prefix="jda-bench-") as workdir:
+        os.makedirs(os.path.join(workdir, "data"))
+        with open(os.path.join(workdir, DEFAULT_DATA_FILE), "w", encoding="utf-8") as f:
+            json.dump(make_records(count), f)
+        os.environ["JDA_JOURNAL_DIR"] = os.path.join(workdir, "journal")
+        os.environ.pop("JDA_ENHANCE_CACHE", None)  # the default: no on-disk enhancement cache
+        st.cache_resource.clear()
+        os.chdir(workdir)
+        try:
+            at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+            at.run()
+            _check(at, "startup")
+            results = {}
+            for name, action in interactions():
+                results[name] = measure(at, name, action, repeats)
+                print(f"  {count:>7} {name:<14} p50 {results[name]['p50_ms']:>9.1f}ms  "
+                      f"p95 {results[name]['p95_ms']:>9.1f}ms  peak {results[name]['peak_mb']:>7.1f}MB")
+        finally:
+            os.chdir(previous_cwd)
+            st.cache_resource.clear()
+            for name, value in previous_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, memory_tolerance: float) -> List[str]:
+    """Regression messages for every metric above its baseline allowance."""
+    regressions = []
+    for size, steps in results.items():
+        for step, stats in steps.items():
+            reference = baseline.get(size, {}).get(step)
+            if reference is None:
+                continue
+            for metric, allowed in (("p50_ms", tolerance), ("p95_ms", tolerance), ("peak_mb", memory_tolerance)):
+                limit = reference[metric] * (1 + allowed)
+                if stats[metric] > limit:
+                    regressions.append(
+                        f"{size} records, {step}: {metric} {stats[metric]} > {reference[metric]} (+{allowed:.0%})"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app.py rerun latency and memory with AppTest.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=300, help="seconds allowed per rerun")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed latency regression (0.5 = +50%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed peak memory regression")
+    parser.add_argument("--output", help="also write the results as JSON to this path")
+    args = parser.parse_args()
+
+    print(f"app.py reruns, {args.repeats} repeats per interaction")
+    results = {str(size): run_size(size, args.repeats, args.timeout) for size in args.sizes}
+    # ru_maxrss is in KiB on Linux.
+    print(f"process peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}MB")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            baseline = json.loads(Path(args.baseline).read_text())
+        baseline.update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        Path(args.baseline).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance, args.memory_tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if regressions:
+        sys.exit(1)
+    print("no regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
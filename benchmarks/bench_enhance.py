@@ -0,0 +1,84 @@
+"""
+Compares the ways bulk enhancement can produce its fills on a synthetic
+catalog: recomputing every record, the per-distinct-input memo that
+``bulk_enhance_dicts`` uses, and the opt-in on-disk cache (cold and warm).
+Warm memo and cache hits must beat recomputing the fills, or they are not
+worth having.
+
+Usage: python benchmarks/bench_enhance.py [record_count]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.constants import CAREER_FAMILIES  # noqa: E402
+from core.enhance import _compute_fills, _missing_fills, bulk_enhance_dicts  # noqa: E402
+from core.enhance_cache import EnhancementCache, enhance_inputs  # noqa: E402
+
+
+def make_records(count: int):
+    return [
+        {
+            "positionTitle": f"Position {i % 500}",
+            "department": f"Department {i % 40}",
+            "careerFamily": CAREER_FAMILIES[i % len(CAREER_FAMILIES)],
+            "key_duties_responsibilities": f"Duty set {i % 25}" if i % 3 else None,
+            "position_complexity": "Moderate" if i % 2 else "",
+        }
+        for i in range(count)
+    ]
+
+
+def best_of(runs: int, func):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    records = make_records(count)
+
+    inputs = [enhance_inputs(record) for record in records]
+
+    def recompute():
+        # What enhancement cost before fills were shared per distinct input.
+        return [_missing_fills(values.get) for values in inputs]
+
+    with tempfile.TemporaryDirectory(prefix="jda-bench-") as workdir:
+        cache_path = os.path.join(workdir, "enhance_cache.sqlite")
+        cache = EnhancementCache(cache_path)
+
+        def cold_cache():
+            cache.clear()
+            _compute_fills(inputs, cache)
+
+        cases = [
+            ("recompute every record", recompute),
+            ("memo per distinct input", lambda: _compute_fills(inputs, None)),
+            ("on-disk cache, cold", cold_cache),
+            ("on-disk cache, warm", lambda: _compute_fills(inputs, cache)),
+            ("bulk_enhance_dicts (memo)", lambda: bulk_enhance_dicts(records)),
+        ]
+        print(f"enhancement fills over {count} records (best of 3)")
+        timings = {}
+        for label, func in cases:
+            timings[label] = best_of(3, func)
+            print(f"  {label:<28} {timings[label]:8.3f}s  "
+                  f"{timings['recompute every record'] / timings[label]:5.2f}x")
+        cache.close()
+
+    for label in ("memo per distinct input", "on-disk cache, warm"):
+        if timings[label] >= timings["recompute every record"]:
+            sys.exit(f"{label}: warm fills are not faster than recomputing them")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares the dict fast path of validate_dataset against full pydantic
+validation on a synthetic catalog.
+
+Usage: python benchmarks/bench_validate.py [record_count]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.constants import CAREER_FAMILIES  # noqa: E402
+from core.validate import validate_dataset  # noqa: E402
+from core.sharded_validate import validate_dataset_sharded  # noqa: E402
+
+
+def make_records(count: int):
+    records = []
+    for i in range(count):
+        record = {
+            "positionTitle": f"Position {i % 500}",
+            "department": f"Department {i % 40}",
+            "careerFamily": CAREER_FAMILIES[i % len(CAREER_FAMILIES)] if i % 17 else "Unlisted Family",
+            "jobLevel": "Senior" if i % 3 == 0 else "Intermediate",
+            "key_duties_responsibilities": f"Duty set {i % 250}" if i % 5 else "",
+            "position_complexity": "Entry level work" if i % 11 == 0 else "Moderate",
+            "positionNumber": f"P{i:06d}",
+        }
+        if i % 97 == 0:
+            del record["department"]  # schema failure handled by pydantic
+        records.append(record)
+    return records
+
+
+def best_of(runs: int, func):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    records = make_records(count)
+
+    cases = [
+        ("pydantic, issues only", lambda: validate_dataset(records, build_models=False, fast_path=False)),
+        ("pydantic, models", lambda: validate_dataset(records)),
+        ("fast path, issues only", lambda: validate_dataset(records, build_models=False)),
+        ("sharded, process pool", lambda: validate_dataset_sharded(records)),
+    ]
+
+    baseline = None
+    print(f"validate_dataset over {count} records (best of 3)")
+    for label, func in cases:
+        seconds = best_of(3, func)
+        baseline = baseline or seconds
+        print(f"  {label:<28} {seconds:8.3f}s  {baseline / seconds:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
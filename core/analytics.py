@@ -0,0 +1,196 @@
+"""
+Catalog analytics maintained incrementally.
+
+``CatalogStats`` keeps record counts per ``careerFamily``, ``department``
+and ``jobLevel`` value, and the number of records with each narrative and
+qualification field filled in. Every statistic is a running counter, so
+adding, removing or replacing a record costs O(fields) and reading a count
+or completeness rate is a dictionary lookup; nothing is regrouped on read.
+
+``refresh(records)`` brings the counters up to date with a new version of
+the data. Counters do not depend on positions, so unlike the positional
+indexes (``core.incremental``) it matches records by identity wherever they
+moved: a deduplication only subtracts the dropped records and an edit only
+swaps the edited ones.
+
+Run ``python -m core.analytics <catalog>`` for the same report on the
+command line.
+"""
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+from core import metrics
+
+GROUP_FIELDS = ["careerFamily", "department", "jobLevel"]
+COMPLETENESS_FIELDS = [
+    "key_duties_responsibilities",
+    "position_complexity",
+    "organizational_impact",
+    "career_progression_path",
+    "minimum_qualifications",
+    "preferred_qualifications",
+    "technical_skills",
+    "soft_skills",
+]
+# Group value for records where the field is missing or blank.
+NOT_SET = "(not set)"
+
+
+def group_value(value: Any) -> str:
+    text = str(value).strip() if value is not None else ""
+    return text or NOT_SET
+
+
+def is_filled(value: Any) -> bool:
+    """Same notion of "empty" as the validation rules: None or whitespace-only text."""
+    if value is None:
+        return False
+    return bool(value.strip()) if isinstance(value, str) else True
+
+
+class CatalogStats:
+    """
+    Running group counts and field completeness over a list of records.
+    Build with ``from_records`` and keep current with ``refresh`` (or
+    ``add``/``remove``/``replace``).
+    """
+
+    def __init__(self, group_fields: List[str] = GROUP_FIELDS, completeness_fields: List[str] = COMPLETENESS_FIELDS):
+        self.group_fields = list(group_fields)
+        self.completeness_fields = list(completeness_fields)
+        self.total = 0
+        self._groups: Dict[str, Counter] = {field: Counter() for field in self.group_fields}
+        self._filled: Dict[str, int] = dict.fromkeys(self.completeness_fields, 0)
+        self._records: List[Dict[str, Any]] = []
+
+    @classmethod
+    @metrics.timed("analytics.build")
+    def from_records(cls, records: List[Dict[str, Any]], **kwargs) -> "CatalogStats":
+        stats = cls(**kwargs)
+        for record in records:
+            stats.add(record)
+        stats._records = list(records)
+        return stats
+
+    def _apply(self, record: Dict[str, Any], sign: int) -> None:
+        self.total += sign
+        for field in self.group_fields:
+            counter = self._groups[field]
+            key = group_value(record.get(field))
+            counter[key] += sign
+            if not counter[key]:
+                del counter[key]
+        for field in self.completeness_fields:
+            if is_filled(record.get(field)):
+                self._filled[field] += sign
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self._apply(record, 1)
+
+    def remove(self, record: Dict[str, Any]) -> None:
+        self._apply(record, -1)
+
+    def replace(self, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        self.remove(old)
+        self.add(new)
+
+    def refresh(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Updates the counters from the previously seen records to ``records``.
+        Only records that are not in both versions are counted in or out.
+        Returns the number of records added plus removed.
+        """
+        previous = self._records
+        dropped: Dict[int, List[Dict[str, Any]]] = {}
+        added: List[Dict[str, Any]] = []
+        for i in range(max(len(records), len(previous))):
+            old = previous[i] if i < len(previous) else None
+            new = records[i] if i < len(records) else None
+            if old is new:
+                continue
+            if old is not None:
+                dropped.setdefault(id(old), []).append(old)
+            if new is not None:
+                added.append(new)
+
+        # A record that only moved (e.g. rows shifted by deduplication) cancels out.
+        still_added = []
+        for record in added:
+            same = dropped.get(id(record))
+            if same:
+                same.pop()
+            else:
+                still_added.append(record)
+        still_dropped = [record for group in dropped.values() for record in group]
+
+        for record in still_dropped:
+            self.remove(record)
+        for record in still_added:
+            self.add(record)
+        self._records = list(records)
+        changed = len(still_added) + len(still_dropped)
+        metrics.count("analytics.refreshed", changed)
+        return changed
+
+    def count(self, field: str, value: Any) -> int:
+        return self._groups[field].get(group_value(value), 0)
+
+    def counts(self, field: str) -> Dict[str, int]:
+        """Record count per value of ``field``, largest first."""
+        return dict(self._groups[field].most_common())
+
+    def filled(self, field: str) -> int:
+        return self._filled[field]
+
+    def completeness(self, field: str) -> float:
+        """Share of records (0.0-1.0) with ``field`` filled in."""
+        return self._filled[field] / self.total if self.total else 0.0
+
+    def completeness_table(self) -> List[Dict[str, Any]]:
+        return [
+            {"Field": field, "Filled": self._filled[field], "Completeness": self.completeness(field)}
+            for field in self.completeness_fields
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """All statistics as plain data (for JSON output)."""
+        return {
+            "total": self.total,
+            "counts": {field: self.counts(field) for field in self.group_fields},
+            "completeness": {field: self.completeness(field) for field in self.completeness_fields},
+        }
+
+
+def _format_report(stats: CatalogStats, top: int) -> Iterable[str]:
+    yield f"Records: {stats.total}"
+    for field in stats.group_fields:
+        counts = stats.counts(field)
+        yield ""
+        yield f"By {field} ({len(counts)} values):"
+        for value, n in list(counts.items())[:top]:
+            yield f"  {n:>8}  {value}"
+        if len(counts) > top:
+            yield f"  ... {len(counts) - top} more"
+    yield ""
+    yield "Completeness:"
+    for row in stats.completeness_table():
+        yield f"  {row['Completeness']:>7.1%}  {row['Field']} ({row['Filled']})"
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from core import io as catalog_io
+
+    parser = argparse.ArgumentParser(description="Print group counts and field completeness of a catalog file.")
+    parser.add_argument("source")
+    parser.add_argument("--top", type=int, default=10, help="values listed per group field")
+    parser.add_argument("--json", action="store_true", help="print the full statistics as JSON")
+    args = parser.parse_args()
+    with open(args.source, "rb") as f:
+        stats = CatalogStats.from_records(catalog_io.load_records(f, args.source))
+    if args.json:
+        print(json.dumps(stats.summary(), indent=2, ensure_ascii=False))
+    else:
+        print("\n".join(_format_report(stats, args.top)))
@@ -0,0 +1,115 @@
+"""
+Specialized record check generated from the ``JobRecord`` fields.
+
+``JobRecord`` is a general pydantic model, and validating one per row is the
+main per-record cost of validation and enhancement. This module reads the model's field definitions and
+generates ``check_record(raw)``, unrolled field by field: True if pydantic
+would accept ``raw`` and keep every declared value unchanged. Only exact
+``str`` values (and ``None`` or absent for optional fields) pass; anything
+pydantic might coerce or reject returns False, so callers fall back to the
+model, which stays the reference implementation for errors and coercion.
+Callers that pass the check read the dict directly instead of building a
+model (``JobRecord.model_construct`` is slower than pydantic's own
+validation, so there is nothing to gain from constructing one).
+
+The function is generated at import, so it always matches the schema; a
+field type the generator does not specialize makes ``check_record`` always
+return False. ``python -m core.codegen`` prints the generated source.
+"""
+import linecache
+from types import UnionType
+from typing import Any, Callable, Dict, List, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+from core.schema import JobRecord
+
+
+def _field_kind(info) -> Tuple[str, Any] | None:
+    """
+    ("required", None), ("optional", default) or ("nullable", default) for a
+    plain or optional string field, else None. Aliases, default factories and
+    constraints (``max_length`` etc.) are left to pydantic.
+    """
+    if info.alias is not None or info.validation_alias is not None or info.default_factory is not None:
+        return None
+    if info.metadata:
+        return None
+    annotation = info.annotation
+    if annotation is str:
+        if info.is_required():
+            return "required", None
+        if type(info.default) is str:
+            return "optional", info.default
+        return None
+    if (
+        get_origin(annotation) in (Union, UnionType)
+        and set(get_args(annotation)) == {str, type(None)}
+        and not info.is_required()
+        and info.default is not PydanticUndefined
+        and (info.default is None or type(info.default) is str)
+    ):
+        return "nullable", info.default
+    return None
+
+
+def generate_source(model: Type[BaseModel] = JobRecord) -> str:
+    """Python source of ``check_record`` for ``model``."""
+    fields = list(model.model_fields.items())
+    check: List[str] = [
+        "def check_record(raw):",
+        "    if type(raw) is not dict:",
+        "        return False",
+        "    get = raw.get",
+    ]
+    decorators = model.__pydantic_decorators__
+    if decorators.validators or decorators.field_validators or decorators.model_validators:
+        check.append("    return False  # the model has custom validators")
+    for name, info in fields:
+        kind = _field_kind(info)
+        if kind is None:
+            check.append(f"    return False  # {name}: {info.annotation!r} is not specialized")
+            continue
+        kind, default = kind
+        if kind == "required":
+            check += [f"    if type(get({name!r})) is not str:", "        return False"]
+        elif kind == "optional":
+            check += [
+                f"    value = get({name!r}, {default!r})",
+                "    if type(value) is not str:",
+                "        return False",
+            ]
+        else:
+            check += [
+                f"    value = get({name!r}, {default!r})",
+                "    if value is not None and type(value) is not str:",
+                "        return False",
+            ]
+    # Extra keys: kept (extra="allow"), dropped (the default "ignore") or rejected ("forbid").
+    extra = model.model_config.get("extra") or "ignore"
+    if extra == "forbid":
+        check += ["    if not raw.keys() <= DECLARED:", "        return False"]
+    check.append("    return True")
+
+    declared = ", ".join(repr(name) for name, _ in fields)
+    header = f"DECLARED = frozenset(({declared}{',' if len(fields) == 1 else ''}))"
+    return "\n".join([header, "", ""] + check) + "\n"
+
+
+def compile_check(model: Type[BaseModel] = JobRecord) -> Callable[[Any], bool]:
+    """Generates, compiles and returns ``check_record`` for ``model``."""
+    source = generate_source(model)
+    filename = f"<generated check for {model.__name__}>"
+    # Register the source so tracebacks through the generated code show it.
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace["check_record"]
+
+
+check_record = compile_check(JobRecord)
+
+
+if __name__ == "__main__":
+    print(generate_source(JobRecord), end="")
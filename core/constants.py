@@ -164,4 +164,38 @@ FALLBACK_COMPLEXITY = "Moderate: Work involves a mix of routine and non-routine
 
 FALLBACK_IMPACT = "Moderate: Quality and timeliness of work affect the efficiency and effectiveness of departmental operations and the experience of students, faculty, staff, and other stakeholders."
 
-FALLBACK_PROGRESSION = "Career progression may include movement to more senior or specialized roles within the same functional area, as well as opportunities to assume supervisory, managerial, or cross-functional responsibilities."
\ No newline at end of file
+FALLBACK_PROGRESSION = "Career progression may include movement to more senior or specialized roles within the same functional area, as well as opportunities to assume supervisory, managerial, or cross-functional responsibilities."
+
+# --- KEYWORD RULES ---
+# Keyword groups scanned by core.keywords (case-insensitive, whole words).
+
+LEVEL_KEYWORDS = {
+    "senior_level": ["Senior", "Sr", "Lead", "Principal", "Manager", "Director", "Head", "Chief", "Executive"],
+    "entry_level": ["Entry", "Entry Level", "Junior", "Jr", "Trainee", "Intern", "Apprentice"],
+}
+
+FLSA_KEYWORDS = {
+    "flsa_non_exempt": ["Non-Exempt", "Nonexempt", "Non Exempt", "Hourly"],
+    "flsa_exempt": ["Exempt", "Salaried"],
+}
+
+# Exclusionary, informal, or placeholder wording that should not appear in published descriptions.
+BANNED_PHRASES = [
+    "rockstar",
+    "rock star",
+    "ninja",
+    "guru",
+    "superstar",
+    "digital native",
+    "native English speaker",
+    "recent graduate",
+    "young and energetic",
+    "manpower",
+    "lorem ipsum",
+    "TBD",
+    "TODO",
+    "insert text here",
+]
+
+# Standard Occupational Classification code: "15-1252", optionally with an O*NET suffix ("15-1252.00").
+SOC_CODE_PATTERN = r"\d{2}-\d{4}(?:\.\d{2})?"
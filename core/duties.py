@@ -0,0 +1,162 @@
+"""
+Duty-phrase index over ``key_duties_responsibilities``.
+
+Duties are stored as one semicolon-joined string per record. ``DutyIndex``
+splits each string into phrases, normalizes them (case, whitespace and
+trailing punctuation) and interns every distinct phrase to an integer ID.
+For each ID it keeps a posting list of the record positions containing the
+phrase, and for each record the IDs of its phrases, so "which records list
+duty X" and "how many records list duty X" are lookups rather than text
+scans, and re-indexing an edited record only touches its own phrases.
+
+``refresh(records)`` re-indexes the positions whose record dict was
+replaced since the last refresh (see ``core.incremental``).
+"""
+import heapq
+from typing import Any, Dict, List, Set, Tuple
+
+from core import metrics
+from core.incremental import PositionalIndex
+
+DUTIES_FIELD = "key_duties_responsibilities"
+# Raw parts remembered for interning; past this the memo is dropped and refilled.
+PART_CACHE_LIMIT = 65536
+
+
+def _parts(text: Any) -> List[str]:
+    return str(text).replace("\n", ";").split(";") if text else []
+
+
+def _clean(part: str) -> str:
+    return " ".join(part.split()).strip(" .,")
+
+
+def split_duties(text: Any) -> List[str]:
+    """The non-empty duty phrases of a semicolon- (or newline-) separated duties string."""
+    phrases = (_clean(part) for part in _parts(text))
+    return [phrase for phrase in phrases if phrase]
+
+
+def normalize_duty(phrase: str) -> str:
+    """Key under which equivalent phrasings of a duty are counted together."""
+    return " ".join(phrase.split()).strip(" .,;").lower()
+
+
+class DutyIndex(PositionalIndex):
+    """
+    Interned duty phrases with posting lists of record positions. Build with
+    ``from_records``, keep current with ``refresh`` (or ``update``/``remove``),
+    and query with ``records_with``, ``frequency`` and ``top_phrases``.
+    """
+
+    metrics_name = "duties"
+
+    def __init__(self, field: str = DUTIES_FIELD):
+        self.field = field
+        self._clear()
+
+    def _clear(self) -> None:
+        self._ids: Dict[str, int] = {}
+        # Exact raw text of a split part -> phrase ID (None for blank parts), skipping normalization.
+        self._part_ids: Dict[str, int | None] = {}
+        self._phrases: List[str] = []  # display form: first spelling seen
+        self._postings: List[Set[int]] = []
+        self._record_ids: Dict[int, Tuple[int, ...]] = {}
+        self._records: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], field: str = DUTIES_FIELD) -> "DutyIndex":
+        index = cls(field)
+        index._index_all(records)
+        return index
+
+    @metrics.timed("duties.build")
+    def _index_all(self, records: List[Dict[str, Any]]) -> None:
+        # Starting over also drops phrases and parts that no record lists any more.
+        self._clear()
+        # Templated duties repeat across records: split and intern each distinct text once.
+        text_ids: Dict[Any, Tuple[int, ...]] = {}
+        for position, record in enumerate(records):
+            text = record.get(self.field)
+            ids = text_ids.get(text) if isinstance(text, str) else None
+            if ids is None:
+                ids = self._phrase_ids(text)
+                if isinstance(text, str):
+                    text_ids[text] = ids
+            for phrase_id in ids:
+                self._postings[phrase_id].add(position)
+            if ids:
+                self._record_ids[position] = ids
+        self._records = list(records)
+
+    def __len__(self) -> int:
+        """Distinct phrases listed by at least one record."""
+        return sum(1 for postings in self._postings if postings)
+
+    def _intern(self, part: str) -> int | None:
+        if part in self._part_ids:
+            return self._part_ids[part]
+        phrase = _clean(part)
+        if phrase:
+            key = normalize_duty(phrase)
+            phrase_id = self._ids.get(key)
+            if phrase_id is None:
+                phrase_id = self._ids[key] = len(self._phrases)
+                self._phrases.append(phrase)
+                self._postings.append(set())
+        else:
+            phrase_id = None
+        if len(self._part_ids) >= PART_CACHE_LIMIT:
+            self._part_ids.clear()
+        self._part_ids[part] = phrase_id
+        return phrase_id
+
+    def _phrase_ids(self, text: Any) -> Tuple[int, ...]:
+        ids = dict.fromkeys(self._intern(part) for part in _parts(text))
+        ids.pop(None, None)
+        return tuple(ids)
+
+    def update(self, position: int, record: Dict[str, Any] | None) -> None:
+        """(Re-)indexes the record at ``position``; None removes it."""
+        old_ids = self._record_ids.pop(position, ())
+        for phrase_id in old_ids:
+            self._postings[phrase_id].discard(position)
+        if record is None:
+            return
+        new_ids = self._phrase_ids(record.get(self.field))
+        for phrase_id in new_ids:
+            self._postings[phrase_id].add(position)
+        if new_ids:
+            self._record_ids[position] = new_ids
+
+    def remove(self, position: int) -> None:
+        self.update(position, None)
+
+    def _reindex(self, position: int, record: Dict[str, Any] | None) -> None:
+        self.update(position, record)
+
+    def phrase_id(self, phrase: str) -> int | None:
+        return self._ids.get(normalize_duty(phrase))
+
+    def phrase(self, phrase_id: int) -> str:
+        return self._phrases[phrase_id]
+
+    def records_with(self, phrase: str) -> List[int]:
+        """Positions of the records listing ``phrase``, in ascending order."""
+        phrase_id = self.phrase_id(phrase)
+        return sorted(self._postings[phrase_id]) if phrase_id is not None else []
+
+    def frequency(self, phrase: str) -> int:
+        """Number of records listing ``phrase``."""
+        phrase_id = self.phrase_id(phrase)
+        return len(self._postings[phrase_id]) if phrase_id is not None else 0
+
+    def phrases_of(self, position: int) -> List[str]:
+        """The duty phrases of the record at ``position``, in the order listed."""
+        return [self._phrases[phrase_id] for phrase_id in self._record_ids.get(position, ())]
+
+    def top_phrases(self, n: int = 20, min_records: int = 1) -> List[Tuple[str, int]]:
+        """The ``n`` most frequent phrases as (phrase, record count), most frequent first."""
+        counts = ((len(postings), -phrase_id) for phrase_id, postings in enumerate(self._postings))
+        top = heapq.nlargest(n, (c for c in counts if c[0] >= min_records))
+        return [(self._phrases[-negative_id], count) for count, negative_id in top]
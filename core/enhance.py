@@ -1,6 +1,9 @@
-from typing import List, Tuple
-import copy
+from typing import Any, Dict, List, Tuple
+from pydantic import ValidationError
 from core.schema import JobRecord
+from core.codegen import check_record
+from core import metrics
+from core.enhance_cache import EnhancementCache, enhance_inputs
 from core.constants import (
     DUTIES_TEMPLATES,
     COMPLEXITY_TEMPLATES,
@@ -24,51 +27,122 @@ def get_family_value(template_map: dict, family: str, default: str) -> str:
     """Retrieves value from map based on family, or returns default."""
     return template_map.get(family, default)
 
+def _missing_fills(get) -> Dict[str, str]:
+    """Template values for the narrative fields that need filling, read through a field getter."""
+    family = get("careerFamily")
+    filled = {}
+    # 1. Duties
+    if needs_filling(get("key_duties_responsibilities")):
+        filled["key_duties_responsibilities"] = get_family_value(DUTIES_TEMPLATES, family, FALLBACK_DUTIES)
+    # 2. Complexity
+    if needs_filling(get("position_complexity")):
+        filled["position_complexity"] = get_family_value(COMPLEXITY_TEMPLATES, family, FALLBACK_COMPLEXITY)
+    # 3. Impact
+    if needs_filling(get("organizational_impact")):
+        filled["organizational_impact"] = get_family_value(IMPACT_TEMPLATES, family, FALLBACK_IMPACT)
+    # 4. Progression
+    if needs_filling(get("career_progression_path")):
+        filled["career_progression_path"] = get_family_value(PROGRESSION_TEMPLATES, family, FALLBACK_PROGRESSION)
+    return filled
+
+
 def enhance_record(record: JobRecord) -> Tuple[JobRecord, bool]:
     """
     Fills missing fields in a JobRecord based on its careerFamily.
     Returns a tuple of (enhanced_record, changed_bool).
     """
-    # Create a copy to avoid mutating the original in place immediately
-    # (though Pydantic models are mutable by default, treating as immutable here helps tracking)
-    new_record = record.model_copy()
-    changed = False
-    family = new_record.careerFamily
+    # Copy rather than mutate: callers compare the original and enhanced records.
+    filled = _missing_fills(lambda name: getattr(record, name))
+    return record.model_copy(update=filled), bool(filled)
 
-    # 1. Duties
-    if needs_filling(new_record.key_duties_responsibilities):
-        new_record.key_duties_responsibilities = get_family_value(DUTIES_TEMPLATES, family, FALLBACK_DUTIES)
-        changed = True
-
-    # 2. Complexity
-    if needs_filling(new_record.position_complexity):
-        new_record.position_complexity = get_family_value(COMPLEXITY_TEMPLATES, family, FALLBACK_COMPLEXITY)
-        changed = True
 
-    # 3. Impact
-    if needs_filling(new_record.organizational_impact):
-        new_record.organizational_impact = get_family_value(IMPACT_TEMPLATES, family, FALLBACK_IMPACT)
-        changed = True
+def _compute_fills(inputs: List[Dict[str, Any]], cache: EnhancementCache | None) -> List[Dict[str, str]]:
+    """
+    Fills for each record's enhancement inputs (see ``enhance_inputs``).
+    Catalogs repeat the same inputs across many records, so fills are computed
+    (or, with a ``cache``, looked up) once per distinct input and shared by
+    the records that have it; the returned dicts must not be modified. With a
+    ``cache``, new results are written back in one batch.
+    """
+    distinct: Dict[Tuple, Dict[str, Any]] = {}
+    # enhance_inputs always lists the same fields in the same order.
+    input_keys = [tuple(values.values()) for values in inputs]
+    for key, values in zip(input_keys, inputs):
+        if key not in distinct:
+            distinct[key] = values
 
-    # 4. Progression
-    if needs_filling(new_record.career_progression_path):
-        new_record.career_progression_path = get_family_value(PROGRESSION_TEMPLATES, family, FALLBACK_PROGRESSION)
-        changed = True
+    if cache is None:
+        results = {key: _missing_fills(values.get) for key, values in distinct.items()}
+    else:
+        fingerprints = {key: cache.fingerprint(values) for key, values in distinct.items()}
+        cached = cache.get_many(fingerprints.values())
+        results = {}
+        computed = {}
+        for key, values in distinct.items():
+            entry = cached.get(fingerprints[key])
+            if entry is None:
+                filled = _missing_fills(values.get)
+                computed[fingerprints[key]] = (filled, bool(filled))
+            else:
+                filled = entry[0]
+            results[key] = filled
+        cache.put_many((fingerprint, filled, changed) for fingerprint, (filled, changed) in computed.items())
+        hits = len(distinct) - len(computed)
+        cache.hits += hits
+        cache.misses += len(computed)
+        metrics.count("enhance.cache_hits", hits)
+    metrics.count("enhance.distinct_inputs", len(distinct))
+    return [results[key] for key in input_keys]
 
-    return new_record, changed
 
-def bulk_enhance(records: List[JobRecord]) -> Tuple[List[JobRecord], int]:
+@metrics.timed("enhance.bulk_enhance")
+def bulk_enhance(records: List[JobRecord], cache: EnhancementCache | None = None) -> Tuple[List[JobRecord], int]:
     """
     Enhances a list of records.
     Returns (list of enhanced records, count of records modified).
+
+    Fills are computed once per distinct set of enhancement inputs. With a
+    ``cache``, inputs seen in earlier runs (under the current template set)
+    reuse the stored result; new results are written back in one batch.
     """
-    enhanced_list = []
-    modified_count = 0
-    
-    for rec in records:
-        enhanced_rec, changed = enhance_record(rec)
-        enhanced_list.append(enhanced_rec)
-        if changed:
-            modified_count += 1
-            
-    return enhanced_list, modified_count
\ No newline at end of file
+    fills = _compute_fills([enhance_inputs(rec) for rec in records], cache)
+    enhanced_list = [rec.model_copy(update=filled) for rec, filled in zip(records, fills)]
+    modified_count = sum(1 for filled in fills if filled)
+
+    metrics.count("enhance.records", len(records))
+    metrics.count("enhance.modified", modified_count)
+    return enhanced_list, modified_count
+
+
+@metrics.timed("enhance.bulk_enhance_dicts")
+def bulk_enhance_dicts(
+    records: List[Dict[str, Any]], cache: EnhancementCache | None = None
+) -> Tuple[List[Dict[str, str] | None], int]:
+    """
+    Dict counterpart of ``bulk_enhance`` that builds no models: returns the
+    fields to fill for each record (``{}`` if complete, None if the record
+    fails the JobRecord schema) and the count of records modified.
+
+    Records passing the generated ``check_record`` are read directly; only
+    the others go through pydantic, to apply its coercions or reject them.
+    """
+    inputs = []
+    positions = []
+    for position, raw in enumerate(records):
+        if check_record(raw):
+            inputs.append(enhance_inputs(raw))
+        else:
+            try:
+                inputs.append(enhance_inputs(JobRecord(**raw)))
+            except (ValidationError, TypeError):
+                continue
+        positions.append(position)
+
+    fills: List[Dict[str, str] | None] = [None] * len(records)
+    for position, filled in zip(positions, _compute_fills(inputs, cache)):
+        fills[position] = filled
+    modified_count = sum(1 for filled in fills if filled)
+
+    metrics.count("enhance.records", len(positions))
+    metrics.count("enhance.modified", modified_count)
+    return fills, modified_count
@@ -0,0 +1,180 @@
+"""
+Persistent, content-addressed cache for record enhancement.
+
+Entries are keyed by a hash of the fields enhancement reads (careerFamily and
+the four narrative fields) together with a digest of the template set in
+``core.constants``. Editing any template changes the digest, so stale entries
+stop matching and are purged the next time the cache is opened. The cache is a
+SQLite file with a byte-size cap enforced by least-recently-used eviction.
+
+Template fills are cheap enough that within one run an in-memory memo per
+distinct input (see ``core.enhance``) beats any lookup; the app only opens
+this cache when ``JDA_ENHANCE_CACHE`` names a cache file.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Tuple
+
+from core import constants
+
+# Fields enhance_record reads; anything else cannot change its output.
+ENHANCE_INPUT_FIELDS = [
+    "careerFamily",
+    "key_duties_responsibilities",
+    "position_complexity",
+    "organizational_impact",
+    "career_progression_path",
+]
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_CACHE_PATH = os.path.join(".cache", "enhance_cache.sqlite")
+
+
+def template_set_version() -> str:
+    """Returns a digest of every template and fallback used by enhancement."""
+    payload = json.dumps(
+        [
+            constants.DUTIES_TEMPLATES,
+            constants.COMPLEXITY_TEMPLATES,
+            constants.IMPACT_TEMPLATES,
+            constants.PROGRESSION_TEMPLATES,
+            constants.FALLBACK_DUTIES,
+            constants.FALLBACK_COMPLEXITY,
+            constants.FALLBACK_IMPACT,
+            constants.FALLBACK_PROGRESSION,
+        ],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def record_fingerprint(values: Dict[str, Any], version: str) -> str:
+    """Hashes the enhancement inputs of one record under a template version."""
+    payload = json.dumps([version] + [values.get(name) for name in ENHANCE_INPUT_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EnhancementCache:
+    """
+    SQLite-backed LRU cache mapping record fingerprints to enhancement output
+    (the filled narrative fields and whether anything changed). Safe to share
+    across Streamlit sessions; access is serialized with a lock.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = template_set_version()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, version TEXT NOT NULL, value TEXT NOT NULL,"
+                " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            # A template change invalidates everything written under the old set.
+            self._conn.execute("DELETE FROM entries WHERE version != ?", (self.version,))
+            self._clock = self._conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM entries").fetchone()[0]
+
+    def _tick(self) -> float:
+        """Strictly increasing LRU timestamp, so same-instant accesses still order."""
+        self._clock = max(time.time(), self._clock + 1e-6)
+        return self._clock
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def fingerprint(self, values: Dict[str, Any]) -> str:
+        return record_fingerprint(values, self.version)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Tuple[Dict[str, str], bool]]:
+        """Looks up several fingerprints at once and refreshes their LRU position."""
+        unique_keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock, self._conn:
+            now = self._tick()
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, value in rows:
+                    fields, changed = json.loads(value)
+                    found[key] = (fields, changed)
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key, _ in rows]
+                    )
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, str], bool]]) -> None:
+        """Stores (fingerprint, filled fields, changed) entries, then enforces the size cap."""
+        encoded = []
+        for key, fields, changed in items:
+            value = json.dumps([fields, changed], ensure_ascii=False)
+            encoded.append((key, value))
+        if not encoded:
+            return
+        with self._lock, self._conn:
+            now = self._tick()
+            rows = [(key, self.version, value, len(value.encode("utf-8")), now) for key, value in encoded]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, version, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_used ASC"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+
+def enhance_inputs(record) -> Dict[str, Any]:
+    """Extracts the enhancement input fields from a JobRecord or a record dict."""
+    if isinstance(record, dict):
+        return {name: record.get(name) for name in ENHANCE_INPUT_FIELDS}
+    return {name: getattr(record, name, None) for name in ENHANCE_INPUT_FIELDS}
+
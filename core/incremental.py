@@ -0,0 +1,70 @@
+"""
+Identity-diff refresh shared by the incremental indexes.
+
+Edits replace record dicts rather than mutating them, so the positions to
+re-index after a change are the ones whose record object differs (by
+identity) from the list seen at the last refresh, plus any positions past
+the end of the new list. ``PositionalIndex.refresh`` applies that diff
+position by position, or rebuilds the whole index in one pass when most
+positions changed, e.g. after a deduplication shifted every row below the
+first dropped one.
+"""
+from typing import Any, Dict, List, Tuple
+
+from core import metrics
+
+
+def changed_positions(
+    previous: List[Dict[str, Any]], records: List[Dict[str, Any]]
+) -> Tuple[List[int], range]:
+    """Positions whose record object was replaced or added, and positions removed from the end."""
+    changed = [i for i in range(len(records)) if i >= len(previous) or records[i] is not previous[i]]
+    return changed, range(len(records), len(previous))
+
+
+class PositionalIndex:
+    """
+    Base for indexes over records addressed by their position in the dataset.
+    Subclasses implement ``_index_all`` (reset and index every record in one
+    pass) and ``_reindex`` (index one position; None removes it), and may
+    override ``_before_updates``/``_after_updates`` around a batch of them.
+    """
+
+    # Prefix of the "<name>.refresh" span and "<name>.refreshed" counter.
+    metrics_name = "index"
+
+    _records: List[Dict[str, Any]]
+
+    def _index_all(self, records: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def _reindex(self, position: int, record: Dict[str, Any] | None) -> None:
+        raise NotImplementedError
+
+    def _before_updates(self, size: int) -> None:
+        pass
+
+    def _after_updates(self) -> None:
+        pass
+
+    def refresh(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Brings the index up to date with ``records``, re-indexing only the
+        positions whose record object changed since the last refresh.
+        Returns the number of positions updated.
+        """
+        with metrics.span(f"{self.metrics_name}.refresh"):
+            changed, removed = changed_positions(self._records, records)
+            updated = len(changed) + len(removed)
+            if updated > len(records) // 2:
+                self._index_all(records)
+                return updated
+            self._before_updates(len(records))
+            for position in changed:
+                self._reindex(position, records[position])
+            for position in removed:
+                self._reindex(position, None)
+            self._records = list(records)
+            self._after_updates()
+        metrics.count(f"{self.metrics_name}.refreshed", updated)
+        return updated
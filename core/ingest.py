@@ -0,0 +1,301 @@
+"""
+Streaming ingestion of uploaded catalogs.
+
+``load_upload`` reads an uploaded file in fixed-size chunks instead of
+holding its bytes and the parsed list in memory together. Uploads may be
+compressed with gzip, zstd (needs the optional ``zstandard`` package) or
+zip (one catalog per archive); the compression is detected from the file
+name or the leading magic bytes, and the inner format from the remaining
+extension. JSON arrays are decoded element by element and JSON Lines line
+by line as chunks arrive; Parquet and Arrow files need random access, so
+they are decompressed into memory first and parsed whole.
+
+Two limits stop a load early with a ``ValueError``: ``max_records`` caps
+the number of records parsed and ``max_decompressed_bytes`` caps the bytes
+read after decompression, which stops a small, highly compressed upload
+from expanding without bound. Neither is a memory limit: parsed records
+take several times their JSON size, so size them together against the
+memory available. ``progress`` is called with the fraction of the upload
+read and the records parsed so far.
+"""
+import codecs
+import gzip
+import io
+import json
+import os
+import re
+import zipfile
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from core import metrics
+from core.io import load_arrow, load_parquet
+from core.ndjson import iter_ndjson
+
+try:  # zstd uploads are optional
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CHUNK_SIZE = 1 << 20
+DEFAULT_MAX_RECORDS = 1_000_000
+DEFAULT_MAX_DECOMPRESSED_BYTES = 512 * 1024 * 1024
+
+COMPRESSED_EXTENSIONS = {".gz": "gzip", ".gzip": "gzip", ".zst": "zstd", ".zstd": "zstd", ".zip": "zip"}
+CATALOG_EXTENSIONS = (".json", ".jsonl", ".ndjson", ".parquet", ".arrow", ".feather", ".ipc")
+
+_MAGIC = [(b"\x1f\x8b", "gzip"), (b"\x28\xb5\x2f\xfd", "zstd"), (b"PK\x03\x04", "zip")]
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+ProgressCallback = Callable[[float, int], None]
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / 2**20:,.0f} MB"
+
+
+def _sniff(file_obj) -> bytes:
+    """The first bytes of a seekable binary upload, leaving its position unchanged."""
+    try:
+        start = file_obj.tell()
+        head = file_obj.read(4)
+        file_obj.seek(start)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return b""
+    return head if isinstance(head, bytes) else b""
+
+
+def _upload_size(file_obj) -> int | None:
+    size = getattr(file_obj, "size", None)
+    if isinstance(size, int):
+        return size
+    try:
+        start = file_obj.tell()
+        size = file_obj.seek(0, os.SEEK_END)
+        file_obj.seek(start)
+        return size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def detect_compression(file_obj, file_name: str = "") -> Tuple[str | None, str]:
+    """
+    Returns (compression, inner file name): compression is "gzip", "zstd",
+    "zip" or None, taken from the extension or else from the magic bytes.
+    """
+    root, extension = os.path.splitext(file_name)
+    compression = COMPRESSED_EXTENSIONS.get(extension.lower())
+    if compression is not None:
+        return compression, root
+    head = _sniff(file_obj)
+    for magic, name in _MAGIC:
+        if head.startswith(magic):
+            return name, file_name
+    return None, file_name
+
+
+def _zip_member(archive: zipfile.ZipFile, max_decompressed_bytes: int | None) -> zipfile.ZipInfo:
+    members = [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and info.filename.lower().endswith(CATALOG_EXTENSIONS)
+    ]
+    if not members:
+        raise ValueError("The zip archive contains no JSON, JSON Lines, Parquet or Arrow file.")
+    if len(members) > 1:
+        names = ", ".join(info.filename for info in members[:5])
+        raise ValueError(f"The zip archive contains {len(members)} catalogs ({names}); upload one at a time.")
+    member = members[0]
+    if max_decompressed_bytes is not None and member.file_size > max_decompressed_bytes:
+        raise ValueError(
+            f"{member.filename} is {_megabytes(member.file_size)} uncompressed; "
+            f"the upload limit is {_megabytes(max_decompressed_bytes)}."
+        )
+    return member
+
+
+def open_upload(file_obj, file_name: str = "", max_decompressed_bytes: int | None = None) -> Tuple[BinaryIO, str]:
+    """Wraps an upload in a decompressing stream. Returns (stream, inner file name)."""
+    compression, inner_name = detect_compression(file_obj, file_name)
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=file_obj, mode="rb"), inner_name
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd uploads require zstandard (pip install zstandard).")
+        return zstandard.ZstdDecompressor().stream_reader(file_obj), inner_name
+    if compression == "zip":
+        try:
+            archive = zipfile.ZipFile(file_obj)
+        except zipfile.BadZipFile as e:
+            raise ValueError("Invalid zip archive.") from e
+        member = _zip_member(archive, max_decompressed_bytes)
+        return archive.open(member), member.filename
+    return file_obj, file_name
+
+
+def _byte_chunks(stream, max_decompressed_bytes: int | None, on_chunk: Callable[[], None] | None) -> Iterator[bytes]:
+    """Reads ``stream`` in chunks, failing once more than ``max_decompressed_bytes`` have been read."""
+    total = 0
+    while True:
+        try:
+            chunk = stream.read(CHUNK_SIZE)
+        except (OSError, EOFError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Could not decompress the upload: {e}") from e
+        if not chunk:
+            break
+        total += len(chunk)
+        if max_decompressed_bytes is not None and total > max_decompressed_bytes:
+            raise ValueError(
+                f"The upload is larger than {_megabytes(max_decompressed_bytes)} uncompressed; load stopped."
+            )
+        if on_chunk is not None:
+            on_chunk()
+        yield chunk
+    metrics.count("ingest.bytes", total)
+
+
+def _text_chunks(chunks: Iterable) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        for chunk in chunks:
+            yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        tail = decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise ValueError("The upload is not UTF-8 text.") from e
+    if tail:
+        yield tail
+
+
+def _lines(chunks: Iterable[str]) -> Iterator[str]:
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def iter_json_array(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Decodes a top-level JSON array of objects from text chunks, yielding each
+    element as soon as it is complete. Only the undecoded tail is buffered.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buffer, pos, eof = "", 0, False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            return False
+        buffer, pos = buffer[pos:] + chunk, 0
+        return True
+
+    def peek() -> str:
+        """The next non-whitespace character ("" at the end of the input)."""
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or not fill():
+                return buffer[pos:pos + 1]
+
+    first = peek()
+    if first != "[":
+        raise ValueError("Top-level JSON element must be an array/list." if first else "Invalid JSON file format.")
+    pos += 1
+    if peek() == "]":
+        pos += 1
+    else:
+        count = 0
+        while True:
+            peek()  # raw_decode does not skip leading whitespace
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    # A value ending at the buffer edge may continue in the next chunk (e.g. a number).
+                    if end < len(buffer) or eof:
+                        break
+                except json.JSONDecodeError as e:
+                    if eof:
+                        raise ValueError(f"Invalid JSON in record {count + 1}.") from e
+                fill()
+            pos = end
+            count += 1
+            if not isinstance(value, dict):
+                raise ValueError(f"Record {count} is not a JSON object.")
+            yield value
+            separator = peek()
+            pos += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ValueError(f"Invalid JSON after record {count}.")
+    if peek():
+        raise ValueError("Invalid JSON file format.")
+
+
+def iter_upload(
+    file_obj,
+    file_name: str = "",
+    max_decompressed_bytes: int | None = DEFAULT_MAX_DECOMPRESSED_BYTES,
+    on_chunk: Callable[[], None] | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the records of an uploaded catalog while it is read chunk by
+    chunk; ``on_chunk`` is called after each chunk.
+    """
+    stream, inner_name = open_upload(file_obj, file_name, max_decompressed_bytes)
+    lowered = inner_name.lower()
+    chunks = _byte_chunks(stream, max_decompressed_bytes, on_chunk)
+    if lowered.endswith((".parquet", ".arrow", ".feather", ".ipc")):
+        buffer = io.BytesIO()
+        for chunk in chunks:
+            buffer.write(chunk)
+        buffer.seek(0)
+        yield from (load_parquet if lowered.endswith(".parquet") else load_arrow)(buffer)
+    elif lowered.endswith((".jsonl", ".ndjson")):
+        yield from iter_ndjson(_lines(_text_chunks(chunks)))
+    else:
+        yield from iter_json_array(_text_chunks(chunks))
+
+
+@metrics.timed("ingest.load_upload")
+def load_upload(
+    file_obj,
+    file_name: str = "",
+    max_records: int | None = DEFAULT_MAX_RECORDS,
+    max_decompressed_bytes: int | None = DEFAULT_MAX_DECOMPRESSED_BYTES,
+    progress: ProgressCallback | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Loads an uploaded catalog (optionally gzip/zstd/zip compressed) as a
+    stream, stopping with a ValueError once ``max_records`` records or
+    ``max_decompressed_bytes`` decompressed bytes are exceeded.
+    """
+    records: List[Dict[str, Any]] = []
+    total = _upload_size(file_obj)
+    reported = -1
+
+    def on_chunk():
+        nonlocal reported
+        if progress is None or not total:
+            return
+        try:
+            fraction = min(file_obj.tell() / total, 1.0)
+        except (AttributeError, OSError, ValueError):
+            return
+        if int(fraction * 100) != reported:  # at most one update per percent
+            reported = int(fraction * 100)
+            progress(fraction, len(records))
+
+    for record in iter_upload(file_obj, file_name, max_decompressed_bytes, on_chunk):
+        if max_records is not None and len(records) >= max_records:
+            raise ValueError(f"The upload has more than {max_records:,} records; load stopped.")
+        records.append(record)
+    if progress is not None:
+        progress(1.0, len(records))
+    metrics.count("ingest.records", len(records))
+    return records
@@ -1,19 +1,37 @@
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Tuple
 from datetime import datetime
 
+from core import metrics
+from core.schema import JobRecord
+from core.ndjson import load_ndjson
 
+try:  # pyarrow ships with streamlit but is only needed for the columnar formats
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = None
+
+# Low-cardinality columns stored dictionary-encoded in Parquet/Arrow files.
+DICTIONARY_COLUMNS = ["careerFamily", "department", "jobLevel"]
+
+
+@metrics.timed("io.load_json")
 def load_json(file_obj) -> List[Dict[str, Any]]:
     """Loads JSON from a file-like object."""
     try:
         data = json.load(file_obj)
         if not isinstance(data, list):
             raise ValueError("Top-level JSON element must be an array/list.")
+        metrics.count("io.load_json.records", len(data))
         return data
     except json.JSONDecodeError:
         raise ValueError("Invalid JSON file format.")
 
 
+@metrics.timed("io.save_json_str")
 def save_json_str(records: List[Dict[str, Any]]) -> str:
     """Dumps records to a formatted JSON string."""
     return json.dumps(records, indent=2, ensure_ascii=False)
@@ -24,39 +42,220 @@ def generate_changelog(changes: List[Dict[str, Any]]) -> str:
     return json.dumps(changes, indent=2, ensure_ascii=False)
 
 
-def deduplicate_data(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """
-    Deduplicate records using a richer identity key to reduce false positives.
+def canonicalize(value: Any) -> str:
+    """Case- and whitespace-insensitive form of a field value used by keys and indexes."""
+    return str(value).strip().lower() if value is not None else ""
+
+
+def dedupe_key_from(get: Callable[[str], Any]) -> Tuple[str, str, str, str, str]:
+    """``dedupe_key`` read through a field getter (a dict's ``get``, a model attribute lookup, ...)."""
+    duties = canonicalize(get("key_duties_responsibilities"))
+    duties_hash = duties[:64]  # lightweight signature to distinguish similar titles
+
+    return (
+        canonicalize(get("positionTitle")),
+        canonicalize(get("department")),
+        canonicalize(get("careerFamily")),
+        canonicalize(get("jobLevel")),
+        duties_hash,
+    )
 
-    Key components:
+
+def dedupe_key(record: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+    """
+    Identity key used for deduplication:
     - positionTitle
     - department
     - careerFamily
     - jobLevel
     - a short hash of duties text (if present)
+    """
+    return dedupe_key_from(record.get)
+
+
+@metrics.timed("io.deduplicate_data")
+def deduplicate_data(
+    records: List[Dict[str, Any]],
+    keys: List[Tuple[str, ...]] | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Deduplicate records using a richer identity key (see ``dedupe_key``) to
+    reduce false positives. ``keys`` may supply precomputed keys, one per
+    record (e.g. from a warm snapshot).
 
     Keeps the first occurrence of each unique key.
     """
     seen = set()
     unique_records = []
 
-    def canonicalize(value: Any) -> str:
-        return str(value).strip().lower() if value is not None else ""
-
-    for r in records:
-        duties = canonicalize(r.get("key_duties_responsibilities"))
-        duties_hash = duties[:64]  # lightweight signature to distinguish similar titles
-
-        key = (
-            canonicalize(r.get("positionTitle")),
-            canonicalize(r.get("department")),
-            canonicalize(r.get("careerFamily")),
-            canonicalize(r.get("jobLevel")),
-            duties_hash,
-        )
+    for i, r in enumerate(records):
+        key = keys[i] if keys is not None else dedupe_key(r)
 
         if key not in seen:
             seen.add(key)
             unique_records.append(r)
 
+    metrics.count("io.deduplicate_data.records", len(records))
+    metrics.count("io.deduplicate_data.removed", len(records) - len(unique_records))
     return unique_records
+
+
+# --- COLUMNAR (PARQUET / ARROW IPC) ---
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet/Arrow support requires pyarrow (pip install pyarrow).")
+
+
+def records_to_table(records: List[Dict[str, Any]]) -> "pa.Table":
+    """
+    Converts records to an Arrow table. JobRecord fields are typed as strings
+    and the repeated careerFamily/department/jobLevel columns are
+    dictionary-encoded; extra keys keep their inferred Arrow type.
+    """
+    _require_pyarrow()
+    columns: Dict[str, None] = dict.fromkeys(JobRecord.model_fields)
+    for r in records:
+        columns.update(dict.fromkeys(r))
+
+    arrays = {}
+    for name in columns:
+        values = [r.get(name) for r in records]
+        try:
+            if name in JobRecord.model_fields:
+                array = pa.array(values, type=pa.string())
+                if name in DICTIONARY_COLUMNS:
+                    array = array.dictionary_encode()
+            else:
+                array = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Column '{name}' cannot be stored in a columnar file: {e}")
+        arrays[name] = array
+    return pa.table(arrays)
+
+
+def table_to_records(table: "pa.Table") -> List[Dict[str, Any]]:
+    """Materializes an Arrow table as a list of dicts (missing cells become None)."""
+    _require_pyarrow()
+    return table.to_pylist()
+
+
+@metrics.timed("io.save_parquet_bytes")
+def save_parquet_bytes(records: List[Dict[str, Any]]) -> bytes:
+    """Serializes records to Parquet bytes."""
+    table = records_to_table(records)
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink, use_dictionary=DICTIONARY_COLUMNS, compression="zstd")
+    return sink.getvalue().to_pybytes()
+
+
+@metrics.timed("io.save_arrow_bytes")
+def save_arrow_bytes(records: List[Dict[str, Any]]) -> bytes:
+    """Serializes records to Arrow IPC file bytes (memory-mappable)."""
+    table = records_to_table(records)
+    sink = pa.BufferOutputStream()
+    with pa_ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+@metrics.timed("io.read_parquet_table")
+def read_parquet_table(source, memory_map: bool = True) -> "pa.Table":
+    """
+    Reads a Parquet file path or file-like object into an Arrow table, keeping
+    the dictionary columns encoded. Paths are memory-mapped when requested.
+    """
+    _require_pyarrow()
+    try:
+        table = pq.read_table(source, memory_map=memory_map, read_dictionary=DICTIONARY_COLUMNS)
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Invalid Parquet file: {e}") from e
+    metrics.count("io.read_parquet_table.records", table.num_rows)
+    return table
+
+
+@metrics.timed("io.read_arrow_table")
+def read_arrow_table(source, memory_map: bool = True) -> "pa.Table":
+    """
+    Reads an Arrow IPC file into a table. For paths with ``memory_map`` set,
+    the buffers reference the mapped file directly instead of being copied.
+    """
+    _require_pyarrow()
+    if isinstance(source, str) and memory_map:
+        source = pa.memory_map(source, "r")
+    elif not isinstance(source, str):
+        source = pa.BufferReader(source.read())
+    try:
+        table = pa_ipc.open_file(source).read_all()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Invalid Arrow IPC file: {e}") from e
+    metrics.count("io.read_arrow_table.records", table.num_rows)
+    return table
+
+
+def load_parquet(file_obj) -> List[Dict[str, Any]]:
+    """Loads records from a Parquet file-like object or path."""
+    return table_to_records(read_parquet_table(file_obj, memory_map=isinstance(file_obj, str)))
+
+
+def load_arrow(file_obj) -> List[Dict[str, Any]]:
+    """Loads records from an Arrow IPC file-like object or path."""
+    return table_to_records(read_arrow_table(file_obj))
+
+
+def load_records(file_obj, file_name: str = "") -> List[Dict[str, Any]]:
+    """Loads records from JSON, JSON Lines, Parquet, or Arrow IPC based on the file extension."""
+    lowered = file_name.lower()
+    if lowered.endswith((".jsonl", ".ndjson")):
+        return load_ndjson(file_obj)
+    if lowered.endswith(".parquet"):
+        return load_parquet(file_obj)
+    if lowered.endswith((".arrow", ".feather", ".ipc")):
+        return load_arrow(file_obj)
+    return load_json(file_obj)
+
+
+def table_string_column(table: "pa.Table", name: str) -> "pa.Array":
+    """
+    Returns a column as a plain string array (dictionary and other types cast
+    to string, absent columns as all-null), suitable for Arrow compute kernels.
+    """
+    if name not in table.column_names:
+        return pa.nulls(table.num_rows, type=pa.string())
+    column = table.column(name).combine_chunks()
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(pa.string())
+    if not pa.types.is_string(column.type):
+        try:
+            column = column.cast(pa.string())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            return pa.nulls(table.num_rows, type=pa.string())
+    return column
+
+
+@metrics.timed("io.filter_table")
+def filter_table(
+    table: "pa.Table",
+    families: List[str] | None = None,
+    departments: List[str] | None = None,
+    search_term: str | None = None,
+) -> "pa.Table":
+    """
+    Columnar counterpart of the app's sidebar filters: career family and
+    department membership plus a case-insensitive regex search over the title,
+    duties, and complexity columns.
+    """
+    _require_pyarrow()
+    mask = pa.array([True] * table.num_rows, type=pa.bool_())
+    if families:
+        mask = pc.and_(mask, pc.is_in(table_string_column(table, "careerFamily"), value_set=pa.array(families)))
+    if departments:
+        mask = pc.and_(mask, pc.is_in(table_string_column(table, "department"), value_set=pa.array(departments)))
+    if search_term:
+        hits = pa.array([False] * table.num_rows, type=pa.bool_())
+        for name in ["positionTitle", "key_duties_responsibilities", "position_complexity"]:
+            if name in table.column_names:
+                found = pc.match_substring_regex(table_string_column(table, name), search_term, ignore_case=True)
+                hits = pc.or_(hits, pc.fill_null(found, False))
+        mask = pc.and_(mask, hits)
+    return table.filter(mask)
@@ -0,0 +1,195 @@
+"""
+Compact storage for validation issues.
+
+Large catalogs produce several warnings per row, and holding each issue as
+an object (then again as a dict for the UI) costs far more than the issue
+data itself. ``IssueStore`` keeps issues as parallel typed arrays: the row
+index as int64, and field, message, severity and rule as uint32 codes into
+interned string tables. Counting, filtering and paging work on the code
+columns; rows are only turned back into dicts or CSV text for the slice
+being shown or streamed.
+"""
+import csv
+import io
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List
+
+import numpy as np
+
+# Columns of an issue row, as shown in the UI and written to CSV.
+COLUMNS = ["Index", "Severity", "Field", "Message", "Rule"]
+_CODED = ("field", "message", "severity", "rule")
+
+
+class ValidationIssue:
+    __slots__ = ("index", "field", "message", "severity", "rule")
+
+    def __init__(self, index: int, field: str, message: str, severity: str = "Error", rule: str | None = None):
+        self.index = index
+        self.field = field
+        self.message = message
+        self.severity = severity
+        # Rules group issues whose messages differ only by the offending value.
+        self.rule = rule if rule is not None else field
+
+    def to_dict(self):
+        return {
+            "Index": self.index,
+            "Severity": self.severity,
+            "Field": self.field,
+            "Message": self.message,
+            "Rule": self.rule,
+        }
+
+
+class _StringTable:
+    """Interns strings to dense integer codes."""
+    __slots__ = ("codes", "values")
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _to_numpy(values: array, dtype) -> np.ndarray:
+    # Copy so the array is not left exporting a buffer (which blocks appends).
+    if not values:
+        return np.zeros(0, dtype=dtype)
+    return np.frombuffer(values, dtype=dtype).copy()
+
+
+class IssueStore:
+    """
+    Columnar, append-only collection of validation issues. Supports
+    ``append(issue)`` like a list, so validators can write into it directly.
+    """
+    __slots__ = ("_index", "_codes", "_tables", "data_version")
+
+    def __init__(self):
+        # Version of the data these issues describe, for callers that track one.
+        self.data_version: int | None = None
+        self._index = array("q")
+        self._codes = {name: array("I") for name in _CODED}
+        self._tables = {name: _StringTable() for name in _CODED}
+
+    @classmethod
+    def from_issues(cls, issues: Iterable[ValidationIssue]) -> "IssueStore":
+        store = cls()
+        store.extend(issues)
+        return store
+
+    def add(self, index: int, field: str, message: str, severity: str = "Error", rule: str | None = None):
+        self._index.append(index)
+        values = (field, message, severity, rule if rule is not None else field)
+        for name, value in zip(_CODED, values):
+            self._codes[name].append(self._tables[name].code(value))
+
+    def append(self, issue: ValidationIssue):
+        self.add(issue.index, issue.field, issue.message, issue.severity, issue.rule)
+
+    def extend(self, issues: Iterable[ValidationIssue]):
+        for issue in issues:
+            self.append(issue)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, position: int) -> ValidationIssue:
+        values = [self._tables[name].values[self._codes[name][position]] for name in _CODED]
+        field, message, severity, rule = values
+        return ValidationIssue(self._index[position], field, message, severity, rule)
+
+    def __iter__(self) -> Iterator[ValidationIssue]:
+        for position in range(len(self)):
+            yield self[position]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and string tables."""
+        size = self._index.itemsize * len(self._index)
+        size += sum(codes.itemsize * len(codes) for codes in self._codes.values())
+        size += sum(len(value) for table in self._tables.values() for value in table.values)
+        return size
+
+    def indexes(self) -> np.ndarray:
+        """Row index of every issue, in store order."""
+        return _to_numpy(self._index, np.int64)
+
+    def values(self, by: str) -> List[str]:
+        """Distinct values of ``by`` ("field", "message", "severity" or "rule") in first-seen order."""
+        return list(self._tables[by].values)
+
+    def counts(self, by: str = "severity", positions: np.ndarray | None = None) -> Dict[str, int]:
+        """Issue counts per distinct value of ``by``, optionally over selected positions."""
+        codes = _to_numpy(self._codes[by], np.uint32)
+        if positions is not None:
+            codes = codes[positions]
+        totals = np.bincount(codes, minlength=len(self._tables[by].values))
+        return {value: int(n) for value, n in zip(self._tables[by].values, totals) if n}
+
+    def select(self, **filters: Any) -> np.ndarray:
+        """
+        Positions of issues matching every filter, e.g.
+        ``select(severity="Error", rule=["duplicate", "unknown_career_family"])``.
+        A filter of None (or an empty list) matches everything.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for by, wanted in filters.items():
+            if wanted is None:
+                continue
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            wanted = list(wanted)
+            if not wanted:
+                continue
+            table = self._tables[by]
+            wanted_codes = [table.codes[value] for value in wanted if value in table.codes]
+            mask &= np.isin(_to_numpy(self._codes[by], np.uint32), wanted_codes)
+        return np.flatnonzero(mask)
+
+    def rows(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        """Issue dicts (keyed like ``COLUMNS``) for the given positions."""
+        index = self._index
+        columns = [(self._codes[name], self._tables[name].values) for name in _CODED]
+        (field_codes, fields), (message_codes, messages), (severity_codes, severities), (rule_codes, rules) = columns
+        return [
+            {
+                "Index": index[p],
+                "Severity": severities[severity_codes[p]],
+                "Field": fields[field_codes[p]],
+                "Message": messages[message_codes[p]],
+                "Rule": rules[rule_codes[p]],
+            }
+            for p in (int(p) for p in positions)
+        ]
+
+    def page(self, page: int, page_size: int, positions: np.ndarray | None = None) -> List[Dict[str, Any]]:
+        """One zero-based page of issue dicts, over all issues or the selected positions."""
+        if positions is None:
+            positions = range(len(self))
+        start = max(page, 0) * page_size
+        return self.rows(positions[start:start + page_size])
+
+    def iter_csv(self, positions: np.ndarray | None = None, chunk_rows: int = 10_000) -> Iterator[str]:
+        """Streams the issues as CSV text, a header chunk then ``chunk_rows`` rows at a time."""
+        if positions is None:
+            positions = range(len(self))
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        yield buffer.getvalue()
+        for start in range(0, len(positions), chunk_rows):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(self.rows(positions[start:start + chunk_rows]))
+            yield buffer.getvalue()
+
+    def to_csv_bytes(self, positions: np.ndarray | None = None) -> bytes:
+        return "".join(self.iter_csv(positions)).encode("utf-8")
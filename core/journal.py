@@ -0,0 +1,315 @@
+"""
+Append-only operation journal for crash recovery and session restore.
+
+Every edit is logged as field-level operations in ``journal.jsonl``:
+
+- ``{"seq", "op": "set", "index", "field", "value"}``
+- ``{"seq", "op": "unset", "index", "field"}``
+- ``{"seq", "op": "append", "record"}``
+- ``{"seq", "op": "truncate", "length"}``
+- ``{"seq", "op": "changelog", "entry"}``
+
+Operations are written as they are logged and fsynced in batches (every
+``fsync_every`` operations, and on ``flush()``). Periodically the current
+records are compacted into a snapshot, after which the journal only holds
+operations newer than the snapshot. ``restore()`` loads the latest snapshot
+and replays the remaining operations, so a session comes back without
+re-importing or re-enhancing the source file.
+
+The ``CURRENT`` file names the latest snapshot, the base snapshot taken when
+the dataset was loaded (the "original" data for diffs) and the changelog up
+to the snapshot. It is replaced atomically, so a crash mid-compaction leaves
+the previous snapshot in effect. A torn last journal line is ignored.
+
+A journal belongs to one working session: give each session or user its own
+directory (see ``journal_directory``). Appends and snapshots are serialised
+with a lock, and the journal file is only held open while it is written, so
+an abandoned session leaves no open handle behind.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Tuple
+
+from core import metrics
+from core.ndjson import load_ndjson
+
+DEFAULT_JOURNAL_DIR = ".cache/journal"
+JOURNAL_FILE = "journal.jsonl"
+CURRENT_FILE = "CURRENT"
+_MISSING = object()
+
+
+def _fsync_write(path: str, lines: Iterable[str]) -> None:
+    """Writes ``path`` via a temporary file, fsyncs it and renames it into place."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def journal_directory(root: str, owner: str) -> str:
+    """The journal directory of one session or user under ``root``, safe for any owner string."""
+    return os.path.join(root, hashlib.sha256(owner.encode("utf-8")).hexdigest()[:24])
+
+
+def _record_lines(records: Iterable[Dict[str, Any]]) -> Iterable[str]:
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def diff_operations(
+    old_data: List[Dict[str, Any]],
+    new_data: List[Dict[str, Any]],
+    indexes: Iterable[int] | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Field-level operations turning ``old_data`` into ``new_data``. Only the
+    records at ``indexes`` are compared if given (plus any appended records);
+    records shared by identity between both lists are skipped.
+    """
+    ops: List[Dict[str, Any]] = []
+    common = min(len(old_data), len(new_data))
+    candidates = range(common) if indexes is None else sorted({int(i) for i in indexes if int(i) < common})
+    for idx in candidates:
+        old, new = old_data[idx], new_data[idx]
+        if old is new or old == new:
+            continue
+        for field, value in new.items():
+            if old.get(field, _MISSING) != value:
+                ops.append({"op": "set", "index": idx, "field": field, "value": value})
+        for field in old.keys() - new.keys():
+            ops.append({"op": "unset", "index": idx, "field": field})
+    if len(new_data) < len(old_data):
+        ops.append({"op": "truncate", "length": len(new_data)})
+    for record in new_data[common:]:
+        ops.append({"op": "append", "record": record})
+    return ops
+
+
+def apply_operation(records: List[Dict[str, Any]], changelog: List[Dict[str, Any]], op: Dict[str, Any]) -> None:
+    """Applies one journal operation in place."""
+    kind = op["op"]
+    if kind == "set":
+        records[op["index"]] = {**records[op["index"]], op["field"]: op["value"]}
+    elif kind == "unset":
+        record = dict(records[op["index"]])
+        record.pop(op["field"], None)
+        records[op["index"]] = record
+    elif kind == "append":
+        records.append(op["record"])
+    elif kind == "truncate":
+        del records[op["length"]:]
+    elif kind == "changelog":
+        changelog.append(op["entry"])
+    else:
+        raise ValueError(f"Unknown journal operation: '{kind}'.")
+
+
+class OperationJournal:
+    """
+    Journal of one working dataset in ``directory``. Call ``reset`` when a
+    new dataset is loaded, ``log``/``log_changes`` for edits, and ``flush``
+    at the end of each user action.
+    """
+
+    def __init__(self, directory: str = DEFAULT_JOURNAL_DIR, fsync_every: int = 256, snapshot_every: int = 5000):
+        self.directory = directory
+        self.fsync_every = max(int(fsync_every), 1)
+        self.snapshot_every = max(int(snapshot_every), 1)
+        os.makedirs(directory, exist_ok=True)
+        self._journal_path = os.path.join(directory, JOURNAL_FILE)
+        self._current = self._read_current()
+        self._seq = self._current.get("seq", 0) if self._current else 0
+        ops, valid_bytes = self._read_journal()
+        if ops:
+            self._seq = max(self._seq, ops[-1]["seq"])
+        self._ops_since_snapshot = len(ops)
+        self._pending = 0
+        self._deferred_base: Tuple[List[Dict[str, Any]], List[Dict[str, Any]]] | None = None
+        self._lock = threading.RLock()
+        with open(self._journal_path, "a", encoding="utf-8") as f:
+            if f.tell() > valid_bytes:
+                # Drop a torn last line so new operations start on a clean line.
+                f.truncate(valid_bytes)
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def has_session(self) -> bool:
+        """True if there is a snapshot to restore."""
+        return self._current is not None
+
+    @property
+    def pending_operations(self) -> int:
+        """Operations logged since the last snapshot."""
+        return self._ops_since_snapshot
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_current(self) -> Dict[str, Any] | None:
+        try:
+            with open(self._path(CURRENT_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _read_journal(self) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Operations newer than the current snapshot, and the byte length of the
+        intact part of the journal. Reading stops at a torn or corrupt line.
+        """
+        snapshot_seq = self._current.get("seq", 0) if self._current else 0
+        ops = []
+        valid_bytes = 0
+        try:
+            with open(self._journal_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        op = json.loads(line)
+                    except ValueError:
+                        break
+                    valid_bytes += len(line)
+                    if op["seq"] > snapshot_seq:
+                        ops.append(op)
+        except FileNotFoundError:
+            pass
+        return ops, valid_bytes
+
+    def log(self, ops: Iterable[Dict[str, Any]]) -> int:
+        """Appends operations; fsyncs whenever ``fsync_every`` are pending. Returns the count."""
+        with self._lock:
+            self._write_deferred_base()
+            count = 0
+            with open(self._journal_path, "a", encoding="utf-8") as f:
+                for op in ops:
+                    self._seq += 1
+                    f.write(json.dumps({"seq": self._seq, **op}, ensure_ascii=False))
+                    f.write("\n")
+                    count += 1
+                    self._pending += 1
+                    if self._pending >= self.fsync_every:
+                        f.flush()
+                        os.fsync(f.fileno())
+                        self._pending = 0
+            self._ops_since_snapshot += count
+        metrics.count("journal.operations", count)
+        return count
+
+    def log_changes(
+        self,
+        old_data: List[Dict[str, Any]],
+        new_data: List[Dict[str, Any]],
+        indexes: Iterable[int] | None = None,
+        changelog_entry: Dict[str, Any] | None = None,
+    ) -> int:
+        """Logs the field-level diff between two versions of the data (see ``diff_operations``)."""
+        ops = diff_operations(old_data, new_data, indexes)
+        if changelog_entry is not None:
+            ops.append({"op": "changelog", "entry": changelog_entry})
+        return self.log(ops)
+
+    def flush(self) -> None:
+        """Fsyncs pending operations."""
+        with self._lock:
+            if not self._pending:
+                return
+            with open(self._journal_path, "a", encoding="utf-8") as f:
+                os.fsync(f.fileno())
+            self._pending = 0
+
+    def should_compact(self) -> bool:
+        return self._ops_since_snapshot >= self.snapshot_every
+
+    @metrics.timed("journal.snapshot")
+    def snapshot(self, records: List[Dict[str, Any]], changelog: List[Dict[str, Any]], base: bool = False) -> None:
+        """
+        Compacts the journal: writes ``records`` as the new snapshot and drops
+        the operations it covers. With ``base=True`` (a newly loaded dataset)
+        the snapshot also becomes the original data returned by ``restore``.
+        """
+        with self._lock:
+            self._write_deferred_base()
+            self.flush()
+            name = f"snapshot-{self._seq:012d}-{'base' if base else 'head'}.jsonl"
+            _fsync_write(self._path(name), _record_lines(records))
+
+            previous = self._current or {}
+            base_name = name if base or not previous.get("base") else previous["base"]
+            current = {"seq": self._seq, "snapshot": name, "base": base_name, "changelog": list(changelog)}
+            _fsync_write(self._path(CURRENT_FILE), [json.dumps(current, ensure_ascii=False)])
+            self._current = current
+
+            # Everything in the journal is now covered by the snapshot.
+            _fsync_write(self._journal_path, [])
+            self._ops_since_snapshot = 0
+
+            for file_name in os.listdir(self.directory):
+                if file_name.startswith("snapshot-") and file_name not in (name, base_name):
+                    os.remove(self._path(file_name))
+
+    def reset(self, records: List[Dict[str, Any]], changelog: List[Dict[str, Any]] | None = None) -> None:
+        """
+        Starts a new journal for a newly loaded dataset. The base snapshot is
+        only written once the first change is logged, so loading a dataset
+        costs nothing until it is edited; until then there is no session to
+        restore.
+        """
+        with self._lock:
+            self.flush()
+            if os.path.exists(self._path(CURRENT_FILE)):
+                os.remove(self._path(CURRENT_FILE))
+            self._current = None
+            self._deferred_base = (list(records), list(changelog or []))
+
+    def _write_deferred_base(self) -> None:
+        if self._deferred_base is None:
+            return
+        records, changelog = self._deferred_base
+        self._deferred_base = None
+        self.snapshot(records, changelog, base=True)
+
+    def compact_if_needed(self, records: List[Dict[str, Any]], changelog: List[Dict[str, Any]]) -> bool:
+        with self._lock:
+            if not self.should_compact():
+                return False
+            self.snapshot(records, changelog)
+            return True
+
+    def _load_snapshot(self, name: str) -> List[Dict[str, Any]]:
+        with open(self._path(name), "r", encoding="utf-8") as f:
+            return load_ndjson(f)
+
+    @metrics.timed("journal.restore")
+    def restore(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]] | None:
+        """
+        Rebuilds the session as ``(records, original_records, changelog)`` from
+        the latest snapshot plus the journal, or returns None if there is none.
+        """
+        with self._lock:
+            if self._current is None:
+                return None
+            self.flush()
+            current = self._current
+            ops, _ = self._read_journal()
+            records = self._load_snapshot(current["snapshot"])
+            original = list(records) if current["base"] == current["snapshot"] else self._load_snapshot(current["base"])
+        changelog = list(current.get("changelog", []))
+        for op in ops:
+            apply_operation(records, changelog, op)
+        metrics.count("journal.replayed", len(ops))
+        return records, original, changelog
@@ -0,0 +1,107 @@
+"""
+Multi-pattern keyword matching for the validation rules.
+
+``KeywordMatcher`` compiles every configured keyword, across all groups,
+into one regular expression and finds all of them in a single scan of the
+text. The keywords are merged into a prefix tree before compiling
+(``foreman|forest`` becomes ``fore(?:man|st)``), so at each position the
+regex engine follows one branch per character instead of trying every
+keyword in turn; scan cost depends on the text, not on how many keywords
+are configured.
+
+Matching is case-insensitive and on whole words: a keyword only matches
+where it is not preceded or followed by a letter, digit or underscore, so
+"Entry" matches "Entry-level work" but not "reentry". Where keywords
+overlap at the same position the longest one wins.
+
+Catalog text is highly repetitive (enhancement fills narratives from a few
+templates), so scan results are memoized per distinct text.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+_NO_MATCHES: Dict[str, Tuple[str, ...]] = {}
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation of ``words`` factored into a prefix tree."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional continuation: a longer keyword is preferred over its prefix.
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Finds the keywords of several named groups in one pass, e.g.
+    ``KeywordMatcher({"entry_level": ["Entry", "Junior"]}).scan("Junior analyst")``
+    returns ``{"entry_level": ("Junior",)}``.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]], cache_size: int = 65536):
+        self._groups: Dict[str, List[str]] = {}
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                if not keyword:
+                    raise ValueError(f"Empty keyword in group '{group}'.")
+                self._groups.setdefault(keyword, [])
+                if group not in self._groups[keyword]:
+                    self._groups[keyword].append(group)
+        self.keyword_count = len(self._groups)
+        if self._groups:
+            self._pattern = re.compile(rf"(?<!\w){_trie_pattern(self._groups)}(?!\w)", re.IGNORECASE)
+        else:
+            self._pattern = None
+        self._cached_scan = lru_cache(maxsize=cache_size)(self._scan)
+
+    def substring_pattern(self, *groups: str) -> str:
+        """
+        Prefix-tree alternation of the keywords of ``groups`` (all groups if
+        none given) without the whole-word checks, for regex engines that lack
+        lookbehind such as Arrow's RE2. Matched case-insensitively, it finds
+        every text where ``scan`` would find one of those keywords. Empty if
+        the groups have no keywords.
+        """
+        wanted = set(groups)
+        return _trie_pattern(
+            keyword for keyword, owners in self._groups.items() if not wanted or wanted.intersection(owners)
+        )
+
+    def scan(self, text) -> Dict[str, Tuple[str, ...]]:
+        """
+        Keywords found in ``text`` per group, as written in the text, in order
+        of first appearance (each keyword once). The result is shared between
+        calls with the same text and must not be modified.
+        """
+        if not text:
+            return _NO_MATCHES
+        return self._cached_scan(text if isinstance(text, str) else str(text))
+
+    def _scan(self, text: str) -> Dict[str, Tuple[str, ...]]:
+        if not text or self._pattern is None:
+            return _NO_MATCHES
+        found: Dict[str, List[str]] = {}
+        seen = set()
+        for match in self._pattern.finditer(text):
+            matched = match.group()
+            key = matched.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            for group in self._groups.get(key, ()):
+                found.setdefault(group, []).append(matched)
+        return {group: tuple(matches) for group, matches in found.items()} if found else _NO_MATCHES
@@ -0,0 +1,265 @@
+"""
+Out-of-core merge and deduplication of several job catalogs.
+
+Records from every source are streamed once and hash-partitioned by their
+dedupe fingerprint into on-disk spill files, so only one partition's
+fingerprints are ever held in memory. Each partition is deduplicated on its
+own, keeping the record with the lowest global sequence number (the same
+keep-first semantics as ``deduplicate_data`` over the concatenated inputs),
+and the survivors are k-way merged back into input order.
+
+With a memory budget, a partition whose spill file is too large for the
+budget is split again by the next digits of the fingerprint (up to
+``MAX_SPLIT_DEPTH`` levels), so the budget holds even when the top-level
+partition count is capped at ``MAX_PARTITIONS``. Splitting cannot separate
+copies of one record, so each survivor lists at most ``MAX_MERGED_FROM`` of
+the duplicates it absorbed and counts the rest.
+
+``python -m core.merge out.jsonl in1.json in2.jsonl ...`` merges files from
+the command line.
+"""
+import hashlib
+import heapq
+import json
+import math
+import os
+import tempfile
+from contextlib import ExitStack
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from core import metrics
+from core.io import dedupe_key
+from core.ingest import iter_upload
+
+DEFAULT_PARTITIONS = 16
+MAX_PARTITIONS = 256
+SPLIT_FANOUT = 16
+# Each level consumes the next 8 hex digits of the 40-digit fingerprint.
+MAX_SPLIT_DEPTH = 4
+# Duplicates listed in one survivor's provenance; further ones are only counted.
+MAX_MERGED_FROM = 100
+# Rough in-memory cost of one partition entry: digest, sequence, duplicate list.
+_BYTES_PER_KEY = 200
+# Rough ratio of spilled record bytes to distinct keys, for sizing partitions.
+_AVG_RECORD_BYTES = 1024
+
+
+def record_fingerprint(record: Dict[str, Any]) -> str:
+    """Stable hex digest of a record's dedupe key."""
+    return hashlib.sha1(json.dumps(dedupe_key(record), ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def partitions_for_budget(estimated_bytes: int, memory_budget_bytes: int) -> int:
+    """
+    Chooses a partition count so one partition's keys fit the memory budget,
+    capped at ``MAX_PARTITIONS`` (larger partitions are split again while merging).
+    """
+    estimated_keys = max(estimated_bytes // _AVG_RECORD_BYTES, 1)
+    per_partition = max(memory_budget_bytes // _BYTES_PER_KEY, 1)
+    return max(1, min(MAX_PARTITIONS, math.ceil(estimated_keys / per_partition)))
+
+
+def _partition_of(digest: str, depth: int, partitions: int) -> int:
+    return int(digest[depth * 8:(depth + 1) * 8], 16) % partitions
+
+
+def _read_spill(path: str) -> Iterator[list]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _dedupe_partition(spill_path: str, survivors_path: str) -> Tuple[int, int]:
+    """
+    Keeps the first record for each fingerprint in one partition, writing
+    survivors (in sequence order) with the provenance of duplicates they
+    absorbed: the first ``MAX_MERGED_FROM`` are listed and all are counted,
+    so memory stays bounded however often one record repeats. Returns
+    (records read, survivors written).
+    """
+    first_seq: Dict[str, int] = {}
+    merged_from: Dict[str, List[List[Any]]] = {}
+    merged_count: Dict[str, int] = {}
+    records_read = 0
+    for seq, digest, source, source_index, _ in _read_spill(spill_path):
+        records_read += 1
+        if digest in first_seq:
+            merged_count[digest] = merged_count.get(digest, 0) + 1
+            listed = merged_from.setdefault(digest, [])
+            if len(listed) < MAX_MERGED_FROM:
+                listed.append([source, source_index])
+        else:
+            first_seq[digest] = seq
+
+    written = 0
+    with open(survivors_path, "w", encoding="utf-8") as out:
+        for seq, digest, source, source_index, record in _read_spill(spill_path):
+            if first_seq[digest] != seq:
+                continue
+            provenance = {
+                "source": source,
+                "source_index": source_index,
+                "merged_from": merged_from.get(digest, []),
+                "merged_count": merged_count.get(digest, 0),
+            }
+            out.write(json.dumps([seq, provenance, record], ensure_ascii=False))
+            out.write("\n")
+            written += 1
+    return records_read, written
+
+
+def _dedupe_spill(
+    spill_path: str, survivors_path: str, max_spill_bytes: int | None, depth: int, counts: Dict[str, int]
+) -> int:
+    """
+    Deduplicates one spill file into ``survivors_path`` (see
+    ``_dedupe_partition``), first splitting it by the next fingerprint digits
+    while it is larger than ``max_spill_bytes``. Returns the survivors written.
+    """
+    if max_spill_bytes is None or depth >= MAX_SPLIT_DEPTH or os.path.getsize(spill_path) <= max_spill_bytes:
+        return _dedupe_partition(spill_path, survivors_path)[1]
+
+    counts["partitions_split"] = counts.get("partitions_split", 0) + 1
+    sub_paths = [f"{spill_path}.{i:02d}" for i in range(SPLIT_FANOUT)]
+    with ExitStack() as stack:
+        subs = [stack.enter_context(open(path, "w", encoding="utf-8")) for path in sub_paths]
+        with open(spill_path, "r", encoding="utf-8") as f:
+            for line in f:
+                digest = json.loads(line)[1]
+                subs[_partition_of(digest, depth, SPLIT_FANOUT)].write(line)
+
+    keep_paths = []
+    written = 0
+    for sub_path in sub_paths:
+        keep_path = f"{sub_path}.keep"
+        written += _dedupe_spill(sub_path, keep_path, max_spill_bytes, depth + 1, counts)
+        os.remove(sub_path)
+        keep_paths.append(keep_path)
+    # Survivors of the sub-partitions, merged back into sequence order.
+    with open(survivors_path, "w", encoding="utf-8") as out, ExitStack() as stack:
+        streams = [stack.enter_context(open(path, "r", encoding="utf-8")) for path in keep_paths]
+        for line in heapq.merge(*streams, key=lambda line: int(line[1:line.index(",")])):
+            out.write(line)
+    for path in keep_paths:
+        os.remove(path)
+    return written
+
+
+def merge_deduplicate(
+    sources: Iterable[Tuple[str, Iterable[Dict[str, Any]]]],
+    partitions: int = DEFAULT_PARTITIONS,
+    spill_dir: str | None = None,
+    stats: Dict[str, int] | None = None,
+    memory_budget_bytes: int | None = None,
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Merges ``(source_name, records)`` pairs and drops duplicates out of core.
+
+    Yields ``(record, provenance)`` for each surviving record in input order,
+    where provenance is ``{"source", "source_index", "merged_from",
+    "merged_count"}``: ``merged_from`` lists the ``[source, source_index]`` of
+    up to ``MAX_MERGED_FROM`` duplicates it replaced and ``merged_count``
+    counts them all. With ``memory_budget_bytes``, partitions too large for the
+    budget are split further. Counts are written into ``stats`` if given.
+    """
+    partitions = max(1, min(int(partitions), MAX_PARTITIONS))
+    max_spill_bytes = None
+    if memory_budget_bytes is not None:
+        max_spill_bytes = max(memory_budget_bytes // _BYTES_PER_KEY, 1) * _AVG_RECORD_BYTES
+    counts: Dict[str, int] = {}
+    with tempfile.TemporaryDirectory(prefix="jda-merge-", dir=spill_dir) as workdir:
+        spill_paths = [os.path.join(workdir, f"part-{i:03d}.jsonl") for i in range(partitions)]
+        seq = 0
+        with ExitStack() as stack:
+            spills = [stack.enter_context(open(path, "w", encoding="utf-8")) for path in spill_paths]
+            for source_name, records in sources:
+                for source_index, record in enumerate(records):
+                    digest = record_fingerprint(record)
+                    entry = [seq, digest, source_name, source_index, record]
+                    spill = spills[_partition_of(digest, 0, partitions)]
+                    spill.write(json.dumps(entry, ensure_ascii=False))
+                    spill.write("\n")
+                    seq += 1
+
+        survivor_paths = []
+        survivors = 0
+        for i, spill_path in enumerate(spill_paths):
+            survivors_path = os.path.join(workdir, f"keep-{i:03d}.jsonl")
+            survivors += _dedupe_spill(spill_path, survivors_path, max_spill_bytes, 1, counts)
+            os.remove(spill_path)
+            survivor_paths.append(survivors_path)
+
+        if stats is not None:
+            stats.update({
+                "records_in": seq,
+                "records_out": survivors,
+                "duplicates_removed": seq - survivors,
+                "partitions": partitions,
+                "partitions_split": counts.get("partitions_split", 0),
+            })
+        metrics.count("merge.partitions_split", counts.get("partitions_split", 0))
+        metrics.count("merge.records_in", seq)
+        metrics.count("merge.duplicates_removed", seq - survivors)
+
+        streams = [_read_spill(path) for path in survivor_paths]
+        for _, provenance, record in heapq.merge(*streams, key=lambda entry: entry[0]):
+            yield record, provenance
+
+
+def _iter_source(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the records of a catalog file: JSON arrays and JSON Lines
+    (optionally compressed) are decoded chunk by chunk; Parquet and Arrow
+    files are loaded one file at a time.
+    """
+    with open(path, "rb") as f:
+        yield from iter_upload(f, path, max_decompressed_bytes=None)
+
+
+def merge_catalog_files(
+    paths: List[str],
+    output_path: str,
+    provenance_path: str | None = None,
+    memory_budget_bytes: int = 256 * 1024 * 1024,
+    spill_dir: str | None = None,
+) -> Dict[str, int]:
+    """
+    Merges catalog files into one deduplicated JSON Lines file, sized so each
+    partition fits ``memory_budget_bytes``. Provenance lines (one per output
+    record, same order) go to ``provenance_path`` if given. Returns the merge
+    counts.
+    """
+    estimated = sum(os.path.getsize(p) for p in paths)
+    partitions = partitions_for_budget(estimated, memory_budget_bytes)
+    stats: Dict[str, int] = {}
+    sources = ((p, _iter_source(p)) for p in paths)
+
+    with ExitStack() as stack:
+        out = stack.enter_context(open(output_path, "w", encoding="utf-8"))
+        provenance_file = stack.enter_context(open(provenance_path, "w", encoding="utf-8")) if provenance_path else None
+        merged = merge_deduplicate(
+            sources, partitions=partitions, spill_dir=spill_dir, stats=stats, memory_budget_bytes=memory_budget_bytes
+        )
+        for record, provenance in merged:
+            out.write(json.dumps(record, ensure_ascii=False))
+            out.write("\n")
+            if provenance_file is not None:
+                provenance_file.write(json.dumps(provenance, ensure_ascii=False))
+                provenance_file.write("\n")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge catalog files into one deduplicated JSON Lines file.")
+    parser.add_argument("output")
+    parser.add_argument("sources", nargs="+")
+    parser.add_argument("--provenance", help="JSON Lines file with one provenance line per output record")
+    parser.add_argument("--budget-mb", type=float, default=256, help="memory budget for one partition")
+    parser.add_argument("--spill-dir", help="directory for temporary spill files")
+    args = parser.parse_args()
+    merge_stats = merge_catalog_files(
+        args.sources, args.output, args.provenance, int(args.budget_mb * 2**20), args.spill_dir
+    )
+    print(json.dumps(merge_stats, indent=2))
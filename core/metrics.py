@@ -0,0 +1,266 @@
+"""
+Lightweight per-stage instrumentation: timing spans, record counters, and
+peak-memory sampling, with Prometheus text and JSON exposition.
+
+Instrumentation is disabled by default. Enable it with the ``JDA_METRICS=1``
+environment variable or by calling ``enable()``; callers that only need it
+for a while (e.g. one UI session's performance panel) ``acquire`` and
+``release`` it instead, and it stays on while any of them holds it. A hold
+taken with a ``ttl`` lapses unless it is acquired again within that many
+seconds, so an owner that goes away without releasing (a closed browser tab)
+does not keep recording on for good. When disabled, ``span()`` returns a
+shared no-op context and ``timed`` functions skip straight to the wrapped
+call, so the overhead is a single flag check.
+
+Spans, counters and the tracemalloc peak are process-wide. Peak memory is
+measured with ``tracemalloc.reset_peak()``, so with several owners recording
+at once a span's peak also includes the other owners' allocations made
+while it was open; it is only meaningful while a single session records.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, List, Tuple
+
+_NULL_SPAN = nullcontext()
+
+_enabled = os.environ.get("JDA_METRICS", "").strip().lower() in ("1", "true", "yes", "on")
+_track_memory = False
+# True while tracemalloc runs because this module started it.
+_started_tracemalloc = False
+# Recording stays on while it is enabled globally or held by any owner.
+_enabled_globally = _enabled
+_track_memory_globally = False
+# owner -> (track_memory, monotonic expiry or None)
+_owners: Dict[str, Tuple[bool, float | None]] = {}
+_next_expiry: float | None = None
+_lock = threading.Lock()
+_local = threading.local()
+
+_spans: Dict[str, Dict[str, float]] = {}
+_counters: Dict[str, int] = {}
+
+
+def is_enabled() -> bool:
+    """Returns True if instrumentation is currently recording."""
+    _expire_holds()
+    return _enabled
+
+
+def _expire_holds() -> None:
+    """Drops the holds whose ttl has passed."""
+    if _next_expiry is None or time.monotonic() < _next_expiry:
+        return
+    with _lock:
+        now = time.monotonic()
+        for owner in [owner for owner, (_, expiry) in _owners.items() if expiry is not None and expiry <= now]:
+            del _owners[owner]
+        _apply_state()
+
+
+def _apply_state() -> None:
+    """Switches recording and memory tracking to match the global flag and the owners."""
+    global _enabled, _track_memory, _started_tracemalloc, _next_expiry
+    expiries = [expiry for _, expiry in _owners.values() if expiry is not None]
+    _next_expiry = min(expiries) if expiries else None
+    _enabled = _enabled_globally or bool(_owners)
+    _track_memory = _enabled and (_track_memory_globally or any(track for track, _ in _owners.values()))
+    if _track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    elif not _track_memory and _started_tracemalloc:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+def enable(track_memory: bool = False) -> None:
+    """
+    Turns on recording. With ``track_memory`` set, tracemalloc is started and
+    each span also records the peak memory allocated while it was open.
+    """
+    global _enabled_globally, _track_memory_globally
+    with _lock:
+        _enabled_globally = True
+        _track_memory_globally = track_memory
+        _apply_state()
+
+
+def disable() -> None:
+    """
+    Turns off recording, including every ``acquire`` hold, and stops
+    tracemalloc if this module started it.
+    """
+    global _enabled_globally, _track_memory_globally
+    with _lock:
+        _enabled_globally = False
+        _track_memory_globally = False
+        _owners.clear()
+        _apply_state()
+
+
+def acquire(owner: str, track_memory: bool = False, ttl: float | None = None) -> None:
+    """
+    Keeps recording on on behalf of ``owner`` until it calls ``release``, or
+    with a ``ttl``, until ``ttl`` seconds pass without another ``acquire``.
+    Idempotent; acquiring again refreshes the ttl.
+    """
+    expiry = None if ttl is None else time.monotonic() + ttl
+    with _lock:
+        _owners[owner] = (track_memory, expiry)
+        _apply_state()
+
+
+def release(owner: str) -> None:
+    """Drops ``owner``'s hold; recording stops once nothing holds or enables it."""
+    with _lock:
+        if _owners.pop(owner, None) is None:
+            return
+        _apply_state()
+
+
+def reset() -> None:
+    """Clears all recorded spans and counters."""
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def count(name: str, value: int = 1) -> None:
+    """Adds ``value`` to the named counter (no-op while disabled)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + int(value)
+
+
+def _memory_stack() -> List[Dict[str, int]]:
+    stack = getattr(_local, "memory_stack", None)
+    if stack is None:
+        stack = []
+        _local.memory_stack = stack
+    return stack
+
+
+@contextmanager
+def _recording_span(name: str):
+    stack = None
+    frame = None
+    if _track_memory and tracemalloc.is_tracing():
+        stack = _memory_stack()
+        current, peak = tracemalloc.get_traced_memory()
+        # The peak is reset for this span, so fold it into the enclosing one first.
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"start": current, "peak": current}
+        stack.append(frame)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        peak_bytes = None
+        if frame is not None:
+            stack.pop()
+            frame["peak"] = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            peak_bytes = max(frame["peak"] - frame["start"], 0)
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], frame["peak"])
+
+        with _lock:
+            stats = _spans.get(name)
+            if stats is None:
+                stats = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                         "last_seconds": 0.0, "peak_memory_bytes": 0}
+                _spans[name] = stats
+            stats["count"] += 1
+            stats["total_seconds"] += elapsed
+            stats["last_seconds"] = elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            if peak_bytes is not None:
+                stats["peak_memory_bytes"] = max(stats["peak_memory_bytes"], peak_bytes)
+
+
+def span(name: str):
+    """
+    Returns a context manager timing the enclosed block under ``name``.
+    Returns a shared no-op context while disabled.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    _expire_holds()
+    if not _enabled:
+        return _NULL_SPAN
+    return _recording_span(name)
+
+
+def timed(name: str) -> Callable:
+    """Decorator recording each call of the wrapped function as a span."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> Dict[str, Any]:
+    """Returns a copy of all recorded spans and counters."""
+    with _lock:
+        return {
+            "enabled": _enabled,
+            "spans": {name: dict(stats) for name, stats in _spans.items()},
+            "counters": dict(_counters),
+        }
+
+
+def to_json() -> str:
+    """Dumps the current snapshot as a formatted JSON string."""
+    return json.dumps(snapshot(), indent=2)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(prefix: str = "jda") -> str:
+    """Renders the current snapshot in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = []
+
+    spans = sorted(data["spans"].items())
+    if spans:
+        lines.append(f"# HELP {prefix}_stage_seconds Wall-clock time spent in each stage.")
+        lines.append(f"# TYPE {prefix}_stage_seconds summary")
+        for name, stats in spans:
+            label = f'stage="{_escape_label(name)}"'
+            lines.append(f"{prefix}_stage_seconds_sum{{{label}}} {stats['total_seconds']:.9f}")
+            lines.append(f"{prefix}_stage_seconds_count{{{label}}} {int(stats['count'])}")
+        lines.append(f"# HELP {prefix}_stage_max_seconds Slowest observed call of each stage.")
+        lines.append(f"# TYPE {prefix}_stage_max_seconds gauge")
+        for name, stats in spans:
+            label = f'stage="{_escape_label(name)}"'
+            lines.append(f"{prefix}_stage_max_seconds{{{label}}} {stats['max_seconds']:.9f}")
+        lines.append(f"# HELP {prefix}_stage_peak_memory_bytes Peak memory allocated within each stage.")
+        lines.append(f"# TYPE {prefix}_stage_peak_memory_bytes gauge")
+        for name, stats in spans:
+            label = f'stage="{_escape_label(name)}"'
+            lines.append(f"{prefix}_stage_peak_memory_bytes{{{label}}} {int(stats['peak_memory_bytes'])}")
+
+    counters = sorted(data["counters"].items())
+    if counters:
+        lines.append(f"# HELP {prefix}_records_total Records processed per counter.")
+        lines.append(f"# TYPE {prefix}_records_total counter")
+        for name, value in counters:
+            lines.append(f'{prefix}_records_total{{counter="{_escape_label(name)}"}} {value}')
+
+    return "\n".join(lines) + "\n" if lines else ""
@@ -0,0 +1,393 @@
+"""
+Random access to large JSON Lines (NDJSON) catalogs.
+
+The catalog file is memory-mapped and a binary sidecar index (``<path>.idx``)
+maps each record number to its byte range, so any record or page is read by
+slicing the map without parsing the rest of the file. An optional secondary
+index (``<path>.keys.json``) maps canonical positionTitle/department values to
+record numbers. Both sidecars remember how much of the file they cover and are
+extended incrementally when records are appended; a rewritten or truncated
+file triggers a full rebuild. An index is reused as is while the file's inode,
+size and mtime are unchanged; otherwise the indexed range must still hash to
+the stored sha256, which costs one sequential read but no parsing. An open
+catalog keeps its hash state across refreshes, so after an append it only
+hashes the new bytes. A partially written last line is left out of the index
+until it is complete.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from core import metrics
+
+INDEX_MAGIC = b"JDAIDX2\n"
+# magic, covered byte count, record count, sha256 of the covered bytes, and the
+# file's inode, size and mtime (ns) when the index was written
+_HEADER = struct.Struct("<8sQQ32sQQQ")
+_HASH_BLOCK = 16 * 1024 * 1024
+# Bytes at each end of the hashed prefix compared before hashing resumes after a remap.
+_HASH_EDGE = 4096
+
+DEFAULT_KEY_FIELDS = ("positionTitle", "department")
+
+
+def _is_json_object(data: bytes) -> bool:
+    try:
+        return isinstance(json.loads(data), dict)
+    except ValueError:
+        return False
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], path: str) -> int:
+    """Writes records as JSON Lines, replacing the file. Returns the count written."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def append_ndjson(records: Iterable[Dict[str, Any]], path: str) -> int:
+    """Appends records to a JSON Lines file. Returns the count written."""
+    count = 0
+    with open(path, "a+b") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False).encode("utf-8"))
+            f.write(b"\n")
+            count += 1
+    return count
+
+
+def iter_ndjson(lines: Iterable) -> Iterator[Dict[str, Any]]:
+    """Parses JSON Lines (text or bytes) one record at a time, skipping blank lines."""
+    for line_no, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            raise ValueError(f"Invalid JSON on line {line_no}.")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_no} is not a JSON object.")
+        yield record
+
+
+def load_ndjson(file_obj) -> List[Dict[str, Any]]:
+    """Loads every record from a JSON Lines file-like object (text or bytes)."""
+    return list(iter_ndjson(file_obj))
+
+
+class NDJSONCatalog:
+    """
+    Memory-mapped, index-backed reader for a JSON Lines catalog.
+
+    Usage::
+
+        with NDJSONCatalog("catalog.jsonl") as catalog:
+            record = catalog.get(12345)
+            page = catalog.page(3, page_size=50)
+            matches = catalog.find("department", "Finance")
+    """
+
+    def __init__(self, path: str, key_fields: Tuple[str, ...] = DEFAULT_KEY_FIELDS):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.keys_path = f"{path}.keys.json"
+        self.key_fields = tuple(key_fields)
+        self._file = None
+        self._map = None
+        self._ranges = array("Q")  # flat [start0, end0, start1, end1, ...]
+        self._covered = 0  # bytes indexed through the last newline
+        self._covered_digest = b""
+        self._stat: Tuple[int, int, int] | None = None  # (inode, size, mtime) at the last refresh
+        self._file_stat: Tuple[int, int, int] | None = None  # the same for the current mapping
+        # (bytes hashed, sha256, first and last _HASH_EDGE bytes hashed), kept across appends
+        self._hash_state: Tuple[int, Any, bytes, bytes] | None = None
+        self._complete = 0  # newline-terminated records, i.e. those persisted
+        self._keys: Dict[str, Dict[str, List[int]]] | None = None
+        self._keys_covered = 0
+        self.refresh()
+
+    # --- lifecycle ---
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return len(self._ranges) // 2
+
+    # --- indexing ---
+
+    def _remap(self) -> int:
+        self.close()
+        self._file = open(self.path, "rb")
+        stat = os.fstat(self._file.fileno())
+        previous, self._file_stat = self._file_stat, (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else None
+        if self._hash_state is not None and not self._looks_appended(previous):
+            self._hash_state = None
+        return stat.st_size
+
+    def _looks_appended(self, previous: Tuple[int, int, int] | None) -> bool:
+        """
+        True if the new mapping looks like the previous file with bytes
+        appended: same inode, grown, and the hashed prefix still starts and
+        ends with the same bytes. Hashing then resumes from the saved state,
+        so an append costs a read of the new tail only. A same-inode rewrite
+        that grows the file and keeps both edges is taken for an append; a
+        new inode (e.g. a replaced file) or a file that did not grow is
+        hashed again from the start.
+        """
+        hashed, _, head, tail = self._hash_state
+        if previous is None or previous[0] != self._file_stat[0] or self._file_stat[1] <= previous[1]:
+            return False
+        if self._map is None or hashed > len(self._map):
+            return False
+        return self._map[:len(head)] == head and self._map[hashed - len(tail):hashed] == tail
+
+    def _digest(self, covered: int) -> bytes:
+        """
+        sha256 of the first ``covered`` bytes of the mapped file. Hashing
+        continues from the previous call when it covered a shorter prefix, so
+        digesting the old and then the extended covered range reads the file once.
+        """
+        if self._map is None or not covered:
+            return b"\0" * 32
+        if self._hash_state is not None and self._hash_state[0] <= covered:
+            start, hasher = self._hash_state[0], self._hash_state[1].copy()
+        else:
+            start, hasher = 0, hashlib.sha256()
+        for block in range(start, covered, _HASH_BLOCK):
+            hasher.update(self._map[block:min(block + _HASH_BLOCK, covered)])
+        metrics.count("ndjson.hashed_bytes", covered - start)
+        edge = min(_HASH_EDGE, covered)
+        self._hash_state = (covered, hasher, self._map[:edge], self._map[covered - edge:covered])
+        return hasher.digest()
+
+    def _prefix_unchanged(self, covered: int, digest: bytes, stat: Tuple[int, int, int] | None, size: int) -> bool:
+        """
+        True if the first ``covered`` bytes are still the indexed ones: the
+        file is untouched since (same inode, size and mtime), or its covered
+        range hashes to the same digest (e.g. after an append).
+        """
+        if covered > size:
+            return False
+        if stat is not None and stat == self._file_stat:
+            return True
+        # The byte before the covered boundary must still be the indexed newline.
+        if covered and self._map[covered - 1:covered] != b"\n":
+            return False
+        return digest == self._digest(covered)
+
+    def _read_sidecar(self, size: int) -> bool:
+        """Loads the persisted offsets if they still describe a prefix of the file."""
+        try:
+            with open(self.index_path, "rb") as f:
+                header = f.read(_HEADER.size)
+                if len(header) != _HEADER.size:
+                    return False
+                magic, covered, count, digest, *stat = _HEADER.unpack(header)
+                if magic != INDEX_MAGIC or not self._prefix_unchanged(covered, digest, tuple(stat), size):
+                    return False
+                ranges = array("Q")
+                ranges.frombytes(f.read(count * 2 * ranges.itemsize))
+        except (OSError, ValueError):
+            return False
+        if len(ranges) != count * 2:
+            return False
+        self._ranges = ranges
+        self._covered = covered
+        self._covered_digest = digest
+        self._complete = count
+        return True
+
+    def _write_sidecar(self, complete_count: int) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(INDEX_MAGIC, self._covered, complete_count, self._covered_digest, *self._file_stat))
+            f.write(self._ranges[:complete_count * 2].tobytes())
+        os.replace(tmp_path, self.index_path)
+
+    def _scan(self, start: int, size: int) -> Tuple[int, int]:
+        """
+        Appends byte ranges for the lines in [start, size). Returns
+        (new covered offset, number of newline-terminated records). An
+        unterminated last line is only indexed if it is a complete JSON
+        object, so a partially written append stays invisible.
+        """
+        covered = start
+        complete = len(self._ranges) // 2
+        pos = start
+        mapped = self._map
+        while pos < size:
+            newline = mapped.find(b"\n", pos, size)
+            end = newline if newline != -1 else size
+            if mapped[pos:end].strip():
+                if newline == -1 and not _is_json_object(mapped[pos:end]):
+                    break
+                self._ranges.append(pos)
+                self._ranges.append(end)
+                if newline != -1:
+                    complete = len(self._ranges) // 2
+            if newline == -1:
+                break
+            pos = covered = newline + 1
+        return covered, complete
+
+    @metrics.timed("ndjson.refresh")
+    def refresh(self) -> int:
+        """
+        Brings the offset index up to date with the file, scanning only bytes
+        appended since the last index. Returns the number of records added.
+        """
+        before = len(self)
+        size = self._remap()
+        in_memory_valid = self._covered and self._prefix_unchanged(
+            self._covered, self._covered_digest, self._stat, size
+        )
+        if not in_memory_valid and not self._read_sidecar(size):
+            self._ranges = array("Q")
+            self._covered = 0
+            self._covered_digest = self._digest(0)
+            self._complete = 0
+            self._keys = None
+            self._keys_covered = 0
+            before = 0
+        elif self._keys is not None and self._keys_covered > len(self):
+            self._keys = None
+
+        # An unterminated trailing line is indexed in memory only, so drop any
+        # such range from a previous refresh before rescanning the tail.
+        del self._ranges[self._complete * 2:]
+        covered, complete = self._scan(self._covered, size)
+        if covered != self._covered or complete != self._complete or not os.path.exists(self.index_path):
+            if covered != self._covered:
+                self._covered_digest = self._digest(covered)
+            self._covered = covered
+            self._complete = complete
+            self._write_sidecar(complete)
+        self._stat = self._file_stat
+
+        added = len(self) - before
+        metrics.count("ndjson.indexed_records", added)
+        return added
+
+    # --- record access ---
+
+    def _parse(self, start: int, end: int) -> Dict[str, Any]:
+        return json.loads(self._map[start:end])
+
+    def get_bytes(self, record_number: int) -> bytes:
+        """Returns the raw JSON bytes of one record."""
+        if record_number < 0:
+            record_number += len(self)
+        if not 0 <= record_number < len(self):
+            raise IndexError(f"Record {record_number} out of range (catalog has {len(self)} records).")
+        return self._map[self._ranges[record_number * 2]:self._ranges[record_number * 2 + 1]]
+
+    def get(self, record_number: int) -> Dict[str, Any]:
+        """Parses and returns one record by its position in the file."""
+        return json.loads(self.get_bytes(record_number))
+
+    def __getitem__(self, record_number: int) -> Dict[str, Any]:
+        return self.get(record_number)
+
+    def page(self, page_number: int, page_size: int = 50) -> List[Dict[str, Any]]:
+        """Returns the records on a zero-based page, parsing only those records."""
+        start = max(page_number, 0) * page_size
+        stop = min(start + page_size, len(self))
+        return [
+            self._parse(self._ranges[i * 2], self._ranges[i * 2 + 1])
+            for i in range(start, stop)
+        ]
+
+    def get_many(self, record_numbers: Iterable[int]) -> List[Dict[str, Any]]:
+        """Returns several records by number, in the order requested."""
+        return [self.get(i) for i in record_numbers]
+
+    # --- secondary index ---
+
+    def _load_keys(self) -> None:
+        if self._keys is not None:
+            return
+        try:
+            with open(self.keys_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            stored_covered = int(stored["covered"])
+            if (
+                stored_covered <= self._covered
+                and stored.get("fingerprint") == (
+                    self._covered_digest if stored_covered == self._covered else self._digest(stored_covered)
+                ).hex()
+                and tuple(stored.get("fields", ())) == self.key_fields
+                and stored.get("records", 0) <= len(self)
+            ):
+                self._keys = stored["keys"]
+                self._keys_covered = stored["records"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        if self._keys is None:
+            self._keys = {name: {} for name in self.key_fields}
+            self._keys_covered = 0
+
+    @metrics.timed("ndjson.build_key_index")
+    def build_key_index(self) -> int:
+        """
+        Extends the secondary index over records not yet covered and persists
+        it. Returns the number of records newly indexed.
+        """
+        from core.io import canonicalize  # core.io imports this module
+
+        self._load_keys()
+        start = self._keys_covered
+        for i in range(start, len(self)):
+            record = self.get(i)
+            for name in self.key_fields:
+                self._keys[name].setdefault(canonicalize(record.get(name)), []).append(i)
+        self._keys_covered = len(self)
+
+        if self._keys_covered != start:
+            tmp_path = f"{self.keys_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "fields": list(self.key_fields),
+                    "covered": self._covered,
+                    "fingerprint": self._covered_digest.hex(),
+                    "records": self._keys_covered,
+                    "keys": self._keys,
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, self.keys_path)
+        return self._keys_covered - start
+
+    def find(self, field: str, value: Any) -> List[int]:
+        """Returns the record numbers whose ``field`` matches ``value`` (case/space-insensitive)."""
+        if field not in self.key_fields:
+            raise KeyError(f"'{field}' is not a secondary index field ({', '.join(self.key_fields)}).")
+        from core.io import canonicalize
+
+        self.build_key_index()
+        return list(self._keys[field].get(canonicalize(value), []))
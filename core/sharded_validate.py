@@ -0,0 +1,108 @@
+"""
+Map-reduce validation across worker processes.
+
+The map step, ``validate_shard``, runs every per-row rule on one contiguous
+shard and returns its issues plus the duplicate key of each schema-valid row.
+The reduce step, ``reduce_shards``, walks the shard results in offset order,
+resolves duplicates against one global key set, and splices the Duplicate
+warnings back in after each row's other issues. The result is identical, in
+indexes and order, to ``validate_dataset(records, build_models=False)``.
+
+Shard inputs and results are plain JSON-compatible data, so the map step can
+run on any ``concurrent.futures.Executor`` (or be shipped to other machines)
+as long as the results reach ``reduce_shards``.
+"""
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List
+
+from core import metrics
+from core.issues import IssueStore
+from core.validate import DUPLICATE_MESSAGE, ValidationIssue, _validate_rows
+
+DEFAULT_SHARD_SIZE = 5000
+
+
+def make_shards(records_data: List[Dict[str, Any]], shard_size: int = DEFAULT_SHARD_SIZE) -> List[Dict[str, Any]]:
+    """Splits records into ``{"offset", "records"}`` shards of at most ``shard_size`` rows."""
+    shard_size = max(int(shard_size), 1)
+    return [
+        {"offset": start, "records": records_data[start:start + shard_size]}
+        for start in range(0, len(records_data), shard_size)
+    ]
+
+
+def validate_shard(shard: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map step: validates one shard without duplicate detection. Returns
+    ``{"offset", "issues": [[index, field, message, severity, rule], ...],
+    "keys": [[index, duplicate_key], ...]}``.
+    """
+    _, issues, row_keys = _validate_rows(shard["records"], shard["offset"], None, False, True)
+    return {
+        "offset": shard["offset"],
+        "issues": [[i.index, i.field, i.message, i.severity, i.rule] for i in issues],
+        "keys": [[idx, list(key)] for idx, key in row_keys],
+    }
+
+
+def reduce_shards(
+    results: Iterable[Dict[str, Any]],
+    issues: List[ValidationIssue] | IssueStore | None = None,
+) -> List[ValidationIssue] | IssueStore:
+    """
+    Reduce step: applies global duplicate detection and merges shard issues in
+    row order, appending to ``issues`` (a new list if None).
+    """
+    seen = set()
+    merged = issues if issues is not None else []
+    for result in sorted(results, key=lambda r: r["offset"]):
+        duplicate_rows = []
+        for idx, key in result["keys"]:
+            key = tuple(key)
+            if key in seen:
+                duplicate_rows.append(idx)
+            else:
+                seen.add(key)
+
+        shard_issues = result["issues"]
+        position = 0
+        for row in duplicate_rows:
+            # The duplicate rule runs last for a row, so it follows that row's other issues.
+            while position < len(shard_issues) and shard_issues[position][0] <= row:
+                merged.append(ValidationIssue(*shard_issues[position]))
+                position += 1
+            merged.append(ValidationIssue(row, "Duplicate", DUPLICATE_MESSAGE, "Warning", "duplicate"))
+        merged.extend(ValidationIssue(*issue) for issue in shard_issues[position:])
+    return merged
+
+
+@metrics.timed("validate.validate_dataset_sharded")
+def validate_dataset_sharded(
+    records_data: List[Dict[str, Any]],
+    workers: int | None = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    executor: Executor | None = None,
+    issues: List[ValidationIssue] | IssueStore | None = None,
+) -> List[ValidationIssue] | IssueStore:
+    """
+    Validates records in parallel shards and returns the same issues as the
+    serial ``validate_dataset(records, build_models=False)``. Uses ``executor``
+    if given, otherwise a process pool of ``workers`` (default: CPU count).
+    Inputs that fit in one shard are validated inline. Issues are appended to
+    ``issues`` (e.g. an ``IssueStore``) if given.
+    """
+    shards = make_shards(records_data, shard_size)
+    if executor is not None:
+        results = list(executor.map(validate_shard, shards))
+    elif len(shards) <= 1 or workers == 1:
+        results = [validate_shard(shard) for shard in shards]
+    else:
+        max_workers = min(workers or os.cpu_count() or 1, len(shards))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(validate_shard, shards))
+
+    issues = reduce_shards(results, issues)
+    metrics.count("validate.records", len(records_data))
+    metrics.count("validate.issues", len(issues))
+    return issues
@@ -0,0 +1,317 @@
+"""
+"Find similar jobs": TF-IDF cosine search over titles and narratives.
+
+Each record becomes a sparse vector of sublinear term frequencies
+(``1 + log(count)``, title tokens counted ``TITLE_WEIGHT`` times); IDF
+weights are applied at query time from live document frequencies, so they
+stay correct as records change.
+
+Vectors live in two segments. The main segment is a pair of CSR layouts
+(doc-major for norms and updates, term-major for search) built in one
+vectorized pass. Records added or edited since then go to a small delta
+segment and their main entries are masked out; once the delta grows past
+``compact_ratio`` of the index, both are merged back into a new main
+segment. A query gathers the postings of its terms from the main segment,
+accumulates scores with ``np.bincount``, adds the delta scores the same
+way, divides by the (lazily recomputed) document norms and takes the top
+``k`` with ``np.argpartition``.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from core import metrics
+from core.incremental import PositionalIndex
+
+SIMILARITY_FIELDS = [
+    "positionTitle",
+    "key_duties_responsibilities",
+    "position_complexity",
+    "organizational_impact",
+    "career_progression_path",
+]
+TITLE_WEIGHT = 2
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or our such that the their this to with "
+    "will".split()
+)
+_TOKEN = re.compile(r"[a-z0-9]+")
+_EMPTY_INT = np.zeros(0, dtype=np.int64)
+_EMPTY_FLOAT = np.zeros(0, dtype=np.float64)
+
+
+def tokenize(text: Any) -> List[str]:
+    """Lowercase alphanumeric tokens of ``text`` without stopwords or single letters."""
+    if not text:
+        return []
+    return [t for t in _TOKEN.findall(str(text).lower()) if (len(t) > 1 or t.isdigit()) and t not in STOPWORDS]
+
+
+def record_tokens(record: Dict[str, Any], fields: List[str] = SIMILARITY_FIELDS) -> List[str]:
+    tokens = []
+    for field in fields:
+        field_tokens = tokenize(record.get(field))
+        tokens.extend(field_tokens * (TITLE_WEIGHT if field == "positionTitle" else 1))
+    return tokens
+
+
+class SimilarityIndex(PositionalIndex):
+    """
+    Incrementally updated TF-IDF index over records addressed by their
+    position in the dataset. Build with ``from_records``, keep current with
+    ``refresh`` (or ``update``/``remove``), and query with ``search``.
+    """
+
+    metrics_name = "similarity"
+
+    def __init__(self, fields: List[str] = SIMILARITY_FIELDS, compact_ratio: float = 0.1):
+        self.fields = list(fields)
+        self.compact_ratio = compact_ratio
+        self._clear()
+
+    def _clear(self) -> None:
+        self._vocab: Dict[str, int] = {}
+        self._df = _EMPTY_INT.copy()
+        self._live = np.zeros(0, dtype=bool)
+        self._in_main = np.zeros(0, dtype=bool)
+        # Main segment: doc-major CSR and the same entries sorted by term.
+        self._doc_ptr = np.zeros(1, dtype=np.int64)
+        self._doc_terms = _EMPTY_INT
+        self._doc_tf = _EMPTY_FLOAT
+        self._term_ptr = np.zeros(1, dtype=np.int64)
+        self._term_docs = _EMPTY_INT
+        self._term_tf = _EMPTY_FLOAT
+        # Delta segment: slot -> (term ids, tf), or None for a removed slot.
+        self._delta: Dict[int, Tuple[np.ndarray, np.ndarray] | None] = {}
+        self._norms: np.ndarray | None = None
+        self._records: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], **kwargs) -> "SimilarityIndex":
+        index = cls(**kwargs)
+        index._index_all(records)
+        return index
+
+    @metrics.timed("similarity.build")
+    def _index_all(self, records: List[Dict[str, Any]]) -> None:
+        """Builds the main segment for ``records`` in one pass, counting terms with ``np.unique``."""
+        self._clear()
+        vocab = self._vocab
+        parts: List[np.ndarray] = []
+        lengths = np.zeros(len(records), dtype=np.int64)
+        # Templated narratives repeat across records: tokenize each distinct field text once.
+        text_ids: Dict[Tuple[bool, str], np.ndarray] = {}
+        for slot, record in enumerate(records):
+            length = 0
+            for field in self.fields:
+                text = record.get(field)
+                if not text:
+                    continue
+                key = (field == "positionTitle", text) if isinstance(text, str) else None
+                ids = text_ids.get(key) if key is not None else None
+                if ids is None:
+                    tokens = record_tokens({field: text}, [field])
+                    ids = np.array([vocab.setdefault(token, len(vocab)) for token in tokens], dtype=np.int64)
+                    if key is not None:
+                        text_ids[key] = ids
+                parts.append(ids)
+                length += len(ids)
+            lengths[slot] = length
+
+        vocab_size = max(len(vocab), 1)
+        doc_ids = np.repeat(np.arange(len(records), dtype=np.int64), lengths)
+        all_ids = np.concatenate(parts) if parts else _EMPTY_INT
+        keys, counts = np.unique(doc_ids * vocab_size + all_ids, return_counts=True)
+        self._live = np.ones(len(records), dtype=bool)
+        self._set_main(keys // vocab_size, keys % vocab_size, 1.0 + np.log(counts))
+        self._df = np.bincount(self._doc_terms, minlength=len(vocab)).astype(np.int64)
+        self._records = list(records)
+
+    def __len__(self) -> int:
+        return int(self._live.sum())
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._vocab)
+
+    # --- Updates ---
+
+    def _grow(self, size: int) -> None:
+        if size > len(self._live):
+            extra = size - len(self._live)
+            self._live = np.concatenate([self._live, np.zeros(extra, dtype=bool)])
+            self._in_main = np.concatenate([self._in_main, np.zeros(extra, dtype=bool)])
+
+    def _vectorize(self, tokens: List[str], grow: bool) -> Tuple[np.ndarray, np.ndarray]:
+        vocab = self._vocab
+        if grow:
+            ids = [vocab.setdefault(token, len(vocab)) for token in tokens]
+        else:
+            ids = [vocab[token] for token in tokens if token in vocab]
+        terms, counts = np.unique(np.array(ids, dtype=np.int64), return_counts=True)
+        return terms, 1.0 + np.log(counts)
+
+    def _entries(self, slot: int) -> Tuple[np.ndarray, np.ndarray] | None:
+        if slot in self._delta:
+            return self._delta[slot]
+        if slot < len(self._in_main) and self._in_main[slot]:
+            start, end = self._doc_ptr[slot], self._doc_ptr[slot + 1]
+            return self._doc_terms[start:end], self._doc_tf[start:end]
+        return None
+
+    def _adjust_df(self, terms: np.ndarray, delta: int) -> None:
+        if len(self._df) < len(self._vocab):
+            self._df = np.concatenate([self._df, np.zeros(len(self._vocab) - len(self._df), dtype=np.int64)])
+        self._df[terms] += delta  # term ids are unique within one document
+
+    def _set(self, slot: int, record: Dict[str, Any] | None) -> None:
+        old = self._entries(slot)
+        if old is not None:
+            self._adjust_df(old[0], -1)
+        if record is None:
+            self._delta[slot] = None
+            self._live[slot] = False
+        else:
+            new = self._vectorize(record_tokens(record, self.fields), grow=True)
+            self._adjust_df(new[0], 1)
+            self._delta[slot] = new
+            self._live[slot] = True
+        self._in_main[slot] = False
+        self._norms = None
+
+    def update(self, slot: int, record: Dict[str, Any]) -> None:
+        """Indexes ``record`` at position ``slot``, replacing what was there."""
+        self._grow(slot + 1)
+        self._set(slot, record)
+        self._maybe_compact()
+
+    def remove(self, slot: int) -> None:
+        if slot < len(self._live):
+            self._set(slot, None)
+            self._maybe_compact()
+
+    def _before_updates(self, size: int) -> None:
+        self._grow(size)
+
+    def _reindex(self, position: int, record: Dict[str, Any] | None) -> None:
+        self._set(position, record)
+
+    def _after_updates(self) -> None:
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if len(self._delta) > max(self.compact_ratio * len(self._live), 64):
+            self._compact()
+
+    @metrics.timed("similarity.compact")
+    def _compact(self) -> None:
+        """Merges the delta into a new main segment (doc-major and term-major CSR)."""
+        size = len(self._live)
+        lengths = np.zeros(size, dtype=np.int64)
+        term_parts, tf_parts = [], []
+        for slot in range(size):
+            entries = self._entries(slot) if self._live[slot] else None
+            if entries is None:
+                continue
+            lengths[slot] = len(entries[0])
+            term_parts.append(entries[0])
+            tf_parts.append(entries[1])
+
+        doc_ids = np.repeat(np.arange(size, dtype=np.int64), lengths)
+        terms = np.concatenate(term_parts) if term_parts else _EMPTY_INT
+        tf = np.concatenate(tf_parts) if tf_parts else _EMPTY_FLOAT
+        self._set_main(doc_ids, terms, tf)
+
+    def _set_main(self, doc_ids: np.ndarray, terms: np.ndarray, tf: np.ndarray) -> None:
+        """Installs entries sorted by doc id as the main segment and clears the delta."""
+        size = len(self._live)
+        self._doc_ptr = np.concatenate([[0], np.cumsum(np.bincount(doc_ids, minlength=size))]).astype(np.int64)
+        self._doc_terms = terms
+        self._doc_tf = tf
+
+        # A stable argsort of 16-bit keys is a radix sort, several times faster than on int64.
+        small_vocab = len(self._vocab) <= np.iinfo(np.uint16).max + 1
+        order = np.argsort(terms.astype(np.uint16) if small_vocab else terms, kind="stable")
+        self._term_docs = doc_ids[order]
+        self._term_tf = tf[order]
+        term_counts = np.bincount(terms, minlength=len(self._vocab))
+        self._term_ptr = np.concatenate([[0], np.cumsum(term_counts)]).astype(np.int64)
+
+        self._in_main = self._live.copy()
+        self._delta = {}
+        self._norms = None
+
+    # --- Search ---
+
+    def _idf(self) -> np.ndarray:
+        live_count = int(self._live.sum())
+        df = self._df[:len(self._vocab)]
+        if len(df) < len(self._vocab):
+            df = np.concatenate([df, np.zeros(len(self._vocab) - len(df), dtype=np.int64)])
+        return np.log((1.0 + live_count) / (1.0 + df)) + 1.0
+
+    def _doc_norms(self, idf: np.ndarray) -> np.ndarray:
+        if self._norms is None:
+            size = len(self._live)
+            lengths = np.diff(self._doc_ptr)
+            doc_ids = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+            weights = (self._doc_tf * idf[self._doc_terms]) ** 2
+            squared = np.bincount(doc_ids, weights=weights, minlength=size)[:size]
+            squared[~self._in_main[:len(squared)]] = 0.0
+            for slot, entries in self._delta.items():
+                if entries is not None:
+                    squared[slot] = float(((entries[1] * idf[entries[0]]) ** 2).sum())
+            self._norms = np.sqrt(squared)
+        return self._norms
+
+    @metrics.timed("similarity.search")
+    def search(
+        self,
+        query: str | Dict[str, Any],
+        k: int = 10,
+        exclude: Iterable[int] = (),
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-``k`` ``(position, cosine score)`` pairs for a text query or a
+        record (same fields as the index), best first. Positions in
+        ``exclude`` (e.g. the record being edited) are skipped.
+        """
+        size = len(self._live)
+        tokens = tokenize(query) if isinstance(query, str) else record_tokens(query, self.fields)
+        terms, tf = self._vectorize(tokens, grow=False)
+        if not len(terms) or not size:
+            return []
+
+        idf = self._idf()
+        weights = tf * idf[terms]
+        weights /= np.linalg.norm(weights)
+        query_dense = np.zeros(len(self._vocab), dtype=np.float64)
+        query_dense[terms] = weights
+
+        # Main segment: gather postings of the query terms, then one bincount.
+        main_terms = terms[terms < len(self._term_ptr) - 1]
+        starts, ends = self._term_ptr[main_terms], self._term_ptr[main_terms + 1]
+        if len(main_terms):
+            positions = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+        else:
+            positions = _EMPTY_INT
+        docs = self._term_docs[positions]
+        contributions = self._term_tf[positions] * (idf * query_dense)[np.repeat(main_terms, ends - starts)]
+        scores = np.bincount(docs, weights=contributions, minlength=size)[:size]
+        scores[~self._in_main] = 0.0
+
+        # Delta segment: a small number of recently changed records.
+        for slot, entries in self._delta.items():
+            if entries is not None and len(entries[0]):
+                scores[slot] = float((entries[1] * idf[entries[0]] * query_dense[entries[0]]).sum())
+
+        norms = self._doc_norms(idf)
+        np.divide(scores, norms, out=scores, where=norms > 0)
+        excluded = [slot for slot in exclude if 0 <= slot < size]
+        scores[excluded] = 0.0
+
+        k = min(k, size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(slot), float(scores[slot])) for slot in top if scores[slot] > 0]
@@ -1,119 +1,503 @@
-from typing import List, Dict, Any, Tuple
+import re
+from typing import List, Dict, Any, Iterable, Tuple
 from pydantic import ValidationError
 from core.schema import JobRecord
-from core.constants import CAREER_FAMILIES
+from core.constants import CAREER_FAMILIES, LEVEL_KEYWORDS, FLSA_KEYWORDS, BANNED_PHRASES, SOC_CODE_PATTERN
+from core.keywords import KeywordMatcher
+from core.codegen import check_record
+from core import metrics
+from core.issues import IssueStore, ValidationIssue
+from core.io import dedupe_key_from
 
 
-class ValidationIssue:
-    def __init__(self, index: int, field: str, message: str, severity: str = "Error"):
-        self.index = index
-        self.field = field
-        self.message = message
-        self.severity = severity
+# Unrolled check generated from the JobRecord fields (see core.codegen): True
+# only for exact ``str`` (or ``None``/absent for optional fields) values, so
+# anything pydantic might coerce or reject falls back to full model validation.
+passes_schema_fast = check_record
 
-    def to_dict(self):
-        return {
-            "Index": self.index,
-            "Severity": self.severity,
-            "Field": self.field,
-            "Message": self.message
-        }
 
+DUPLICATE_MESSAGE = "Potential duplicate record detected (matches an earlier entry)."
 
-def _canonicalize(value: Any) -> str:
-    return str(value).strip().lower() if value is not None else ""
 
+KEYWORDS = KeywordMatcher({**LEVEL_KEYWORDS, **FLSA_KEYWORDS, "banned_phrase": BANNED_PHRASES})
+# Substring prefilters for validate_table: a superset of the rows ``KEYWORDS`` matches.
+_ENTRY_LEVEL_PATTERN = KEYWORDS.substring_pattern("entry_level")
+_BANNED_PHRASE_PATTERN = KEYWORDS.substring_pattern("banned_phrase")
+_SOC_CODE = re.compile(SOC_CODE_PATTERN)
 
-def validate_dataset(records_data: List[Dict[str, Any]]) -> Tuple[List[JobRecord], List[ValidationIssue]]:
+# Fields checked for banned phrases, in the order their issues are reported.
+BANNED_PHRASE_FIELDS = [
+    "key_duties_responsibilities",
+    "position_complexity",
+    "organizational_impact",
+    "career_progression_path",
+    "minimum_qualifications",
+    "preferred_qualifications",
+    "technical_skills",
+    "soft_skills",
+]
+
+
+def _check_keywords(idx: int, get, issues: List[ValidationIssue]) -> None:
+    """
+    Keyword-driven consistency rules. Each text field is scanned once by
+    ``KEYWORDS`` and the rules read the keyword groups found in it.
+    """
+    job_level = get("jobLevel")
+    level = KEYWORDS.scan(job_level)
+    senior = "senior_level" in level
+
+    complexity = get("position_complexity")
+    complexity_keywords = KEYWORDS.scan(complexity)
+    if job_level and "Senior" in job_level and complexity and "Entry" in complexity:
+        issues.append(ValidationIssue(
+            idx, "Logical Consistency",
+            f"Job Level is '{job_level}' but Complexity mentions 'Entry'.",
+            "Warning", "seniority_complexity"
+        ))
+    elif senior and "entry_level" in complexity_keywords:
+        # The wider LEVEL_KEYWORDS vocabulary (Manager, Director, Junior, ...)
+        # under its own rule, so seniority_complexity keeps its original scope.
+        issues.append(ValidationIssue(
+            idx, "Logical Consistency",
+            f"Job Level is '{job_level}' but Complexity mentions '{complexity_keywords['entry_level'][0]}'.",
+            "Warning", "level_complexity"
+        ))
+
+    flsa_status = get("FLSA_status")
+    if flsa_status is not None and str(flsa_status).strip():
+        flsa = KEYWORDS.scan(flsa_status)
+        if "flsa_non_exempt" not in flsa and "flsa_exempt" not in flsa:
+            issues.append(ValidationIssue(
+                idx, "FLSA_status",
+                f"Unrecognized FLSA status: '{flsa_status}'. Expected 'Exempt' or 'Non-Exempt'.",
+                "Warning", "flsa_status_unknown"
+            ))
+        elif senior and "flsa_non_exempt" in flsa:
+            issues.append(ValidationIssue(
+                idx, "FLSA_status",
+                f"FLSA status is '{flsa_status}' but Job Level '{job_level}' is usually exempt.",
+                "Warning", "flsa_level"
+            ))
+
+    soc_code = get("SOC_code")
+    if soc_code is not None and str(soc_code).strip() and not _SOC_CODE.fullmatch(str(soc_code).strip()):
+        issues.append(ValidationIssue(
+            idx, "SOC_code",
+            f"SOC code '{soc_code}' is not in the 00-0000 or 00-0000.00 format.",
+            "Warning", "soc_code_format"
+        ))
+
+    for field_name in BANNED_PHRASE_FIELDS:
+        if field_name == "position_complexity":
+            found = complexity_keywords
+        else:
+            value = get(field_name)
+            if not value:
+                continue
+            found = KEYWORDS.scan(value)
+        if "banned_phrase" in found:
+            phrases = ", ".join(f"'{p}'" for p in found["banned_phrase"])
+            issues.append(ValidationIssue(
+                idx, field_name, f"Contains banned phrase(s): {phrases}.", "Warning", "banned_phrase"
+            ))
+
+
+def _check_record(idx: int, get, issues: List[ValidationIssue], duplicate_keys: set | None) -> Tuple[str, ...]:
+    """
+    Applies the logical/enum rules to one schema-valid record via a field getter
+    and returns its duplicate key. With ``duplicate_keys=None`` the duplicate
+    rule is left to the caller (see ``core.sharded_validate``).
+    """
+    position_title = get("positionTitle")
+    department = get("department")
+    career_family = get("careerFamily")
+
+    # Required text fields should not be blank strings
+    if not str(position_title).strip():
+        issues.append(ValidationIssue(
+            idx, "positionTitle",
+            "Position Title is required and cannot be empty.",
+            "Error", "blank_required"
+        ))
+
+    if not str(department).strip():
+        issues.append(ValidationIssue(
+            idx, "department",
+            "Department is required and cannot be empty.",
+            "Error", "blank_required"
+        ))
+
+    # Check Career Family
+    if career_family not in CAREER_FAMILIES:
+        issues.append(ValidationIssue(
+            idx, "careerFamily",
+            f"Unknown Career Family: '{career_family}'. Fallbacks will be used.",
+            "Warning", "unknown_career_family"
+        ))
+
+    _check_keywords(idx, get, issues)
+
+    # Check for missing narrative fields that enhancement should populate
+    for field_name in [
+        "key_duties_responsibilities",
+        "position_complexity",
+        "organizational_impact",
+        "career_progression_path",
+    ]:
+        value = get(field_name)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            issues.append(ValidationIssue(
+                idx, field_name,
+                "Field is empty; enhancement templates may be needed.",
+                "Warning", "empty_narrative"
+            ))
+
+    # Duplicate detection across enriched key fields
+    dup_key = dedupe_key_from(get)
+    if duplicate_keys is None:
+        return dup_key
+    if dup_key in duplicate_keys:
+        issues.append(ValidationIssue(idx, "Duplicate", DUPLICATE_MESSAGE, "Warning", "duplicate"))
+    else:
+        duplicate_keys.add(dup_key)
+    return dup_key
+
+
+@metrics.timed("validate.validate_dataset")
+def validate_dataset(
+    records_data: List[Dict[str, Any]],
+    build_models: bool = True,
+    fast_path: bool = True,
+) -> Tuple[List[JobRecord], List[ValidationIssue]]:
     """
     Parses raw JSON dictionaries into JobRecords and validates them.
     Returns valid JobRecord objects and a list of issues found.
+
+    With ``build_models=False`` (for callers that only need the issues), rows
+    that pass ``passes_schema_fast`` are checked directly on the dict and no
+    JobRecord is built for them; only failing rows go through pydantic, so
+    error messages are unchanged. Constructing a model without validation
+    (``JobRecord.model_construct``) is slower than pydantic validating it, so
+    ``build_models=True`` always uses pydantic.
+    ``fast_path=False`` forces the pydantic path for every row.
     """
-    valid_records = []
-    issues = []
-    duplicate_keys = set()
+    valid_records, issues, _ = _validate_rows(records_data, 0, set(), build_models, fast_path)
+
+    metrics.count("validate.records", len(records_data))
+    metrics.count("validate.issues", len(issues))
+    return valid_records, issues
+
+
+@metrics.timed("validate.validate_issues")
+def validate_issues(records_data: List[Dict[str, Any]], fast_path: bool = True) -> IssueStore:
+    """
+    Same issues as ``validate_dataset(records, build_models=False)``, collected
+    into a compact ``IssueStore`` instead of a list of objects.
+    """
+    _, issues, _ = _validate_rows(records_data, 0, set(), False, fast_path, IssueStore())
+
+    metrics.count("validate.records", len(records_data))
+    metrics.count("validate.issues", len(issues))
+    return issues
 
+
+@metrics.timed("validate.revalidate_rows")
+def revalidate_rows(
+    records_data: List[Dict[str, Any]],
+    previous: IssueStore,
+    touched: Iterable[int],
+    data_version: int | None = None,
+) -> IssueStore:
+    """
+    Updates ``previous`` (issues for the same records before an edit) after
+    the rows at ``touched`` changed. Per-row rules run only on the touched
+    rows; other rows keep their previous issues. Duplicate detection is
+    dataset-wide, so it is recomputed from the key fields of every row that
+    passed the schema check (the slower schema and rule checks are not
+    repeated for untouched rows). The result matches a full validation.
+
+    ``previous`` must describe the rows by their current positions. If it
+    was computed for another ``data_version`` than the one given (rows were
+    removed or reordered since) or refers to rows that no longer exist, the
+    records are validated in full instead.
+    """
+    previous_rows = previous.indexes()
+    if (data_version is not None and getattr(previous, "data_version", None) != data_version) or (
+        len(previous_rows) and previous_rows.max() >= len(records_data)
+    ):
+        metrics.count("validate.revalidate_fallbacks")
+        return validate_issues(records_data)
+
+    touched = sorted({int(i) for i in touched})
+    fresh: Dict[int, List[ValidationIssue]] = {}
+    fresh_keys: Dict[int, Tuple[str, ...]] = {}
+    for idx in touched:
+        _, row_issues, row_keys = _validate_rows([records_data[idx]], idx, None, False, True)
+        fresh[idx] = row_issues
+        fresh_keys.update(row_keys)
+
+    schema_rules = [rule for rule in previous.values("rule") if rule.startswith("schema.")]
+    schema_failed = set(previous_rows[previous.select(rule=schema_rules)].tolist()) if schema_rules else set()
+
+    seen = set()
+    duplicates = set()
     for idx, raw_data in enumerate(records_data):
+        if idx in fresh:
+            key = fresh_keys.get(idx)
+            if key is None:
+                continue
+        elif idx in schema_failed:
+            continue
+        else:
+            key = dedupe_key_from(raw_data.get)
+        if key in seen:
+            duplicates.add(idx)
+        else:
+            seen.add(key)
+
+    issues = IssueStore()
+    position = 0
+    for row in sorted(set(previous_rows.tolist()) | fresh.keys() | duplicates):
+        start = position
+        while position < len(previous_rows) and previous_rows[position] == row:
+            position += 1
+        if row in fresh:
+            issues.extend(fresh[row])
+        else:
+            issues.extend(i for i in (previous[p] for p in range(start, position)) if i.rule != "duplicate")
+        if row in duplicates:
+            issues.add(row, "Duplicate", DUPLICATE_MESSAGE, "Warning", "duplicate")
+
+    metrics.count("validate.records", len(touched))
+    metrics.count("validate.issues", len(issues))
+    return issues
+
+
+def _validate_rows(
+    records_data: List[Dict[str, Any]],
+    start: int,
+    duplicate_keys: set | None,
+    build_models: bool,
+    fast_path: bool,
+    issues: List[ValidationIssue] | IssueStore | None = None,
+) -> Tuple[List[JobRecord], List[ValidationIssue] | IssueStore, List[Tuple[int, Tuple[str, ...]]]]:
+    """
+    Row loop behind ``validate_dataset``, numbering rows from ``start`` and
+    appending to ``issues`` (a new list if None). When ``duplicate_keys`` is
+    None, duplicate detection is skipped and the (index, key) of every
+    schema-valid row is returned instead.
+    """
+    valid_records = []
+    if issues is None:
+        issues = []
+    row_keys = []
+
+    for idx, raw_data in enumerate(records_data, start=start):
+        if fast_path and not build_models and passes_schema_fast(raw_data):
+            dup_key = _check_record(idx, raw_data.get, issues, duplicate_keys)
+            if duplicate_keys is None:
+                row_keys.append((idx, dup_key))
+            continue
+
         # 1. Schema Validation (Pydantic)
         try:
             record = JobRecord(**raw_data)
-            valid_records.append(record)
-
-            # 2. Logical/Enum Validation on the object
-
-            # Required text fields should not be blank strings
-            if not str(record.positionTitle).strip():
-                issues.append(ValidationIssue(
-                    idx, "positionTitle",
-                    "Position Title is required and cannot be empty.",
-                    "Error"
-                ))
-
-            if not str(record.department).strip():
-                issues.append(ValidationIssue(
-                    idx, "department",
-                    "Department is required and cannot be empty.",
-                    "Error"
-                ))
-
-            # Check Career Family
-            if record.careerFamily not in CAREER_FAMILIES:
-                issues.append(ValidationIssue(
-                    idx, "careerFamily",
-                    f"Unknown Career Family: '{record.careerFamily}'. Fallbacks will be used.",
-                    "Warning"
-                ))
-
-            # Check Logic: Seniority vs Complexity (Example rule)
-            if record.jobLevel and "Senior" in record.jobLevel:
-                if record.position_complexity and "Entry" in record.position_complexity:
-                    issues.append(ValidationIssue(
-                        idx, "Logical Consistency",
-                        f"Job Level is '{record.jobLevel}' but Complexity mentions 'Entry'.",
-                        "Warning"
-                    ))
-
-            # Check for missing narrative fields that enhancement should populate
-            for field_name in [
-                "key_duties_responsibilities",
-                "position_complexity",
-                "organizational_impact",
-                "career_progression_path",
-            ]:
-                value = getattr(record, field_name, None)
-                if value is None or (isinstance(value, str) and not value.strip()):
-                    issues.append(ValidationIssue(
-                        idx, field_name,
-                        "Field is empty; enhancement templates may be needed.",
-                        "Warning"
-                    ))
-
-            # Duplicate detection across enriched key fields
-            dup_key = (
-                _canonicalize(record.positionTitle),
-                _canonicalize(record.department),
-                _canonicalize(record.careerFamily),
-                _canonicalize(record.jobLevel),
-                _canonicalize(record.key_duties_responsibilities)[:64],
-            )
-            if dup_key in duplicate_keys:
-                issues.append(ValidationIssue(
-                    idx, "Duplicate",
-                    "Potential duplicate record detected (matches an earlier entry).",
-                    "Warning"
-                ))
-            else:
-                duplicate_keys.add(dup_key)
-
         except ValidationError as e:
             # Extract missing field names from Pydantic error
             for error in e.errors():
                 # Handle cases where 'loc' might be empty or not straightforward
                 loc_path = ".".join(str(x) for x in error.get('loc', []))
                 msg = error.get('msg', 'Unknown error')
-                issues.append(ValidationIssue(idx, loc_path, msg, "Error"))
+                rule = f"schema.{error.get('type', 'error')}"
+                issues.append(ValidationIssue(idx, loc_path, msg, "Error", rule))
 
             # Strategy: Keep raw data in UI, but valid_records only has good ones.
-            pass
+            continue
 
-    return valid_records, issues
+        if build_models:
+            valid_records.append(record)
+
+        # 2. Logical/Enum Validation on the object
+        dup_key = _check_record(idx, lambda name: getattr(record, name, None), issues, duplicate_keys)
+        if duplicate_keys is None:
+            row_keys.append((idx, dup_key))
+
+    return valid_records, issues, row_keys
+
+
+_KEYWORD_RULE_FIELDS = ["jobLevel", "position_complexity", "FLSA_status", "SOC_code", *BANNED_PHRASE_FIELDS]
+
+# Columnar rules in the order _check_record emits them for a single row.
+_NARRATIVE_FIELDS = [
+    "key_duties_responsibilities",
+    "position_complexity",
+    "organizational_impact",
+    "career_progression_path",
+]
+
+
+@metrics.timed("validate.validate_table")
+def validate_table(table) -> List[ValidationIssue]:
+    """
+    Validates an Arrow table (see ``core.io.read_parquet_table``) with vectorized
+    compute kernels instead of per-row dicts. Produces the same issues, in the
+    same order, as ``validate_dataset(records, build_models=False)`` on the
+    equivalent records, where a null cell stands for an absent key: Arrow
+    cannot tell the two apart, so a required field explicitly set to None
+    (which pydantic reports as ``schema.string_type``) is reported here as
+    ``schema.missing``.
+    """
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from core.io import table_string_column
+
+    row_count = table.num_rows
+    indexes = np.arange(row_count)
+    rule_hits = []  # (rule order, mask, issue factory)
+
+    def mask_of(array) -> "np.ndarray":
+        return pc.fill_null(array, False).to_numpy(zero_copy_only=False)
+
+    def is_blank(column) -> "np.ndarray":
+        return mask_of(pc.or_kleene(pc.is_null(column), pc.equal(pc.utf8_trim_whitespace(column), "")))
+
+    # 1. Schema: pydantic reports per-field errors in declaration order.
+    schema_failed = np.zeros(row_count, dtype=bool)
+    schema_order = 0
+    for name, info in JobRecord.model_fields.items():
+        present = name in table.column_names
+        column = table.column(name) if present else None
+        column_type = column.type if present else pa.string()
+        if pa.types.is_dictionary(column_type):
+            column_type = column_type.value_type
+        if not (
+            pa.types.is_string(column_type) or pa.types.is_large_string(column_type) or pa.types.is_null(column_type)
+        ):
+            failed = mask_of(pc.is_valid(column))
+            message, rule = "Input should be a valid string", "schema.string_type"
+        elif info.is_required():
+            failed = np.ones(row_count, dtype=bool) if not present else mask_of(pc.is_null(column))
+            message, rule = "Field required", "schema.missing"
+        else:
+            continue
+        if failed.any():
+            schema_failed |= failed
+            rule_hits.append((schema_order, failed, lambda idx, n=name, m=message, r=rule: ValidationIssue(
+                idx, n, m, "Error", r)))
+        schema_order += 1
+
+    valid = ~schema_failed
+    base_order = schema_order
+    title = table_string_column(table, "positionTitle")
+    department = table_string_column(table, "department")
+    family = table_string_column(table, "careerFamily")
+    job_level = table_string_column(table, "jobLevel")
+
+    # 2. Logical/Enum rules, only for schema-valid rows.
+    rule_hits.append((base_order, valid & is_blank(title), lambda idx: ValidationIssue(
+        idx, "positionTitle", "Position Title is required and cannot be empty.", "Error", "blank_required")))
+    rule_hits.append((base_order + 1, valid & is_blank(department), lambda idx: ValidationIssue(
+        idx, "department", "Department is required and cannot be empty.", "Error", "blank_required")))
+
+    family_values = family.to_pylist() if row_count else []
+    unknown_family = valid & ~mask_of(pc.is_in(family, value_set=pa.array(CAREER_FAMILIES, type=pa.string())))
+    rule_hits.append((base_order + 2, unknown_family, lambda idx: ValidationIssue(
+        idx, "careerFamily",
+        f"Unknown Career Family: '{family_values[idx]}'. Fallbacks will be used.",
+        "Warning", "unknown_career_family")))
+
+    # Keyword rules: compute kernels narrow the rows down to those that can
+    # raise a keyword issue, and only those go through the row validator's scan.
+    def per_distinct(column, predicate) -> "np.ndarray":
+        # Low-cardinality columns: evaluate the predicate once per distinct value.
+        encoded = pc.dictionary_encode(column)
+        flags = np.array([predicate(v) for v in encoded.dictionary.to_pylist()] + [predicate(None)], dtype=bool)
+        return flags[pc.fill_null(encoded.indices, len(encoded.dictionary)).to_numpy(zero_copy_only=False)]
+
+    def contains_any(column, pattern: str) -> "np.ndarray":
+        # One regex pass per column, whatever the number of keywords in the pattern.
+        if not pattern:
+            return np.zeros(row_count, dtype=bool)
+        return mask_of(pc.match_substring_regex(column, pattern, ignore_case=True))
+
+    def flsa_issue(value, senior_only: bool) -> bool:
+        if value is None or not value.strip():
+            return False
+        flsa = KEYWORDS.scan(value)
+        if "flsa_non_exempt" not in flsa and "flsa_exempt" not in flsa:
+            return not senior_only
+        return senior_only and "flsa_non_exempt" in flsa
+
+    keyword_columns = {name: table_string_column(table, name) for name in _KEYWORD_RULE_FIELDS}
+    senior = per_distinct(keyword_columns["jobLevel"], lambda v: "senior_level" in KEYWORDS.scan(v))
+    candidates = mask_of(pc.and_kleene(
+        pc.match_substring(keyword_columns["jobLevel"], "Senior"),
+        pc.match_substring(keyword_columns["position_complexity"], "Entry"),
+    ))
+    candidates |= senior & contains_any(keyword_columns["position_complexity"], _ENTRY_LEVEL_PATTERN)
+    candidates |= per_distinct(keyword_columns["FLSA_status"], lambda v: flsa_issue(v, False))
+    candidates |= senior & per_distinct(keyword_columns["FLSA_status"], lambda v: flsa_issue(v, True))
+    candidates |= per_distinct(keyword_columns["SOC_code"], lambda v: bool(
+        v is not None and v.strip() and not _SOC_CODE.fullmatch(v.strip())))
+    for field_name in BANNED_PHRASE_FIELDS:
+        candidates |= contains_any(keyword_columns[field_name], _BANNED_PHRASE_PATTERN)
+    candidate_rows = np.flatnonzero(valid & candidates)
+
+    keyword_issues: Dict[int, List[ValidationIssue]] = {}
+    if len(candidate_rows):
+        taken = pa.array(candidate_rows, type=pa.int64())
+        keyword_values = {name: column.take(taken).to_pylist() for name, column in keyword_columns.items()}
+        for position, idx in enumerate(candidate_rows.tolist()):
+            row_issues: List[ValidationIssue] = []
+            _check_keywords(idx, lambda name: keyword_values[name][position], row_issues)
+            if row_issues:
+                keyword_issues[idx] = row_issues
+    keyword_hits = np.zeros(row_count, dtype=bool)
+    keyword_hits[list(keyword_issues)] = True
+    rule_hits.append((base_order + 3, keyword_hits, keyword_issues.__getitem__))
+    metrics.count("validate.validate_table.keyword_candidates", len(candidate_rows))
+
+    for offset, field_name in enumerate(_NARRATIVE_FIELDS):
+        empty = valid & is_blank(table_string_column(table, field_name))
+        rule_hits.append((base_order + 4 + offset, empty, lambda idx, f=field_name: ValidationIssue(
+            idx, f, "Field is empty; enhancement templates may be needed.", "Warning", "empty_narrative")))
+
+    # Duplicates: any schema-valid row that is not the first with its key.
+    def canonical(column):
+        return pc.fill_null(pc.utf8_lower(pc.utf8_trim_whitespace(column)), "")
+
+    key_table = pa.table({
+        "k0": canonical(title),
+        "k1": canonical(department),
+        "k2": canonical(family),
+        "k3": canonical(job_level),
+        "k4": pc.utf8_slice_codeunits(canonical(table_string_column(table, "key_duties_responsibilities")), 0, 64),
+        "idx": pa.array(indexes, type=pa.int64()),
+    }).filter(pa.array(valid))
+    firsts = key_table.group_by(["k0", "k1", "k2", "k3", "k4"], use_threads=False).aggregate([("idx", "min")])
+    duplicate = valid.copy()
+    duplicate[firsts.column("idx_min").to_numpy()] = False
+    rule_hits.append((base_order + 4 + len(_NARRATIVE_FIELDS), duplicate, lambda idx: ValidationIssue(
+        idx, "Duplicate", DUPLICATE_MESSAGE, "Warning", "duplicate")))
+
+    # Assemble in (row, rule) order to match the row-at-a-time validator.
+    hit_rows = [indexes[mask] for _, mask, _ in rule_hits]
+    hit_rules = [np.full(len(rows), position) for position, rows in enumerate(hit_rows)]
+    all_rows = np.concatenate(hit_rows) if hit_rows else np.array([], dtype=int)
+    all_rules = np.concatenate(hit_rules) if hit_rules else np.array([], dtype=int)
+    rule_rank = np.array([order for order, _, _ in rule_hits])
+    order = np.lexsort((rule_rank[all_rules], all_rows)) if len(all_rows) else np.array([], dtype=int)
+
+    factories = [factory for _, _, factory in rule_hits]
+    issues = []
+    for row, rule in zip(all_rows[order].tolist(), all_rules[order].tolist()):
+        made = factories[rule](row)
+        if isinstance(made, list):
+            issues.extend(made)
+        else:
+            issues.append(made)
+    metrics.count("validate.records", row_count)
+    metrics.count("validate.issues", len(issues))
+    return issues
@@ -0,0 +1,126 @@
+"""
+Warm snapshots of a source catalog for fast startup.
+
+A snapshot holds the parsed records, their validation issues (an
+``IssueStore``) and the dedupe key of every record, so loading it skips
+JSON parsing, schema validation and key computation. Snapshots are keyed to
+the SHA-256 of the source file and to a digest of the validation rules;
+changing either makes the old snapshot miss and a new one is built.
+
+The file is two pickles back to back: a small header, checked before
+anything else is read, then the payload. Pickle is used because it restores
+lists of dicts with repeated strings several times faster than JSON. Like
+the rest of ``.cache/``, snapshot files are trusted local build artifacts;
+never load one from an untrusted location.
+
+Build ahead of time with ``python -m core.warm_snapshot <source.json>``, or
+let ``load_or_build`` write it on first load.
+"""
+import hashlib
+import os
+import pickle
+from typing import Any, Dict, Tuple
+
+from core import codegen, constants, issues, keywords, metrics, schema, validate
+from core import io as catalog_io
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_SNAPSHOT_DIR = os.path.join(".cache", "snapshots")
+SNAPSHOT_SUFFIX = ".snapshot"
+_PAYLOAD_KEYS = frozenset(("records", "issues", "dedupe_keys"))
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def rules_version() -> str:
+    """Digest of the code and constants that determine validation results and dedupe keys."""
+    digest = hashlib.sha256()
+    for module in (validate, issues, keywords, codegen, schema, constants, catalog_io):
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def snapshot_path(source_path: str, source_sha256: str, directory: str = DEFAULT_SNAPSHOT_DIR) -> str:
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(directory, f"{stem}-{source_sha256[:16]}{SNAPSHOT_SUFFIX}")
+
+
+def _header(source_sha256: str) -> Dict[str, Any]:
+    return {"format": SNAPSHOT_FORMAT, "source_sha256": source_sha256, "rules": rules_version()}
+
+
+@metrics.timed("warm_snapshot.build")
+def build_snapshot(source_path: str, directory: str = DEFAULT_SNAPSHOT_DIR) -> Dict[str, Any]:
+    """
+    Parses and validates ``source_path`` and writes its snapshot, replacing
+    older snapshots of the same file name. Returns the snapshot payload:
+    ``{"records", "issues", "dedupe_keys", "source_sha256"}``.
+    """
+    source_sha256 = file_sha256(source_path)
+    with open(source_path, "rb") as f:
+        records = catalog_io.load_records(f, source_path)
+
+    payload = {
+        "records": records,
+        "issues": validate.validate_issues(records),
+        "dedupe_keys": [catalog_io.dedupe_key(r) for r in records],
+        "source_sha256": source_sha256,
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    path = snapshot_path(source_path, source_sha256, directory)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(_header(source_sha256), f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    stem = os.path.basename(path).rsplit("-", 1)[0]
+    for name in os.listdir(directory):
+        if name.endswith(SNAPSHOT_SUFFIX) and name.rsplit("-", 1)[0] == stem and name != os.path.basename(path):
+            os.remove(os.path.join(directory, name))
+    return payload
+
+
+@metrics.timed("warm_snapshot.load")
+def load_snapshot(source_path: str, directory: str = DEFAULT_SNAPSHOT_DIR) -> Dict[str, Any] | None:
+    """Returns the snapshot payload for the current contents of ``source_path``, or None on a miss."""
+    source_sha256 = file_sha256(source_path)
+    path = snapshot_path(source_path, source_sha256, directory)
+    try:
+        with open(path, "rb") as f:
+            if pickle.load(f) != _header(source_sha256):
+                return None
+            payload = pickle.load(f)
+    except Exception:  # missing, truncated, corrupt or written by an incompatible version
+        return None
+    if not isinstance(payload, dict) or not _PAYLOAD_KEYS <= payload.keys():
+        return None
+    return payload
+
+
+def load_or_build(source_path: str, directory: str = DEFAULT_SNAPSHOT_DIR) -> Tuple[Dict[str, Any], bool]:
+    """Loads the snapshot of ``source_path``, building it on a miss. Returns (payload, built)."""
+    payload = load_snapshot(source_path, directory)
+    if payload is not None:
+        return payload, False
+    return build_snapshot(source_path, directory), True
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build warm snapshots of catalog files.")
+    parser.add_argument("sources", nargs="+")
+    parser.add_argument("--dir", default=DEFAULT_SNAPSHOT_DIR)
+    args = parser.parse_args()
+    for source in args.sources:
+        snapshot = build_snapshot(source, args.dir)
+        print(f"{source}: {len(snapshot['records'])} records, {len(snapshot['issues'])} issues")
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+WORDS = [f"term{i}" for i in range(300)]
+
+
+def _issue_tuples(issues):
+    return [(i.index, i.field, i.message, i.severity, i.rule) for i in issues]
+
+
+def _catalog(count, seed=0):
+    """
+    Random catalog mixing clean and problem rows: repeated titles (so some
+    rows are duplicates), blank or missing required fields, unknown career
+    families, keyword rule hits, and TF-IDF friendly narratives.
+    """
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        record = {
+            "positionTitle": " ".join(rng.choices(WORDS[:6], k=2)),
+            "department": rng.choice(["IT", "HR", "Finance", " ", None]),
+            "careerFamily": rng.choice(["General", "Information Technology", "Invented"]),
+            "jobLevel": rng.choice(["Senior", "Junior", "Entry", None]),
+            "position_complexity": rng.choice(["Entry work", "Complex", ""]),
+            "key_duties_responsibilities": rng.choice(
+                [" ".join(rng.choices(WORDS, k=25)), "Plans work.", "", "  ", None]
+            ),
+        }
+        if rng.random() < 0.05:
+            del record["careerFamily"]
+        records.append(record)
+    return records
+
+
+@pytest.fixture
+def issue_tuples():
+    """Issues as comparable (index, field, message, severity, rule) tuples."""
+    return _issue_tuples
+
+
+@pytest.fixture
+def make_catalog():
+    """``make_catalog(count, seed=0)``: a reproducible random catalog (see ``_catalog``)."""
+    return _catalog
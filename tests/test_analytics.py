@@ -0,0 +1,41 @@
+import random
+
+from core.analytics import NOT_SET, CatalogStats
+from core.io import deduplicate_data
+
+
+def test_counts_and_completeness():
+    stats = CatalogStats.from_records([
+        {"careerFamily": "General", "department": "IT", "key_duties_responsibilities": "Does things."},
+        {"careerFamily": "General", "department": " ", "key_duties_responsibilities": "   "},
+    ])
+    assert stats.total == 2
+    assert stats.counts("careerFamily") == {"General": 2}
+    assert stats.count("department", "IT") == 1
+    assert stats.count("department", None) == 1
+    assert stats.counts("jobLevel") == {NOT_SET: 2}
+    assert stats.filled("key_duties_responsibilities") == 1
+    assert stats.completeness("key_duties_responsibilities") == 0.5
+    assert stats.completeness("soft_skills") == 0.0
+
+
+def test_refresh_matches_rebuild_after_edits_and_dedupe(make_catalog):
+    records = make_catalog(500, seed=5)
+    stats = CatalogStats.from_records(records)
+    rng = random.Random(1)
+
+    for _ in range(20):
+        records = list(records)
+        for i in rng.sample(range(len(records)), 10):
+            records[i] = {**records[i], "careerFamily": "Leadership & Management", "soft_skills": "Listening."}
+        records.append({"positionTitle": "New", "department": "Ops", "careerFamily": "General"})
+        assert stats.refresh(records) == 21
+        assert stats.summary() == CatalogStats.from_records(records).summary()
+
+    deduped = deduplicate_data(records)
+    assert stats.refresh(deduped) == len(records) - len(deduped)
+    assert stats.summary() == CatalogStats.from_records(deduped).summary()
+
+    assert stats.refresh([]) == len(deduped)
+    assert stats.total == 0
+    assert all(not stats.counts(field) for field in stats.group_fields)
@@ -0,0 +1,94 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = str(Path(__file__).resolve().parent.parent / "app.py")
+
+# Mixed types, absent columns and an invalid title: none of it may be rewritten by rendering the grid.
+RECORDS = [
+    {"positionTitle": "Analyst", "department": "Finance", "careerFamily": "General", "headcount": 3},
+    {"positionTitle": "Engineer", "department": "IT", "careerFamily": "General"},
+    {"positionTitle": 5, "department": "IT", "careerFamily": "General", "grade": "G7"},
+    {"positionTitle": "Analyst", "department": "Finance", "careerFamily": "General", "headcount": 3},
+]
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / "data")
+    (tmp_path / "data" / "job_descriptions2.json").write_text(json.dumps(RECORDS))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JDA_JOURNAL_DIR", str(tmp_path / "journal"))
+    monkeypatch.setenv("JDA_ENHANCE_CACHE", str(tmp_path / "enhance_cache.sqlite"))
+    st.cache_resource.clear()
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.run()
+    yield at
+    st.cache_resource.clear()
+
+
+def _journal_files():
+    """Non-empty files written under the journal root."""
+    root = os.environ["JDA_JOURNAL_DIR"]
+    return [name for directory, _, files in os.walk(root) for name in files
+            if os.path.getsize(os.path.join(directory, name))]
+
+
+def _load_default(at):
+    next(b for b in at.sidebar.button if "Load Default" in b.label).click().run()
+    assert not at.exception
+
+
+def test_warm_load_and_render_write_nothing(app):
+    _load_default(app)
+    version = app.session_state["data_version"]
+    for _ in range(3):
+        app.run()
+    assert not app.exception
+    assert app.session_state["data"] == RECORDS
+    assert app.session_state["data_version"] == version
+    # The snapshot's dedupe keys stay usable and the deferred journal base is never written.
+    assert app.session_state["_dedupe_keys"][0] == version
+    assert _journal_files() == []
+
+
+def test_grid_sync_applies_only_edited_cells(app):
+    _load_default(app)
+    app.run()
+    assert app.session_state["data"] == RECORDS
+    version = app.session_state["data_version"]
+
+    app.session_state["main_editor"] = {
+        "edited_rows": {1: {"grade": "G5"}, 2: {"department": "IT"}},
+        "added_rows": [{"positionTitle": "New role", "department": None}],
+        "deleted_rows": [],
+    }
+    app.run()
+    assert not app.exception
+    data = app.session_state["data"]
+    assert data[:4] == [RECORDS[0], {**RECORDS[1], "grade": "G5"}, RECORDS[2], RECORDS[3]]
+    assert data[4] == {"positionTitle": "New role"}
+    assert app.session_state["data_version"] == version + 1
+    app.run()
+    assert app.session_state["data_version"] == version + 1
+
+    app.session_state["main_editor"] = {"edited_rows": {}, "added_rows": [], "deleted_rows": [3]}
+    app.run()
+    assert not app.exception
+    assert app.session_state["data"] == [RECORDS[0], {**RECORDS[1], "grade": "G5"}, RECORDS[2], {"positionTitle": "New role"}]
+    assert max(app.session_state["validation_issues"].indexes(), default=0) < 4
+
+
+def test_malformed_settings_fall_back_to_defaults(app, monkeypatch):
+    monkeypatch.setenv("JDA_VALIDATION_WORKERS", "four")
+    _load_default(app)
+    app.run()
+    # Deleting a row revalidates the whole dataset.
+    app.session_state["main_editor"] = {"edited_rows": {}, "added_rows": [], "deleted_rows": [3]}
+    app.run()
+    assert not app.exception
+    assert app.session_state["data"] == RECORDS[:3]
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from core.bulk_edit import bulk_edit
+from core.validate import revalidate_rows, validate_issues
+
+
+def _records():
+    return [
+        {"positionTitle": "Data Analyst", "department": "IT", "careerFamily": "Information Technology"},
+        {"positionTitle": "Senior Analyst", "department": " ", "careerFamily": "General",
+         "key_duties_responsibilities": "Reports"},
+        {"positionTitle": "Clerk", "department": "HR", "careerFamily": "General", "jobLevel": 3},
+        {"positionTitle": "Analyst", "department": "IT", "careerFamily": "Invented"},
+    ]
+
+
+def test_set_replace_and_fill_empty():
+    records = _records()
+
+    data, changed = bulk_edit(records, [0, 1, 3], "positionTitle", "replace", value="Lead \\1",
+                              pattern=r"^(senior )?analyst$", ignore_case=True)
+    assert changed == [1, 3]
+    assert data[1]["positionTitle"] == "Lead Senior "
+    assert data[0] is records[0] and records[3]["positionTitle"] == "Analyst"
+
+    data, changed = bulk_edit(records, range(4), "department", "fill_empty", value="Ops")
+    assert changed == [1] and data[1]["department"] == "Ops"
+
+    data, changed = bulk_edit(records, range(4), "key_duties_responsibilities", "fill_empty", value="TBD")
+    assert changed == [0, 2, 3] and data[1]["key_duties_responsibilities"] == "Reports"
+
+    data, changed = bulk_edit(records, [2, 3], "careerFamily", "set", value="General")
+    assert changed == [3]
+
+    # Non-string values are not touched by replace.
+    _, changed = bulk_edit(records, [2], "jobLevel", "replace", value="x", pattern="3")
+    assert changed == []
+
+
+def test_rejects_bad_input():
+    with pytest.raises(ValueError):
+        bulk_edit(_records(), [0], "positionTitle", "delete")
+    with pytest.raises(ValueError):
+        bulk_edit(_records(), [0], "positionTitle", "replace", pattern="(")
+    with pytest.raises(ValueError):
+        bulk_edit(_records(), [9], "positionTitle", "set", value="x")
+
+
+def test_revalidate_touched_rows_matches_full_validation():
+    rng = random.Random(5)
+    records = [
+        {
+            "positionTitle": f"Role {rng.randint(0, 15)}",
+            "department": rng.choice(["IT", "HR"]),
+            "careerFamily": rng.choice(["General", "Invented"]),
+        }
+        for _ in range(200)
+    ]
+    records[7].pop("department")
+    issues = validate_issues(records)
+
+    for field, operation, value, pattern in [
+        ("positionTitle", "replace", "Role 1", r"Role \d+"),
+        ("careerFamily", "set", "General", None),
+        ("department", "fill_empty", "Ops", None),
+    ]:
+        selection = [i for i in range(len(records)) if rng.random() < 0.3] + [7]
+        records, changed = bulk_edit(records, selection, field, operation, value=value, pattern=pattern)
+        issues = revalidate_rows(records, issues, changed)
+        expected = validate_issues(records)
+        assert [i.to_dict() for i in issues] == [i.to_dict() for i in expected]
+
+
+def test_revalidation_after_rows_shift_falls_back_to_full_validation():
+    records = _records()
+    records[3] = {"department": "IT", "careerFamily": "General"}  # schema.missing on row 3
+    issues = validate_issues(records)
+    issues.data_version = 1
+
+    # Deduplicate-style positional change (rows 1 and 2 removed) without revalidating.
+    shifted = [records[0], records[3]]
+    edited, changed = bulk_edit(shifted, [0], "department", "set", value="HR")
+    expected = [i.to_dict() for i in validate_issues(edited)]
+
+    # The store's version says it predates the shift, so it is not patched.
+    assert [i.to_dict() for i in revalidate_rows(edited, issues, changed, data_version=2)] == expected
+    # Without a version, issues on rows that no longer exist also trigger a full validation.
+    assert [i.to_dict() for i in revalidate_rows(edited, issues, changed)] == expected
+    assert {i["Index"] for i in expected} == {0, 1}
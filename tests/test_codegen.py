@@ -0,0 +1,135 @@
+import random
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from core.codegen import check_record, compile_check
+from core.enhance import bulk_enhance, bulk_enhance_dicts
+from core.schema import JobRecord
+
+
+class _Text(str):
+    pass
+
+
+def _value(rng):
+    """Arbitrary JSON-like or Python value, including near-misses of str."""
+    kind = rng.randrange(12)
+    if kind < 4:
+        return "".join(rng.choices("ab \t\né;", k=rng.randrange(6)))
+    return [
+        None,
+        rng.randrange(-5, 5),
+        rng.random(),
+        bool(rng.randrange(2)),
+        b"bytes",
+        _Text("subclass"),
+        [rng.randrange(3), "x"],
+        {"nested": rng.randrange(3)},
+    ][kind - 4]
+
+
+def _raw_record(rng, model=JobRecord):
+    fields = list(model.model_fields)
+    extras = ["extra", "_private", "positionNumber", "model_x", "Department"]
+    record = {}
+    for name in rng.sample(fields + extras, rng.randrange(len(fields) + len(extras) + 1)):
+        record[name] = _value(rng)
+    # Bias towards valid records so both branches are exercised.
+    if rng.random() < 0.6:
+        for name in ["positionTitle", "department", "careerFamily"]:
+            if name in fields:
+                record[name] = f"{name} {rng.randrange(9)}"
+        for name in fields:
+            if rng.random() < 0.7 and name in record and type(record[name]) is not str:
+                record[name] = rng.choice([None, "text"])
+    return record
+
+
+def _pydantic(model, raw):
+    try:
+        return model(**raw)
+    except ValidationError:
+        return None
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_generated_validators_agree_with_pydantic(seed):
+    rng = random.Random(seed)
+    accepted = 0
+    for _ in range(2000):
+        raw = _raw_record(rng)
+        reference = _pydantic(JobRecord, raw)
+        if check_record(raw):
+            # Never accepts what pydantic rejects, and pydantic keeps every value as given.
+            assert reference is not None, raw
+            assert all(getattr(reference, name) == raw.get(name, info.default)
+                       for name, info in JobRecord.model_fields.items()), raw
+            accepted += 1
+        elif reference is not None:
+            # Only rejected because pydantic would coerce a value (e.g. a str subclass).
+            assert any(type(raw.get(name)) not in (str, type(None)) for name in JobRecord.model_fields), raw
+    assert accepted > 200
+
+
+class _Sample(BaseModel):
+    name: str
+    code: str = "none"
+    note: Optional[str] = "n/a"
+    limited: Optional[str] = Field(default=None, max_length=3)
+    count: int = 0
+
+
+class _Checked(BaseModel):
+    name: str
+
+    @field_validator("name")
+    @classmethod
+    def _upper(cls, value):
+        return value.upper()
+
+
+def test_generator_handles_defaults_and_falls_back_on_unsupported_fields():
+    rng = random.Random(7)
+    check = compile_check(_Sample)
+    assert check({"name": "a"}) is False  # "limited" and "count" are left to pydantic
+
+    class Plain(BaseModel):
+        name: str
+        code: str = "none"
+        note: Optional[str] = "n/a"
+
+    check = compile_check(Plain)
+    for _ in range(3000):
+        raw = _raw_record(rng, Plain)
+        reference = _pydantic(Plain, raw)
+        if check(raw):
+            assert reference is not None
+            assert reference.model_dump(include=set(Plain.model_fields)) == {
+                name: raw.get(name, info.default) for name, info in Plain.model_fields.items()}
+    assert check({"name": "a", "note": None}) is True
+
+    check = compile_check(_Checked)
+    assert check({"name": "a"}) is False
+
+    class Strict(Plain, extra="forbid"):
+        pass
+
+    check = compile_check(Strict)
+    assert check({"name": "a"}) is True
+    assert check({"name": "a", "other": 1}) is False
+
+
+def test_dict_enhancement_matches_model_enhancement():
+    rng = random.Random(11)
+    records = [_raw_record(rng) for _ in range(500)]
+    fills, count = bulk_enhance_dicts(records)
+
+    valid = [(i, m) for i, m in ((i, _pydantic(JobRecord, r)) for i, r in enumerate(records)) if m is not None]
+    enhanced, expected_count = bulk_enhance([m for _, m in valid])
+    assert count == expected_count
+    assert [i for i, f in enumerate(fills) if f is not None] == [i for i, _ in valid]
+    for (i, model), result in zip(valid, enhanced):
+        merged = {**model.model_dump(), **fills[i]}
+        assert merged == result.model_dump()
@@ -0,0 +1,89 @@
+import io
+
+import pyarrow as pa
+import pytest
+from core.io import (
+    save_parquet_bytes,
+    save_arrow_bytes,
+    load_parquet,
+    load_arrow,
+    read_parquet_table,
+    read_arrow_table,
+    records_to_table,
+    filter_table,
+)
+from core.validate import validate_dataset, validate_table
+
+
+@pytest.fixture
+def catalog():
+    return [
+        {"positionTitle": "Developer", "department": "IT", "careerFamily": "Information Technology",
+         "jobLevel": "Senior", "position_complexity": "Entry tasks", "campus": "North"},
+        {"positionTitle": "Developer", "department": "IT", "careerFamily": "Information Technology",
+         "jobLevel": "Senior", "position_complexity": "Entry tasks"},
+        {"positionTitle": " ", "department": "HR", "careerFamily": "Made Up"},
+        {"positionTitle": "Analyst", "careerFamily": "Finance & Accounting",
+         "key_duties_responsibilities": "Reconcile accounts"},
+        {"positionTitle": "Librarian", "department": "Library", "careerFamily": "Library & Archives",
+         "key_duties_responsibilities": "Curate collections", "position_complexity": "High",
+         "organizational_impact": "Broad", "career_progression_path": "Head Librarian"},
+    ]
+
+
+def test_parquet_and_arrow_round_trip(catalog):
+    for save, load in [(save_parquet_bytes, load_parquet), (save_arrow_bytes, load_arrow)]:
+        loaded = load(io.BytesIO(save(catalog)))
+        assert len(loaded) == len(catalog)
+        for original, restored in zip(catalog, loaded):
+            assert {k: v for k, v in restored.items() if v is not None} == original
+
+
+def test_repeated_columns_are_dictionary_encoded(catalog, tmp_path):
+    parquet_path = tmp_path / "catalog.parquet"
+    parquet_path.write_bytes(save_parquet_bytes(catalog))
+    arrow_path = tmp_path / "catalog.arrow"
+    arrow_path.write_bytes(save_arrow_bytes(catalog))
+
+    for table in [read_parquet_table(str(parquet_path)), read_arrow_table(str(arrow_path))]:
+        for name in ["careerFamily", "department", "jobLevel"]:
+            assert pa.types.is_dictionary(table.schema.field(name).type)
+
+
+def test_validate_table_matches_row_validator(catalog, issue_tuples):
+    _, row_issues = validate_dataset(catalog, build_models=False)
+    table_issues = validate_table(records_to_table(catalog))
+    assert issue_tuples(table_issues) == issue_tuples(row_issues)
+
+
+def test_validate_table_reports_non_string_columns():
+    table = pa.table({
+        "positionTitle": ["A", "B"],
+        "department": ["X", "Y"],
+        "careerFamily": ["General", "General"],
+        "SOC_code": pa.array([None, 1234], type=pa.int64()),
+    })
+    issues = validate_table(table)
+    assert [(i.index, i.field, i.severity) for i in issues if i.severity == "Error"] == [(1, "SOC_code", "Error")]
+    assert all(i.index == 0 for i in issues if i.severity == "Warning")
+
+
+def test_validate_table_reports_null_required_cells_as_missing(issue_tuples):
+    # Arrow has no "absent key", so a null cell reads like one, even where the
+    # record had an explicit None (which pydantic reports as a type error).
+    records = [{"positionTitle": None, "department": "IT", "careerFamily": "General"}]
+    _, row_issues = validate_dataset(records, build_models=False)
+    table_issues = validate_table(records_to_table(records))
+    assert [(i.field, i.rule) for i in row_issues if i.severity == "Error"] == [("positionTitle", "schema.string_type")]
+    assert [(i.field, i.rule) for i in table_issues if i.severity == "Error"] == [("positionTitle", "schema.missing")]
+
+    absent = [{"department": "IT", "careerFamily": "General"}]
+    _, row_issues = validate_dataset(absent, build_models=False)
+    assert issue_tuples(validate_table(records_to_table(absent))) == issue_tuples(row_issues)
+
+
+def test_filter_table(catalog):
+    table = records_to_table(catalog)
+    assert filter_table(table, families=["Information Technology"]).num_rows == 2
+    assert filter_table(table, departments=["Library"], search_term="curate").num_rows == 1
+    assert filter_table(table, search_term="no such text").num_rows == 0
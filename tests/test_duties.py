@@ -0,0 +1,69 @@
+import random
+
+from core.duties import DutyIndex, split_duties
+from core.io import deduplicate_data
+
+
+def test_split_and_normalize():
+    assert split_duties(" Plan work;;  manage   budgets.\nReport ;") == ["Plan work", "manage budgets", "Report"]
+    index = DutyIndex.from_records([
+        {"key_duties_responsibilities": "Plan work; Manage budgets."},
+        {"key_duties_responsibilities": "manage  budgets;plan work;Plan work"},
+        {"key_duties_responsibilities": None},
+    ])
+    assert len(index) == 2
+    assert index.records_with("MANAGE BUDGETS") == [0, 1]
+    assert index.frequency("plan work.") == 2
+    assert index.frequency("unknown") == 0
+    assert index.phrases_of(1) == ["Manage budgets", "Plan work"]
+    assert index.top_phrases(1) == [("Plan work", 2)]
+
+
+def _reference(records):
+    postings = {}
+    for position, record in enumerate(records):
+        for phrase in split_duties(record.get("key_duties_responsibilities")):
+            postings.setdefault(phrase.lower(), set()).add(position)
+    return {phrase: sorted(positions) for phrase, positions in postings.items()}
+
+
+def test_refresh_matches_rebuild():
+    rng = random.Random(4)
+    pool = [f"Duty number {i}" for i in range(60)]
+
+    def record(i):
+        return {"positionTitle": f"Job {i % 30}", "key_duties_responsibilities": "; ".join(rng.sample(pool, 5))}
+
+    records = [record(i) for i in range(400)]
+    index = DutyIndex.from_records(records)
+    for step in range(10):
+        records = list(records)
+        for i in rng.sample(range(len(records)), 15):
+            records[i] = record(i)
+        if step % 3 == 0:
+            records.pop()
+        index.refresh(records)
+        for phrase, positions in _reference(records).items():
+            assert index.records_with(phrase) == positions
+
+    records = deduplicate_data(records + records[:50])
+    index.refresh(records)
+    reference = _reference(records)
+    assert len(index) == len(reference)
+    assert dict(index.top_phrases(100)) == {index.phrase(index.phrase_id(p)): len(v) for p, v in reference.items()}
+
+
+def test_rebuild_drops_phrases_no_record_lists():
+    records = [{"key_duties_responsibilities": f"Task {i}; Shared duty"} for i in range(10)]
+    index = DutyIndex.from_records(records)
+    for step in range(3):
+        records = list(records)
+        records[step] = {"key_duties_responsibilities": f"Edited {step}; Shared duty"}
+        index.refresh(records)
+    assert index.phrase_id("Task 0") is not None  # incremental updates keep interned phrases
+
+    rebuilt = [{"key_duties_responsibilities": "Shared duty"} for _ in range(10)]
+    index.refresh(rebuilt)
+    assert index.phrase_id("Task 0") is None
+    assert len(index._part_ids) == 1
+    assert index.records_with("shared duty") == list(range(10))
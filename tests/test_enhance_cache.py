@@ -0,0 +1,56 @@
+import pytest
+from core import constants
+from core.schema import JobRecord
+from core.enhance import bulk_enhance
+from core.enhance_cache import EnhancementCache
+
+
+@pytest.fixture
+def records():
+    return [
+        JobRecord(positionTitle="Manager", department="HR", careerFamily="Leadership & Management"),
+        JobRecord(positionTitle="Analyst", department="Finance", careerFamily="Finance & Accounting",
+                  key_duties_responsibilities="Existing duties"),
+        JobRecord(positionTitle="Director", department="Ops", careerFamily="Leadership & Management"),
+    ]
+
+
+def test_cached_results_match_uncached(records, tmp_path):
+    expected, expected_count = bulk_enhance(records)
+
+    with EnhancementCache(str(tmp_path / "cache.sqlite")) as cache:
+        first, first_count = bulk_enhance(records, cache=cache)
+        # Manager and Director share enhancement inputs: looked up once, both misses.
+        assert (cache.hits, cache.misses) == (0, 2)
+        second, second_count = bulk_enhance(records, cache=cache)
+        assert (cache.hits, cache.misses) == (2, 2)
+
+    for batch, count in [(first, first_count), (second, second_count)]:
+        assert count == expected_count
+        assert [r.model_dump() for r in batch] == [r.model_dump() for r in expected]
+
+
+def test_template_change_invalidates_cache(records, tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    with EnhancementCache(path) as cache:
+        bulk_enhance(records, cache=cache)
+        assert len(cache) == 2
+
+    monkeypatch.setitem(constants.DUTIES_TEMPLATES, "Leadership & Management", "Lead the unit;")
+    with EnhancementCache(path) as cache:
+        assert len(cache) == 0
+        enhanced, _ = bulk_enhance(records, cache=cache)
+        assert (cache.hits, cache.misses) == (0, 2)
+    assert enhanced[0].key_duties_responsibilities == "Lead the unit;"
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    with EnhancementCache(str(tmp_path / "cache.sqlite"), max_bytes=200) as cache:
+        cache.put_many([("a", {"position_complexity": "x" * 60}, True)])
+        cache.put_many([("b", {"position_complexity": "y" * 60}, True)])
+        cache.get_many(["a"])  # touch "a" so "b" is the eviction candidate
+        cache.put_many([("c", {"position_complexity": "z" * 60}, True)])
+
+        remaining = cache.get_many(["a", "b", "c"])
+        assert set(remaining) == {"a", "c"}
+        assert cache.size_bytes() <= 200
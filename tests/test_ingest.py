@@ -0,0 +1,85 @@
+import gzip
+import io
+import json
+import zipfile
+
+import pytest
+
+from core import ingest
+from core.ingest import load_upload
+
+
+def _records(count):
+    return [{"positionTitle": f"Job {i}", "department": "IT", "salary": i * 1.5, "note": "é" * (i % 7)} for i in range(count)]
+
+
+def _zip(name, payload):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(name, payload)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_compressed_and_plain_uploads_stream_the_same_records(monkeypatch, chunk_size):
+    monkeypatch.setattr(ingest, "CHUNK_SIZE", chunk_size)
+    records = _records(40)
+    array = json.dumps(records, indent=1, ensure_ascii=False).encode("utf-8")
+    lines = "\n".join(json.dumps(r, ensure_ascii=False) for r in records).encode("utf-8")
+
+    uploads = {
+        "catalog.json": array,
+        "catalog.jsonl": lines + b"\n\n",
+        "catalog.json.gz": gzip.compress(array),
+        "catalog.ndjson.gz": gzip.compress(lines),
+        "catalog.zip": _zip("export/catalog.jsonl", lines),
+        "upload": gzip.compress(array),  # no extension: gzip detected from the magic bytes
+    }
+    for name, payload in uploads.items():
+        progress = []
+        assert load_upload(io.BytesIO(payload), name, progress=lambda f, n: progress.append((f, n))) == records, name
+        assert progress[-1] == (1.0, 40)
+        assert [f for f, _ in progress] == sorted(f for f, _ in progress)
+
+    assert load_upload(io.BytesIO(b" [ ] "), "empty.json") == []
+    for payload, message in [
+        (b"", "Invalid JSON file format"),
+        (b'{"a": 1}', "must be an array"),
+        (b'[{"a": 1}, 2]', "Record 2 is not a JSON object"),
+        (b'[{"a": 1},]', "Invalid JSON in record 2"),
+        (b'[{"a": 1} {"b": 2}]', "Invalid JSON after record 1"),
+        (b'[{"a": 1}] trailing', "Invalid JSON file format"),
+    ]:
+        with pytest.raises(ValueError, match=message):
+            load_upload(io.BytesIO(payload), "bad.json")
+
+
+def test_limits_stop_the_load_early():
+    payload = json.dumps(_records(100)).encode("utf-8")
+
+    with pytest.raises(ValueError, match="more than 10 records"):
+        load_upload(io.BytesIO(gzip.compress(payload)), "catalog.json.gz", max_records=10)
+    assert len(load_upload(io.BytesIO(payload), "catalog.json", max_records=100)) == 100
+
+    # A highly compressible upload is stopped on its decompressed size.
+    bomb = gzip.compress(b"[" + b" " * (4 << 20) + b"]")
+    with pytest.raises(ValueError, match="larger than 1 MB uncompressed"):
+        load_upload(io.BytesIO(bomb), "catalog.json.gz", max_decompressed_bytes=1 << 20)
+    # Zip members declare their size, so those are rejected before decompressing.
+    with pytest.raises(ValueError, match="upload limit is 1 MB"):
+        load_upload(io.BytesIO(_zip("catalog.json", b"[" + b" " * (4 << 20) + b"]")), "c.zip",
+                    max_decompressed_bytes=1 << 20)
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("a.json", "[]")
+        z.writestr("b.json", "[]")
+    with pytest.raises(ValueError, match="contains 2 catalogs"):
+        load_upload(io.BytesIO(archive.getvalue()), "two.zip")
+
+
+def test_zstd_uploads():
+    zstandard = pytest.importorskip("zstandard")
+    records = _records(25)
+    payload = zstandard.ZstdCompressor().compress(json.dumps(records).encode("utf-8"))
+    assert load_upload(io.BytesIO(payload), "catalog.json.zst") == records
@@ -0,0 +1,67 @@
+import csv
+import io
+
+from core.issues import IssueStore, ValidationIssue
+from core.validate import validate_dataset, validate_issues
+from core.sharded_validate import validate_dataset_sharded
+
+RECORDS = [
+    {"positionTitle": "Dev", "department": "IT", "careerFamily": "Information Technology"},
+    {"positionTitle": "Bad Rec", "careerFamily": "General"},
+    {"positionTitle": "Lead", "department": "Ops", "careerFamily": "Nope", "jobLevel": "Senior",
+     "position_complexity": "Entry work"},
+    {"positionTitle": "Dev", "department": "IT", "careerFamily": "Information Technology"},
+    {"positionTitle": "Ops", "department": "Ops", "careerFamily": "Other"},
+]
+
+
+def _dicts(issues):
+    return [i.to_dict() for i in issues]
+
+
+def test_store_matches_issue_list():
+    _, expected = validate_dataset(RECORDS, build_models=False)
+    store = validate_issues(RECORDS)
+
+    assert len(store) == len(expected)
+    assert _dicts(store) == _dicts(expected)
+    assert store.rows(range(len(store))) == _dicts(expected)
+    assert _dicts(validate_dataset_sharded(RECORDS, shard_size=2, issues=IssueStore())) == _dicts(expected)
+
+
+def test_messages_and_rules_are_interned():
+    store = validate_issues(RECORDS * 50)
+
+    assert len(store.values("message")) < 10
+    assert store.counts("rule")["schema.missing"] == 50
+    assert store.counts("rule")["unknown_career_family"] == 100
+    assert sum(store.counts("severity").values()) == len(store)
+    # Rules group messages that differ only by the offending value.
+    assert len({i.message for i in store if i.rule == "unknown_career_family"}) == 2
+
+
+def test_select_page_and_csv():
+    store = IssueStore()
+    for idx in range(25):
+        store.add(idx, "careerFamily", f"Unknown '{idx % 3}'", "Warning", "unknown_career_family")
+        store.add(idx, "department", "Field required", "Error", "schema.missing")
+
+    errors = store.select(severity="Error")
+    assert len(errors) == 25
+    assert len(store.select(severity=["Error", "Warning"], rule="schema.missing")) == 25
+    assert len(store.select(rule="not-a-rule")) == 0
+    assert len(store.select(severity=None)) == 50
+
+    page = store.page(2, 10, errors)
+    assert [row["Index"] for row in page] == [20, 21, 22, 23, 24]
+
+    chunks = list(store.iter_csv(errors, chunk_rows=7))
+    assert len(chunks) == 1 + 4
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert len(rows) == 25 and rows[0]["Rule"] == "schema.missing"
+
+
+def test_issue_has_no_instance_dict():
+    issue = ValidationIssue(0, "department", "Field required")
+    assert not hasattr(issue, "__dict__")
+    assert issue.rule == "department"
@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+
+from core.bulk_edit import bulk_edit
+from core.journal import OperationJournal, diff_operations, journal_directory, JOURNAL_FILE
+
+
+def _records(count=20):
+    return [{"positionTitle": f"Role {i}", "department": "IT", "careerFamily": "General"} for i in range(count)]
+
+
+def test_restore_replays_operations_after_snapshot(tmp_path):
+    base = _records()
+    journal = OperationJournal(str(tmp_path), fsync_every=3)
+    journal.reset(base)
+
+    data, changed = bulk_edit(base, range(0, 20, 2), "department", "set", value="HR")
+    journal.log_changes(base, data, changed, {"action": "bulk_edit", "record_indexes": changed})
+    appended = data + [{"positionTitle": "New", "department": "Ops", "careerFamily": "General"}]
+    journal.log_changes(data, appended)
+    trimmed = [dict(r) for r in appended]
+    del trimmed[1]["careerFamily"]
+    journal.log_changes(appended, trimmed, [1])
+    journal.close()
+
+    restored, original, changelog = OperationJournal(str(tmp_path)).restore()
+    assert restored == trimmed
+    assert original == base
+    assert [entry["action"] for entry in changelog] == ["bulk_edit"]
+
+
+def test_compaction_keeps_base_and_empties_journal(tmp_path):
+    base = _records()
+    journal = OperationJournal(str(tmp_path), snapshot_every=5)
+    journal.reset(base)
+    data, _ = bulk_edit(base, range(10), "jobLevel", "set", value="Senior")
+    journal.log_changes(base, data)
+    assert journal.compact_if_needed(data, [{"action": "bulk_edit"}])
+    assert journal.pending_operations == 0
+    assert os.path.getsize(tmp_path / JOURNAL_FILE) == 0
+    assert len([f for f in os.listdir(tmp_path) if f.startswith("snapshot-")]) == 2
+
+    restored, original, changelog = journal.restore()
+    assert restored == data and original == base and changelog == [{"action": "bulk_edit"}]
+    journal.close()
+
+
+def test_torn_last_line_is_ignored_and_truncated(tmp_path):
+    base = _records(3)
+    with OperationJournal(str(tmp_path)) as journal:
+        journal.reset(base)
+        journal.log([{"op": "set", "index": 0, "field": "jobLevel", "value": "Junior"}])
+    with open(tmp_path / JOURNAL_FILE, "a", encoding="utf-8") as f:
+        f.write('{"seq": 99, "op": "set", "ind')
+
+    with OperationJournal(str(tmp_path)) as journal:
+        journal.log([{"op": "set", "index": 1, "field": "jobLevel", "value": "Senior"}])
+        restored, _, _ = journal.restore()
+    assert [r.get("jobLevel") for r in restored] == ["Junior", "Senior", None]
+
+
+def test_diff_operations_only_checks_given_rows():
+    old = _records(3)
+    new = [dict(r) for r in old]
+    new[0]["department"] = "HR"
+    new[2]["department"] = "HR"
+    assert [op["index"] for op in diff_operations(old, new, [2])] == [2]
+    assert diff_operations(old, old) == []
+
+
+def test_reset_defers_base_snapshot_until_first_edit(tmp_path):
+    journal = OperationJournal(str(tmp_path))
+    journal.reset(_records(3))
+    assert not journal.has_session
+    assert not [f for f in os.listdir(tmp_path) if f.startswith("snapshot-")]
+
+    data = _records(3)[:2]
+    journal.snapshot(data, [{"action": "dedupe"}])
+    restored, original, changelog = journal.restore()
+    assert restored == data and original == _records(3)
+    journal.close()
+
+
+def test_concurrent_appends_are_serialised_and_owners_are_separate(tmp_path):
+    base = _records(8)
+    journal = OperationJournal(str(tmp_path), fsync_every=5)
+    journal.reset(base)
+
+    def edit(index):
+        for n in range(50):
+            journal.log([{"op": "set", "index": index, "field": "jobLevel", "value": f"L{n}"}])
+
+    threads = [threading.Thread(target=edit, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.close()
+
+    with open(tmp_path / JOURNAL_FILE, encoding="utf-8") as f:
+        seqs = [json.loads(line)["seq"] for line in f]
+    assert seqs == sorted(seqs) and len(set(seqs)) == 400
+    restored, _, _ = OperationJournal(str(tmp_path)).restore()
+    assert [r["jobLevel"] for r in restored] == ["L49"] * 8
+
+    first, second = journal_directory(str(tmp_path), "session:a"), journal_directory(str(tmp_path), "session:b")
+    assert first != second and os.path.dirname(first) == str(tmp_path)
+    assert not OperationJournal(second).has_session
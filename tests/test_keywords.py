@@ -0,0 +1,113 @@
+import random
+
+from core.io import records_to_table
+from core.keywords import KeywordMatcher
+from core.validate import validate_dataset, validate_issues, validate_table
+
+
+def test_matcher_finds_whole_words_in_one_scan():
+    matcher = KeywordMatcher({
+        "entry": ["Entry", "Junior"],
+        "flsa": ["Exempt", "Non-Exempt"],
+        "banned": ["rock star", "TBD"],
+    })
+    assert matcher.scan("Senior role with entry-level tasks, re-entry and reentry") == {"entry": ("entry",)}
+    assert matcher.scan("NON-EXEMPT") == {"flsa": ("NON-EXEMPT",)}
+    assert matcher.scan("A rock star, TBD. Junior rock star") == {
+        "banned": ("rock star", "TBD"),
+        "entry": ("Junior",),
+    }
+    assert matcher.scan("rockstars") == {}
+    assert matcher.scan(None) == {}
+
+
+def test_substring_pattern_is_a_superset_for_arrow():
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    matcher = KeywordMatcher({"entry": ["Entry", "Entry Level"], "banned": ["rock star", "TBD", "c++"]})
+    texts = ["ENTRY level work", "reentry", "a Rock Star", "uses C++", "TBD", "nothing here", None]
+    pattern = matcher.substring_pattern("banned")
+    found = pc.match_substring_regex(pa.array(texts), pattern, ignore_case=True).to_pylist()
+    for text, hit in zip(texts, found):
+        if "banned" in matcher.scan(text):
+            assert hit, text
+    assert found[:4] == [False, False, True, True]
+    assert matcher.substring_pattern("no such group") == ""
+
+
+def test_matcher_with_many_keywords_matches_plain_search():
+    rng = random.Random(2)
+    words = sorted({"".join(rng.choices("abcde", k=rng.randint(2, 6))) for _ in range(2000)})
+    matcher = KeywordMatcher({"g": words})
+    vocabulary = set(words)
+    for _ in range(50):
+        text = " ".join("".join(rng.choices("abcde", k=rng.randint(2, 6))) for _ in range(30))
+        expected = list(dict.fromkeys(t for t in text.split() if t in vocabulary))
+        assert list(matcher.scan(text).get("g", ())) == expected
+
+
+def test_keyword_rules_in_row_and_table_validators():
+    records = [
+        {"positionTitle": "Analyst", "department": "IT", "careerFamily": "General", "jobLevel": "Sr. Manager",
+         "position_complexity": "Junior-level tasks; TBD", "FLSA_status": "Non-Exempt", "SOC_code": "15-1252"},
+        {"positionTitle": "Analyst", "department": "IT", "careerFamily": "General", "jobLevel": "Junior",
+         "FLSA_status": "Part time", "SOC_code": "151252",
+         "soft_skills": "Be a ninja and a rockstar"},
+        {"positionTitle": "Analyst", "department": "HR", "careerFamily": "General", "jobLevel": "Senior",
+         "FLSA_status": "exempt", "SOC_code": "15-1252.01"},
+    ]
+    issues = validate_issues(records)
+    by_rule = {(i.index, i.rule): i.message for i in issues}
+    assert by_rule[(0, "level_complexity")] == "Job Level is 'Sr. Manager' but Complexity mentions 'Junior'."
+    assert (0, "seniority_complexity") not in by_rule
+    assert (0, "flsa_level") in by_rule
+    assert by_rule[(0, "banned_phrase")] == "Contains banned phrase(s): 'TBD'."
+    assert (1, "flsa_status_unknown") in by_rule
+    assert (1, "soc_code_format") in by_rule
+    assert by_rule[(1, "banned_phrase")] == "Contains banned phrase(s): 'ninja', 'rockstar'."
+    assert not {rule for index, rule in by_rule if index == 2} - {"empty_narrative"}
+
+    def tuples(found):
+        return [(i.index, i.field, i.message, i.severity, i.rule) for i in found]
+
+    _, row_issues = validate_dataset(records, build_models=False)
+    assert tuples(validate_table(records_to_table(records))) == tuples(row_issues) == tuples(issues)
+
+
+def test_table_keyword_prefilter_keeps_near_misses_exact():
+    # Substring hits that are not whole-word keyword matches must not raise issues.
+    records = [
+        {"positionTitle": "Analyst", "department": "IT", "careerFamily": "General", "jobLevel": "Senior",
+         "position_complexity": "Reentry of ledgers", "FLSA_status": "Exempted", "soft_skills": "Guruji"},
+        {"positionTitle": "Analyst", "department": "IT", "careerFamily": "General", "jobLevel": "Seniority",
+         "position_complexity": "Entry work", "FLSA_status": "Hourly", "SOC_code": " 15-1252 "},
+        {"positionTitle": "Analyst", "department": "IT", "careerFamily": "General", "jobLevel": None,
+         "FLSA_status": "  ", "technical_skills": "ninja"},
+    ]
+    _, row_issues = validate_dataset(records, build_models=False)
+    table_issues = validate_table(records_to_table(records))
+    assert [(i.index, i.rule, i.message) for i in table_issues] == [(i.index, i.rule, i.message) for i in row_issues]
+    # seniority_complexity keeps its case-sensitive substring test, so "Seniority" still matches.
+    assert {(i.index, i.rule) for i in row_issues if i.rule != "empty_narrative"} == {
+        (0, "flsa_status_unknown"), (1, "seniority_complexity"), (2, "banned_phrase")}
+
+
+def test_seniority_complexity_keeps_its_original_scope():
+    base = {"positionTitle": "Analyst", "department": "IT", "careerFamily": "General"}
+    cases = [
+        ("Senior", "Entry tasks", "seniority_complexity", "Job Level is 'Senior' but Complexity mentions 'Entry'."),
+        ("Senior Manager", "Entry-level work", "seniority_complexity",
+         "Job Level is 'Senior Manager' but Complexity mentions 'Entry'."),
+        ("senior", "entry tasks", "level_complexity", "Job Level is 'senior' but Complexity mentions 'entry'."),
+        ("Director", "Entry tasks", "level_complexity", "Job Level is 'Director' but Complexity mentions 'Entry'."),
+        ("Manager", "Junior staff work", "level_complexity",
+         "Job Level is 'Manager' but Complexity mentions 'Junior'."),
+        ("Associate", "Entry tasks", None, None),
+    ]
+    records = [{**base, "jobLevel": level, "position_complexity": complexity} for level, complexity, _, _ in cases]
+    _, row_issues = validate_dataset(records, build_models=False)
+    table_issues = validate_table(records_to_table(records))
+    for found in (row_issues, table_issues):
+        by_row = {i.index: (i.rule, i.message) for i in found if i.field == "Logical Consistency"}
+        assert by_row == {idx: (rule, message) for idx, (_, _, rule, message) in enumerate(cases) if rule}
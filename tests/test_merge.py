@@ -0,0 +1,129 @@
+import json
+import os
+import random
+
+import pytest
+
+from core.io import deduplicate_data
+from core.merge import _iter_source, merge_deduplicate, merge_catalog_files, partitions_for_budget
+from core.ndjson import write_ndjson
+
+
+def _campus(name, count, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            "positionTitle": f"Role {rng.randint(0, 30)}",
+            "department": rng.choice(["IT", "HR", "Finance"]),
+            "careerFamily": "General",
+            "jobLevel": rng.choice(["Senior", "Junior"]),
+            "campus": name,
+        }
+        for _ in range(count)
+    ]
+
+
+def test_matches_in_memory_keep_first_semantics():
+    north, south = _campus("north", 200, 1), _campus("south", 150, 2)
+    expected = deduplicate_data(north + south)
+
+    stats = {}
+    merged = list(merge_deduplicate([("north", north), ("south", south)], partitions=7, stats=stats))
+
+    assert [record for record, _ in merged] == expected
+    assert stats["records_in"] == 350
+    assert stats["duplicates_removed"] == 350 - len(expected)
+
+
+def test_provenance_points_back_to_sources():
+    north = [{"positionTitle": "Advisor", "department": "HR", "careerFamily": "General"}]
+    south = [
+        {"positionTitle": "Chemist", "department": "Science", "careerFamily": "General"},
+        {"positionTitle": " advisor ", "department": "hr", "careerFamily": "General"},
+    ]
+
+    merged = list(merge_deduplicate([("north", north), ("south", south)], partitions=3))
+
+    assert [p["source"] for _, p in merged] == ["north", "south"]
+    advisor = merged[0][1]
+    assert advisor["source_index"] == 0
+    assert advisor["merged_from"] == [["south", 1]]
+    assert advisor["merged_count"] == 1
+
+
+def test_provenance_of_a_record_repeated_many_times_is_capped(monkeypatch):
+    monkeypatch.setattr("core.merge.MAX_MERGED_FROM", 3)
+    copies = [{"positionTitle": "Advisor", "department": "HR", "careerFamily": "General"}] * 10
+
+    merged = list(merge_deduplicate([("north", copies[:4]), ("south", copies[4:])], partitions=2))
+
+    assert len(merged) == 1
+    provenance = merged[0][1]
+    assert provenance["merged_from"] == [["north", 1], ["north", 2], ["north", 3]]
+    assert provenance["merged_count"] == 9
+
+
+def test_merge_catalog_files(tmp_path):
+    first = str(tmp_path / "a.jsonl")
+    second = str(tmp_path / "b.json")
+    write_ndjson(_campus("a", 50, 3), first)
+    with open(second, "w", encoding="utf-8") as f:
+        json.dump(_campus("b", 50, 4), f)
+
+    output = str(tmp_path / "merged.jsonl")
+    provenance = str(tmp_path / "provenance.jsonl")
+    stats = merge_catalog_files([first, second], output, provenance, memory_budget_bytes=10_000)
+
+    with open(output, encoding="utf-8") as f:
+        out_lines = f.readlines()
+    with open(provenance, encoding="utf-8") as f:
+        prov_lines = f.readlines()
+    assert len(out_lines) == len(prov_lines) == stats["records_out"]
+    assert stats["records_in"] == 100
+
+
+def test_command_line_entry_point(tmp_path):
+    import subprocess
+    import sys
+
+    first = str(tmp_path / "a.jsonl")
+    write_ndjson(_campus("a", 30, 3) * 2, first)
+    output = str(tmp_path / "merged.jsonl")
+    result = subprocess.run(
+        [sys.executable, "-m", "core.merge", output, first, "--budget-mb", "1"],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    stats = json.loads(result.stdout)
+    with open(output, encoding="utf-8") as f:
+        assert len(f.readlines()) == stats["records_out"] == len(deduplicate_data(_campus("a", 30, 3)))
+
+
+def test_partitions_scale_with_budget():
+    assert partitions_for_budget(1_000, 1024 * 1024) == 1
+    assert partitions_for_budget(10 * 1024 ** 3, 64 * 1024 ** 2) > 1
+
+
+def test_oversized_partitions_are_split_to_fit_the_budget():
+    north, south = _campus("north", 400, 5), _campus("south", 300, 6)
+    expected = deduplicate_data(north + south)
+
+    stats = {}
+    # A 1 KB budget allows about five keys per partition, far fewer than two partitions hold.
+    merged = list(merge_deduplicate([("north", north), ("south", south)], partitions=2, stats=stats,
+                                    memory_budget_bytes=1024))
+
+    assert [record for record, _ in merged] == expected
+    assert stats["partitions_split"] > 0
+    assert stats["records_out"] == len(expected)
+
+
+def test_json_sources_are_streamed(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text('[{"positionTitle": "Analyst"}, {"positionTitle": "Engineer"}, oops')
+
+    records = _iter_source(str(path))
+    # Records before the corrupt tail are yielded before it is read.
+    assert next(records) == {"positionTitle": "Analyst"}
+    assert next(records) == {"positionTitle": "Engineer"}
+    with pytest.raises(ValueError):
+        next(records)
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+from core import metrics
+from core.validate import validate_dataset
+from core.io import deduplicate_data
+
+
+@pytest.fixture
+def recording():
+    metrics.reset()
+    metrics.enable(track_memory=True)
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_records_nothing():
+    metrics.reset()
+    assert metrics.is_enabled() is False
+
+    with metrics.span("noop"):
+        pass
+    metrics.count("noop.records", 5)
+    validate_dataset([{"positionTitle": "Dev", "department": "IT", "careerFamily": "General"}])
+
+    snap = metrics.snapshot()
+    assert snap["spans"] == {}
+    assert snap["counters"] == {}
+
+
+def test_core_entry_points_record_spans_and_counters(recording):
+    data = [
+        {"positionTitle": "Dev", "department": "IT", "careerFamily": "General"},
+        {"positionTitle": "Dev", "department": "IT", "careerFamily": "General"},
+    ]
+    validate_dataset(data)
+    deduplicate_data(data)
+
+    snap = metrics.snapshot()
+    assert snap["spans"]["validate.validate_dataset"]["count"] == 1
+    assert snap["spans"]["io.deduplicate_data"]["count"] == 1
+    assert snap["counters"]["validate.records"] == 2
+    assert snap["counters"]["io.deduplicate_data.removed"] == 1
+
+
+def test_nested_span_peak_memory_propagates(recording):
+    with metrics.span("outer"):
+        with metrics.span("inner"):
+            buffer = bytearray(2_000_000)
+        del buffer
+
+    spans = metrics.snapshot()["spans"]
+    assert spans["inner"]["peak_memory_bytes"] >= 2_000_000
+    assert spans["outer"]["peak_memory_bytes"] >= spans["inner"]["peak_memory_bytes"]
+
+
+def test_exposition_formats(recording):
+    with metrics.span('stage "quoted"'):
+        pass
+    metrics.count("rows", 3)
+
+    text = metrics.to_prometheus()
+    assert "# TYPE jda_stage_seconds summary" in text
+    assert 'jda_stage_seconds_count{stage="stage \\"quoted\\""} 1' in text
+    assert 'jda_records_total{counter="rows"} 3' in text
+
+    dumped = json.loads(metrics.to_json())
+    assert dumped["counters"]["rows"] == 3
+
+
+def test_holders_keep_recording_until_the_last_release():
+    import tracemalloc
+
+    assert not tracemalloc.is_tracing()
+    metrics.acquire("session-a", track_memory=True)
+    metrics.acquire("session-b")
+    metrics.release("session-a")
+    # Session b still holds recording; only a asked for memory tracking.
+    assert metrics.is_enabled()
+    assert not tracemalloc.is_tracing()
+    metrics.release("session-b")
+    assert not metrics.is_enabled()
+
+    # tracemalloc started elsewhere is left running.
+    tracemalloc.start()
+    try:
+        metrics.acquire("session-a", track_memory=True)
+        metrics.release("session-a")
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_holds_with_a_ttl_lapse_unless_refreshed(monkeypatch):
+    import tracemalloc
+
+    now = [1000.0]
+    monkeypatch.setattr(metrics.time, "monotonic", lambda: now[0])
+    metrics.acquire("session-a", track_memory=True, ttl=60)
+    metrics.acquire("session-b", ttl=120)
+    now[0] = 1050.0
+    metrics.acquire("session-a", track_memory=True, ttl=60)  # a rerun refreshes the hold
+    now[0] = 1100.0
+    assert metrics.is_enabled() and tracemalloc.is_tracing()
+
+    # Session a stopped rerunning: its hold (and memory tracking) lapses at the next span.
+    now[0] = 1115.0
+    with metrics.span("after a"):
+        pass
+    assert metrics.is_enabled() and not tracemalloc.is_tracing()
+    assert "after a" in metrics.snapshot()["spans"]
+
+    now[0] = 1125.0
+    with metrics.span("after b"):
+        pass
+    assert not metrics.is_enabled()
+    assert "after b" not in metrics.snapshot()["spans"]
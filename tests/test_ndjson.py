@@ -0,0 +1,120 @@
+import io
+import os
+
+import pytest
+from core import metrics
+from core.ndjson import NDJSONCatalog, write_ndjson, append_ndjson, load_ndjson
+
+
+def _records(start, stop):
+    return [
+        {"positionTitle": f"Job {i}", "department": "IT" if i % 2 else "Finance", "careerFamily": "General"}
+        for i in range(start, stop)
+    ]
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = str(tmp_path / "catalog.jsonl")
+    write_ndjson(_records(0, 10), path)
+    return path
+
+
+def test_random_access_and_paging(catalog_path):
+    with NDJSONCatalog(catalog_path) as catalog:
+        assert len(catalog) == 10
+        assert catalog.get(7)["positionTitle"] == "Job 7"
+        assert catalog[-1]["positionTitle"] == "Job 9"
+        assert [r["positionTitle"] for r in catalog.page(1, page_size=4)] == ["Job 4", "Job 5", "Job 6", "Job 7"]
+        with pytest.raises(IndexError):
+            catalog.get(10)
+    assert os.path.exists(f"{catalog_path}.idx")
+
+
+def test_append_extends_index_incrementally(catalog_path):
+    with NDJSONCatalog(catalog_path) as catalog:
+        assert catalog.find("department", " finance ") == [0, 2, 4, 6, 8]
+
+        append_ndjson(_records(10, 13), catalog_path)
+        assert catalog.refresh() == 3
+        assert catalog.get(12)["positionTitle"] == "Job 12"
+        assert catalog.find("department", "Finance")[-1] == 12
+
+    # A fresh reader picks up the persisted sidecars without rescanning.
+    with NDJSONCatalog(catalog_path) as reopened:
+        assert len(reopened) == 13
+        assert reopened.build_key_index() == 0
+        assert reopened.find("positionTitle", "job 11") == [11]
+
+
+def test_rewritten_file_rebuilds_index(catalog_path):
+    NDJSONCatalog(catalog_path).close()
+    write_ndjson(_records(100, 103), catalog_path)
+    with NDJSONCatalog(catalog_path) as catalog:
+        assert len(catalog) == 3
+        assert catalog.get(0)["positionTitle"] == "Job 100"
+
+
+def test_unterminated_last_line_is_readable_and_rescanned(tmp_path):
+    path = str(tmp_path / "partial.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"positionTitle": "A"}\n\n{"positionTitle": "B"}')
+    with NDJSONCatalog(path) as catalog:
+        assert [r["positionTitle"] for r in catalog.page(0)] == ["A", "B"]
+        append_ndjson([{"positionTitle": "C"}], path)
+        assert catalog.refresh() == 1
+        assert [r["positionTitle"] for r in catalog.page(0)] == ["A", "B", "C"]
+
+
+def test_load_ndjson_reports_bad_lines():
+    assert len(load_ndjson(io.BytesIO(b'{"a": 1}\n\n{"a": 2}\n'))) == 2
+    with pytest.raises(ValueError, match="Line 2"):
+        load_ndjson(io.StringIO('{"a": 1}\n[1, 2]\n'))
+
+
+def test_rewrite_after_the_first_block_and_partial_appends(tmp_path):
+    path = str(tmp_path / "catalog.jsonl")
+    records = [{"positionTitle": f"Job {i:04d}", "department": "IT", "pad": "x" * 40} for i in range(200)]
+    write_ndjson(records, path)
+    with NDJSONCatalog(path) as catalog:
+        catalog.build_key_index()
+
+    # Same size, same line boundaries, only records past the first 4 KB differ.
+    records[150] = {**records[150], "positionTitle": "Job X150"}
+    write_ndjson(records, path)
+    os.utime(path, ns=(0, 0))
+    with NDJSONCatalog(path) as catalog:
+        assert catalog.get(150)["positionTitle"] == "Job X150"
+        assert catalog.find("positionTitle", "job x150") == [150]
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"positionTitle": "Half')
+        assert catalog.refresh() == 0
+        assert len(catalog) == 200 and catalog.get(-1)["positionTitle"] == "Job 0199"
+        assert catalog.build_key_index() == 0
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(' written"}\n')
+        assert catalog.refresh() == 1
+        assert catalog.get(-1)["positionTitle"] == "Half written"
+
+
+def test_refresh_after_append_hashes_only_the_new_bytes(catalog_path):
+    metrics.reset()
+    metrics.enable()
+    try:
+        with NDJSONCatalog(catalog_path) as catalog:
+            size = os.path.getsize(catalog_path)
+            append_ndjson(_records(10, 12), catalog_path)
+            metrics.reset()
+            assert catalog.refresh() == 2
+            assert metrics.snapshot()["counters"]["ndjson.hashed_bytes"] == os.path.getsize(catalog_path) - size
+
+            # A rewrite through the same inode that changes the first bytes is hashed in full.
+            write_ndjson(_records(100, 112), catalog_path)
+            metrics.reset()
+            catalog.refresh()
+            assert catalog.get(0)["positionTitle"] == "Job 100"
+            assert metrics.snapshot()["counters"]["ndjson.hashed_bytes"] >= size
+    finally:
+        metrics.disable()
+        metrics.reset()
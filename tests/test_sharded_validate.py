@@ -0,0 +1,33 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from core.validate import validate_dataset
+from core.sharded_validate import make_shards, validate_shard, reduce_shards, validate_dataset_sharded
+
+
+def test_sharded_matches_serial_order(make_catalog, issue_tuples):
+    records = make_catalog(500, seed=7)
+    _, serial = validate_dataset(records, build_models=False)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        sharded = validate_dataset_sharded(records, shard_size=37, executor=pool)
+
+    assert issue_tuples(sharded) == issue_tuples(serial)
+    assert any(i.field == "Duplicate" for i in sharded)
+
+
+def test_process_pool_matches_serial(make_catalog, issue_tuples):
+    records = make_catalog(300, seed=11)
+    _, serial = validate_dataset(records, build_models=False)
+    sharded = validate_dataset_sharded(records, workers=2, shard_size=100)
+    assert issue_tuples(sharded) == issue_tuples(serial)
+
+
+def test_shard_results_are_json_round_trippable(make_catalog, issue_tuples):
+    records = make_catalog(120, seed=3)
+    results = [json.loads(json.dumps(validate_shard(s))) for s in make_shards(records, 50)]
+    # Reduce does not depend on the order results arrive in.
+    results.reverse()
+
+    _, serial = validate_dataset(records, build_models=False)
+    assert issue_tuples(reduce_shards(results)) == issue_tuples(serial)
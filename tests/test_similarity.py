@@ -0,0 +1,96 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from core.similarity import SimilarityIndex, record_tokens, tokenize
+
+
+def _brute_force(records, query, k):
+    """Reference TF-IDF cosine ranking with plain Python dicts."""
+    docs = [Counter(record_tokens(r)) for r in records]
+    df = Counter(t for d in docs for t in d)
+    n = len(docs)
+
+    def vector(counts):
+        v = {t: (1 + math.log(c)) * (math.log((1 + n) / (1 + df[t])) + 1) for t, c in counts.items() if t in df}
+        norm = math.sqrt(sum(w * w for w in v.values())) or 1.0
+        return {t: w / norm for t, w in v.items()}
+
+    q = vector(Counter(record_tokens(query)))
+    scores = [(i, sum(w * q.get(t, 0.0) for t, w in vector(d).items())) for i, d in enumerate(docs)]
+    return sorted((s for s in scores if s[1] > 0), key=lambda s: (-s[1], s[0]))[:k]
+
+
+def test_matches_brute_force_after_incremental_updates(make_catalog):
+    records = make_catalog(400, seed=3)
+    index = SimilarityIndex.from_records(records, compact_ratio=0.5)
+
+    rng = random.Random(9)
+    edited = list(records)
+    for i in rng.sample(range(400), 30):
+        edited[i] = {**records[i], "positionTitle": "term1 term2 term3"}
+    edited = edited[:390] + make_catalog(5, seed=4)
+    assert index.refresh(edited) == 30 + 5 + 5
+    assert index._delta  # still served from the delta segment
+
+    query = edited[17]
+    # The catalog repeats records, so equal scores may come back in either order.
+    ranking = _brute_force(edited, query, len(edited))
+    expected_scores = dict(ranking)
+
+    def check(got):
+        assert [s for _, s in got] == pytest.approx([s for _, s in ranking[:8]])
+        assert [s for _, s in got] == pytest.approx([expected_scores[i] for i, _ in got])
+
+    check(index.search(query, k=8))
+    index._compact()
+    check(index.search(query, k=8))
+
+
+def test_build_with_repeated_texts_matches_per_record_vectors(make_catalog):
+    # A title reused as a narrative is weighted per field, and non-string values are tokenized as text.
+    records = [
+        {"positionTitle": "term1 term2", "key_duties_responsibilities": "term1 term2"},
+        {"positionTitle": "term3", "key_duties_responsibilities": "term1 term2"},
+        {"positionTitle": "term1 term2", "position_complexity": 42},
+        {"positionTitle": "term3", "key_duties_responsibilities": "term1 term2"},
+    ] + make_catalog(40, seed=3)
+    built = SimilarityIndex.from_records(records)
+    incremental = SimilarityIndex.from_records([])
+    for slot, record in enumerate(records):
+        incremental.update(slot, record)
+
+    def vector(index, slot):
+        terms = {term_id: term for term, term_id in index._vocab.items()}
+        term_ids, tf = index._entries(slot)
+        return {terms[int(t)]: w for t, w in zip(term_ids, tf)}
+
+    for slot in range(len(records)):
+        assert vector(built, slot) == pytest.approx(vector(incremental, slot))
+
+
+def test_text_query_and_exclude():
+    records = [
+        {"positionTitle": "Data Analyst", "key_duties_responsibilities": "Analyze data and build reports"},
+        {"positionTitle": "Payroll Clerk", "key_duties_responsibilities": "Process payroll"},
+        {"positionTitle": "Senior Data Engineer", "key_duties_responsibilities": "Build data pipelines"},
+    ]
+    index = SimilarityIndex.from_records(records)
+
+    assert [i for i, _ in index.search("data reports", k=2)] == [0, 2]
+    assert [i for i, _ in index.search(records[0], k=3, exclude=[0])] == [2]
+    assert index.search("unrelated words only") == []
+
+
+def test_removed_records_are_not_returned(make_catalog):
+    records = make_catalog(50, seed=3)
+    index = SimilarityIndex.from_records(records)
+    index.remove(3)
+    assert 3 not in [i for i, _ in index.search(records[3], k=50)]
+    assert len(index) == 49
+
+
+def test_tokenize_keeps_numbers_and_drops_stopwords():
+    assert tokenize("Analyst 2 of the Year") == ["analyst", "2", "year"]
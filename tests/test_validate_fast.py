@@ -0,0 +1,36 @@
+from core.validate import validate_dataset, passes_schema_fast
+
+
+MIXED_RECORDS = [
+    {"positionTitle": "Dev", "department": "IT", "careerFamily": "Information Technology", "extra": [1, 2]},
+    {"positionTitle": "Bad Rec", "careerFamily": "General"},
+    {"positionTitle": 42, "department": "IT", "careerFamily": "General"},
+    {"positionTitle": b"Bytes", "department": "IT", "careerFamily": "General"},
+    {"positionTitle": "Lead", "department": "Ops", "careerFamily": "Nope", "jobLevel": "Senior",
+     "position_complexity": "Entry work"},
+    {"positionTitle": "Dev", "department": "IT", "careerFamily": "Information Technology", "extra": "x"},
+    {"positionTitle": "Opt", "department": "HR", "careerFamily": "General", "SOC_code": 1234},
+    {"positionTitle": " ", "department": "", "careerFamily": "General", "jobLevel": None},
+]
+
+
+def test_fast_path_matches_pydantic_issues(issue_tuples):
+    _, slow = validate_dataset(MIXED_RECORDS, build_models=False, fast_path=False)
+    _, fast = validate_dataset(MIXED_RECORDS, build_models=False)
+
+    assert issue_tuples(fast) == issue_tuples(slow)
+    # Rows that fail the fast check keep pydantic's own error messages.
+    assert any(i.index == 2 and i.field == "positionTitle" and i.severity == "Error" for i in fast)
+    assert any(i.index == 6 and i.field == "SOC_code" for i in fast)
+
+
+def test_fast_check_defers_coercible_values_to_pydantic():
+    assert passes_schema_fast({"positionTitle": "A", "department": "B", "careerFamily": "C"}) is True
+    assert passes_schema_fast({"positionTitle": b"A", "department": "B", "careerFamily": "C"}) is False
+    assert passes_schema_fast({"positionTitle": "A", "careerFamily": "C"}) is False
+    assert passes_schema_fast(["not", "a", "dict"]) is False
+
+
+def test_build_models_false_returns_no_models():
+    valid, _ = validate_dataset(MIXED_RECORDS, build_models=False)
+    assert valid == []
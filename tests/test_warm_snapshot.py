@@ -0,0 +1,72 @@
+import json
+import os
+import pickle
+
+from core.io import deduplicate_data
+from core.validate import validate_issues
+from core.warm_snapshot import _header, build_snapshot, load_snapshot, load_or_build, snapshot_path, file_sha256
+
+
+def _write(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f)
+
+
+def _records(count):
+    return [
+        {"positionTitle": f"Role {i % 7}", "department": "IT", "careerFamily": "General" if i % 3 else "Unknown"}
+        for i in range(count)
+    ]
+
+
+def test_build_then_hit(tmp_path):
+    source = str(tmp_path / "catalog.json")
+    _write(source, _records(50))
+    cache_dir = str(tmp_path / "snapshots")
+
+    _, was_built = load_or_build(source, cache_dir)
+    loaded, was_built_again = load_or_build(source, cache_dir)
+
+    assert was_built and not was_built_again
+    assert loaded["records"] == _records(50)
+    assert [i.to_dict() for i in loaded["issues"]] == [i.to_dict() for i in validate_issues(_records(50))]
+    assert deduplicate_data(loaded["records"], loaded["dedupe_keys"]) == deduplicate_data(_records(50))
+
+
+def test_changed_source_misses_and_replaces_old_snapshot(tmp_path):
+    source = str(tmp_path / "catalog.json")
+    cache_dir = str(tmp_path / "snapshots")
+    _write(source, _records(5))
+    build_snapshot(source, cache_dir)
+    old_path = snapshot_path(source, file_sha256(source), cache_dir)
+
+    _write(source, _records(6))
+    assert load_snapshot(source, cache_dir) is None
+    snapshot, built = load_or_build(source, cache_dir)
+
+    assert built and len(snapshot["records"]) == 6
+    assert not os.path.exists(old_path)
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_corrupt_snapshot_is_a_miss(tmp_path):
+    source = str(tmp_path / "catalog.json")
+    cache_dir = str(tmp_path / "snapshots")
+    _write(source, _records(5))
+    build_snapshot(source, cache_dir)
+    with open(snapshot_path(source, file_sha256(source), cache_dir), "wb") as f:
+        f.write(b"not a pickle")
+    assert load_snapshot(source, cache_dir) is None
+
+    # Unpickling errors other than UnpicklingError, and payloads of the wrong shape, are misses too.
+    class _Fails:
+        def __reduce__(self):
+            return int, ("not a number",)
+
+    path = snapshot_path(source, file_sha256(source), cache_dir)
+    header = _header(file_sha256(source))
+    for payload in [_Fails(), ["old", "format"], {"records": []}]:
+        with open(path, "wb") as f:
+            pickle.dump(header, f)
+            pickle.dump(payload, f)
+        assert load_snapshot(source, cache_dir) is None